@@ -1,6 +1,10 @@
 const $ = (id) => document.getElementById(id);
 
-const ALGORITHMS = ["FCFS", "RR", "SRTF", "HRRN", "SJF", "MLQ", "MLFQ"];
+const ALGORITHMS = ["FCFS", "RR", "SRTF", "HRRN", "SJF", "MLQ", "MLFQ", "LOTTERY", "STRIDE", "CFS"];
+
+// Above this many segments the server omits the Gantt and we page it through /gantt/window.
+const GANTT_MAX_CELLS = 2000;
+let lastRequest = null;
 
 function hslFromString(str) {
   let hash = 0;
@@ -63,6 +67,23 @@ function renderWarnings(warnings) {
   el.innerHTML = warnings.map((w) => `⚠️ ${w}`).join("<br/>");
 }
 
+function ganttCell(seg) {
+  const cell = document.createElement("div");
+  cell.className = "h-12 flex items-center justify-center border border-slate-950 text-xs font-semibold select-none";
+  cell.style.flex = `${seg.end - seg.start} 0 0`;
+  if (seg.pid === "IDLE") {
+    cell.style.background = "#334155";
+    cell.textContent = "IDLE";
+  } else if (seg.pid === "CS") {
+    cell.style.background = "#b45309";
+    cell.textContent = "CS";
+  } else {
+    cell.style.background = hslFromString(seg.pid);
+    cell.textContent = seg.pid;
+  }
+  return cell;
+}
+
 function renderGantt(gantt) {
   const bar = $("ganttBar");
   const axis = $("ganttAxis");
@@ -70,26 +91,63 @@ function renderGantt(gantt) {
   axis.innerHTML = "";
   if (!gantt || gantt.length === 0) return;
 
-  for (const seg of gantt) {
-    const dur = seg.end - seg.start;
+  for (const seg of gantt) bar.appendChild(ganttCell(seg));
+
+  const bounds = [gantt[0].start, ...gantt.map((s) => s.end)];
+  axis.innerHTML = `زمان: ${bounds.join("  |  ")}`;
+}
+
+function renderGanttBuckets(win) {
+  const bar = $("ganttBar");
+  const axis = $("ganttAxis");
+  bar.innerHTML = "";
+  axis.innerHTML = "";
+  if (win.gantt && win.gantt.length) {
+    renderGantt(win.gantt);
+    return;
+  }
+
+  for (const b of win.buckets || []) {
     const cell = document.createElement("div");
-    cell.className = "h-12 flex items-center justify-center border border-slate-950 text-xs font-semibold select-none";
-    cell.style.flex = `${dur} 0 0`;
-    if (seg.pid === "IDLE") {
-      cell.style.background = "#334155";
-      cell.textContent = "IDLE";
-    } else if (seg.pid === "CS") {
-      cell.style.background = "#b45309";
-      cell.textContent = "CS";
-    } else {
-      cell.style.background = hslFromString(seg.pid);
-      cell.textContent = seg.pid;
-    }
+    cell.className = "h-12 cursor-zoom-in";
+    cell.style.flex = `${b.end - b.start} 0 0`;
+    cell.title = `${b.start.toFixed(1)}–${b.end.toFixed(1)} • ${b.pid ?? "-"} • ${(b.utilization * 100).toFixed(0)}% • ${b.segments} seg`;
+    if (!b.pid || b.pid === "IDLE") cell.style.background = "#334155";
+    else if (b.pid === "CS") cell.style.background = "#b45309";
+    else cell.style.background = hslFromString(b.pid);
+    cell.style.opacity = String(0.35 + 0.65 * b.utilization);
+    cell.addEventListener("click", () => loadGanttWindow(Math.floor(b.start), Math.ceil(b.end)));
     bar.appendChild(cell);
   }
+  axis.innerHTML = `زمان: ${win.start}  …  ${win.end}  (${win.window_segments} / ${win.total_segments} segments)`;
+}
 
-  const bounds = [gantt[0].start, ...gantt.map((s) => s.end)];
-  axis.innerHTML = `زمان: ${bounds.join("  |  ")}`;
+async function inflateCompact(compact) {
+  if (!compact.encoding) return compact;
+  if (compact.encoding !== "gzip") throw new Error(`Unsupported gantt encoding: ${compact.encoding}`);
+  const bytes = Uint8Array.from(atob(compact.data), (c) => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+  return JSON.parse(await new Response(stream).text());
+}
+
+async function decodeCompactGantt(compact) {
+  const c = await inflateCompact(compact);
+  const out = new Array(c.lengths.length);
+  let t = c.start;
+  for (let k = 0; k < c.lengths.length; k++) {
+    if (c.gaps) t += c.gaps[k];
+    out[k] = { start: t, end: t + c.lengths[k], pid: c.pids[c.pid_index[k]] };
+    t += c.lengths[k];
+  }
+  return out;
+}
+
+async function loadGanttWindow(start, end) {
+  if (!lastRequest) return;
+  const body = { request: lastRequest, max_buckets: Math.max(1, $("ganttBar").clientWidth) };
+  if (start != null) body.start = start;
+  if (end != null) body.end = end;
+  renderGanttBuckets(await postJson("/gantt/window", body));
 }
 
 function renderMetrics(metrics, averages, cpu_utilization, throughput) {
@@ -142,10 +200,18 @@ async function execute() {
 
   const req = { algorithm, processes, context_switch_time, config };
   if (time_slice > 0) req.time_slice = time_slice;
+  lastRequest = req;
 
-  const out = await postJson("/execute", req);
+  const compression = typeof DecompressionStream === "function" ? "gzip" : null;
+  const out = await postJson("/execute", {
+    ...req,
+    gantt_max_segments: GANTT_MAX_CELLS,
+    gantt_format: "compact",
+    gantt_compression: compression,
+  });
   renderWarnings(out.warnings);
-  renderGantt(out.gantt);
+  if (out.gantt_omitted) await loadGanttWindow();
+  else renderGantt(out.gantt_compact ? await decodeCompactGantt(out.gantt_compact) : out.gantt);
   renderMetrics(out.metrics, out.averages, out.cpu_utilization, out.throughput);
 }
 
@@ -212,12 +278,73 @@ function loadSample() {
 
 // init
 renderCompareList();
+let liveSocket = null;
+let livePaused = false;
+
+// Live playback: the server pushes schedule events over a WebSocket and the Gantt grows frame by frame.
+function playLive() {
+  if (liveSocket) {
+    livePaused = !livePaused;
+    liveSocket.send(JSON.stringify({ action: livePaused ? "pause" : "resume" }));
+    $("playBtn").textContent = livePaused ? "Resume" : "Pause";
+    return;
+  }
+  const algorithm = $("algorithm").value;
+  const time_slice = Number($("timeSlice").value || 0);
+  const request = {
+    algorithm,
+    processes: readProcesses(),
+    context_switch_time: Number($("contextSwitch").value || 0),
+    config: parseConfig(),
+  };
+  if (time_slice > 0) request.time_slice = time_slice;
+
+  const base = $("apiBase").value.replace(/\/$/, "").replace(/^http/, "ws");
+  const ws = new WebSocket(base + "/ws/playback");
+  liveSocket = ws;
+  livePaused = false;
+  $("playBtn").textContent = "Pause";
+  renderGantt([]);
+  renderMetrics([], null, null, null);
+  let start = null;
+  let end = null;
+
+  ws.onopen = () => ws.send(JSON.stringify({ request, rate: 20, fps: 10 }));
+  ws.onmessage = (msg) => {
+    const data = JSON.parse(msg.data);
+    if (data.type === "error") {
+      $("warnings").textContent = data.detail;
+    } else if (data.type === "start") {
+      renderWarnings(data.warnings);
+    } else if (data.type === "frame") {
+      for (const e of data.events) {
+        if (e.kind === "queue") {
+          $("ganttAxis").textContent = `t=${e.time}  ready=${e.ready}  running=${e.running ?? "-"}  done=${e.completed}`;
+        } else if (e.start != null) {
+          start = start ?? e.start;
+          end = e.end;
+          $("ganttBar").appendChild(ganttCell({ start: e.start, end: e.end, pid: e.pid ?? e.kind.toUpperCase() }));
+        }
+      }
+    } else if (data.type === "done") {
+      $("ganttAxis").textContent = `زمان: ${start ?? "-"}  …  ${end ?? "-"}`;
+      renderMetrics([], data.averages, null, null);
+      ws.close();
+    }
+  };
+  ws.onclose = () => {
+    liveSocket = null;
+    $("playBtn").textContent = "Play live";
+  };
+}
+
 addRow({ pid: "P1", arrival: 0, burst: 5, priority: 1 });
 addRow({ pid: "P2", arrival: 1, burst: 3, priority: 2 });
 addRow({ pid: "P3", arrival: 2, burst: 8, priority: 3 });
 
 $("addRow").addEventListener("click", () => addRow({ pid: `P${$("procBody").children.length + 1}` }));
 $("loadSample").addEventListener("click", loadSample);
+$("ganttBar").addEventListener("dblclick", () => loadGanttWindow().catch(() => {}));
 $("executeBtn").addEventListener("click", async () => {
   $("warnings").textContent = "";
   try {
@@ -226,6 +353,10 @@ $("executeBtn").addEventListener("click", async () => {
     $("warnings").textContent = String(e.message || e);
   }
 });
+$("playBtn").addEventListener("click", () => {
+  $("warnings").textContent = "";
+  playLive();
+});
 $("compareBtn").addEventListener("click", async () => {
   $("compareOut").textContent = "";
   try {
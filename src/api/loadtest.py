@@ -0,0 +1,392 @@
+"""Load generator and latency report for the API.
+
+Starts ``main:app`` under one uvicorn worker on a free local port (or
+targets ``--url``). It then drives the app for ``--duration`` seconds from
+``--concurrency`` keep-alive connections, using a small asyncio HTTP/1.1
+client so that the generator costs little next to the server. Request
+bodies are built up front from ``--mix`` (route weights) and ``--sizes``
+(process-count weights), with random workloads as in
+``scheduling.experiment``.
+
+The default is a closed loop: each connection sends its next request as
+soon as the previous one completes. ``--rate`` switches to an open loop at
+a fixed arrival rate. Latency is then measured from each request's
+scheduled send time, so a server that falls behind is not hidden by the
+client slowing down (coordinated omission).
+
+The JSON report (``--out``) has throughput, error rates and
+p50/p95/p99/p99.9 latency overall, per route and per workload size, plus
+the git commit. ``--baseline`` prints the change against an earlier report.
+
+    cd src && python -m api.loadtest --duration 20 --concurrency 16 --out load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from scheduling.experiment import generate_workload
+from scheduling.schemas import WorkloadSpec
+from scheduling.stats import percentile
+
+ROUTES = ("execute", "compare", "rr", "mlfq")
+DEFAULT_MIX = "execute=6,compare=2,rr=1,mlfq=1"
+DEFAULT_SIZES = "10=5,100=3,1000=2"
+EXECUTE_ALGOS = ["FCFS", "RR", "SJF", "SRTF", "HRRN", "MLQ", "MLFQ", "CFS"]
+VARIANTS = 8
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Body = Tuple[str, int, bytes]  # route, size, encoded request
+
+
+def parse_weights(spec: str, keys: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """``"a=3,b=1"`` -> ``{"a": 3.0, "b": 1.0}``."""
+    out: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if keys is not None and name not in keys:
+            raise ValueError(f"Unknown route {name!r}; expected one of {', '.join(keys)}")
+        out[name] = float(weight or 1)
+    if not out or any(w < 0 for w in out.values()) or sum(out.values()) <= 0:
+        raise ValueError(f"Bad weights: {spec!r}")
+    return out
+
+
+def _payload(route: str, processes: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    if route == "execute":
+        algo = rng.choice(EXECUTE_ALGOS)
+        return {"algorithm": algo, "processes": processes, "time_slice": 4, "context_switch_time": 1}
+    if route == "compare":
+        return {"processes": processes, "time_slice": 4, "context_switch_time": 1}
+    if route == "rr":
+        return {"processes": processes, "quantum": 4}
+    return {"processes": processes, "time_slice": 4}
+
+
+def build_bodies(mix: Dict[str, float], sizes: Dict[str, float], seed: int) -> List[Tuple[Body, float]]:
+    """``VARIANTS`` encoded bodies per (route, size), each with its share of the traffic."""
+    rng = random.Random(seed)
+    route_total = sum(mix.values())
+    size_total = sum(sizes.values())
+    out: List[Tuple[Body, float]] = []
+    for s, sw in sizes.items():
+        n = int(s)
+        for v in range(VARIANTS):
+            procs = [
+                {"pid": p.pid, "arrival_time": p.arrival_time, "burst_time": p.burst_time, "priority": p.priority}
+                for p in generate_workload(WorkloadSpec(processes=n), seed, v)
+            ]
+            for route, rw in mix.items():
+                weight = rw / route_total * sw / size_total / VARIANTS
+                if weight > 0:
+                    body = json.dumps(_payload(route, procs, rng)).encode("utf-8")
+                    out.append(((route, n, body), weight))
+    return out
+
+
+class _Connection:
+    """Minimal HTTP/1.1 keep-alive client: JSON POSTs, Content-Length or chunked replies."""
+
+    def __init__(self, host: str, port: int, prefix: str):
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _open(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def post(self, path: str, body: bytes) -> int:
+        if self.writer is None:
+            await self._open()
+        assert self.reader is not None and self.writer is not None
+        self.writer.write(
+            b"POST %s%s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+            % (self.prefix.encode(), path.encode(), self.host.encode(), len(body))
+            + body
+        )
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        length = None
+        chunked = close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding" and b"chunked" in value.lower():
+                chunked = True
+            elif name == b"connection" and b"close" in value.lower():
+                close = True
+        if chunked:
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length is not None:
+            await self.reader.readexactly(length)
+        else:
+            await self.reader.read()
+            close = True
+        if close:
+            self.close()
+        return status
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: Dict[Tuple[str, int], List[float]] = defaultdict(list)
+        self.errors: Dict[Tuple[str, int], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, key: Tuple[str, int], seconds: float, error: Optional[str]) -> None:
+        if error is None:
+            self.latencies[key].append(seconds * 1000.0)
+        else:
+            self.errors[key][error] += 1
+
+
+def _summary(lat: List[float], errors: Dict[str, int], seconds: float) -> Dict[str, Any]:
+    lat = sorted(lat)
+    failed = sum(errors.values())
+    total = len(lat) + failed
+    return {
+        "requests": total,
+        "throughput_rps": len(lat) / seconds if seconds > 0 else 0.0,
+        "error_rate": failed / total if total else 0.0,
+        "errors": dict(errors),
+        "latency_ms": {
+            "mean": sum(lat) / len(lat) if lat else None,
+            "p50": percentile(lat, 50, presorted=True),
+            "p95": percentile(lat, 95, presorted=True),
+            "p99": percentile(lat, 99, presorted=True),
+            "p999": percentile(lat, 99.9, presorted=True),
+            "max": lat[-1] if lat else None,
+        },
+    }
+
+
+def _report(rec: _Recorder, seconds: float) -> Dict[str, Any]:
+    def group(index: int) -> Dict[str, Any]:
+        lat: Dict[Any, List[float]] = defaultdict(list)
+        err: Dict[Any, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for key in set(rec.latencies) | set(rec.errors):
+            lat[key[index]].extend(rec.latencies.get(key, ()))
+            for k, v in rec.errors.get(key, {}).items():
+                err[key[index]][k] += v
+        return {str(k): _summary(lat[k], err[k], seconds) for k in sorted(lat)}
+
+    everything = [x for v in rec.latencies.values() for x in v]
+    all_errors: Dict[str, int] = defaultdict(int)
+    for errs in rec.errors.values():
+        for k, v in errs.items():
+            all_errors[k] += v
+    return {"overall": _summary(everything, all_errors, seconds), "routes": group(0), "sizes": group(1)}
+
+
+async def _drive(
+    url: str, bodies: List[Tuple[Body, float]], concurrency: int, duration: float, warmup: float,
+    rate: Optional[float], seed: int,
+) -> Tuple[_Recorder, float]:
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    prefix = parts.path.rstrip("/")
+    choices = [b for b, _ in bodies]
+    weights = [w for _, w in bodies]
+    rec = _Recorder()
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    measure_from = begin + warmup
+    stop = measure_from + duration
+    slots = iter(range(1 << 62))
+
+    async def worker(i: int) -> None:
+        rng = random.Random(seed * 1000 + i)
+        conn = _Connection(host, port, prefix)
+        try:
+            while True:
+                if rate:
+                    due = begin + next(slots) / rate
+                    if due >= stop:
+                        return
+                    if due > loop.time():
+                        await asyncio.sleep(due - loop.time())
+                    sent = due
+                else:
+                    sent = loop.time()
+                    if sent >= stop:
+                        return
+                route, size, body = rng.choices(choices, weights)[0]
+                error: Optional[str] = None
+                try:
+                    status = await conn.post("/" + route, body)
+                    if status >= 400:
+                        error = str(status)
+                except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+                    conn.close()
+                    error = type(e).__name__
+                done = loop.time()
+                if sent >= measure_from and done <= stop:
+                    rec.add((route, size), done - sent, error)
+        finally:
+            conn.close()
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return rec, duration
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, timeout: float = 30.0) -> subprocess.Popen:
+    """One uvicorn worker serving ``main:app`` from ``src/``; waits until it answers."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SRC,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _fmt(v: Optional[float]) -> str:
+    return "-" if v is None else f"{v:.1f}"
+
+
+def render(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    lines = [f"{'':18} {'req':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'p99.9':>8}"]
+    rows = [("overall", report["overall"], (baseline or {}).get("overall"))]
+    for section in ("routes", "sizes"):
+        for name, s in report[section].items():
+            label = f"{section[:-1]} {name}"
+            rows.append((label, s, ((baseline or {}).get(section) or {}).get(name)))
+    for label, s, base in rows:
+        lat = s["latency_ms"]
+        lines.append(
+            f"{label:18} {s['requests']:>7} {s['throughput_rps']:>8.1f} {100 * s['error_rate']:>6.2f} "
+            f"{_fmt(lat['p50']):>8} {_fmt(lat['p95']):>8} {_fmt(lat['p99']):>8} {_fmt(lat['p999']):>8}"
+        )
+        if base:
+            def delta(new: Optional[float], old: Optional[float]) -> str:
+                return "-" if not new or not old else f"{100 * (new - old) / old:+.1f}%"
+
+            blat = base["latency_ms"]
+            lines.append(
+                f"{'  vs baseline':18} {'':>7} {delta(s['throughput_rps'], base['throughput_rps']):>8} {'':>6} "
+                f"{delta(lat['p50'], blat['p50']):>8} {delta(lat['p95'], blat['p95']):>8} "
+                f"{delta(lat['p99'], blat['p99']):>8} {delta(lat['p999'], blat['p999']):>8}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the scheduling API and report latency percentiles.")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds first")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, help="open loop: requests per second across all connections")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route weights (default {DEFAULT_MIX})")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"process-count weights (default {DEFAULT_SIZES})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_weights(args.mix, ROUTES)
+        sizes = parse_weights(args.sizes)
+        if any(int(s) < 1 for s in sizes):
+            raise ValueError("sizes must be positive process counts")
+    except ValueError as e:
+        parser.error(str(e))
+    if args.concurrency < 1 or args.duration <= 0 or args.warmup < 0 or (args.rate is not None and args.rate <= 0):
+        parser.error("--concurrency, --duration and --rate must be positive")
+
+    bodies = build_bodies(mix, sizes, args.seed)
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        server = start_server(port)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        rec, seconds = asyncio.run(
+            _drive(url, bodies, args.concurrency, args.duration, args.warmup, args.rate, args.seed)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "url": args.url or "local",
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "mix": mix,
+            "sizes": sizes,
+            "seed": args.seed,
+        },
+        **_report(rec, seconds),
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print(render(report, baseline))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
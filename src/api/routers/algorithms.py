@@ -1,73 +1,598 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from scheduling.schemas import CompareRequest, SchedulingRequest, SchedulingResponse
-from scheduling.service import compare_algorithms, execute_schedule
+from api.singleflight import inflight
+from scheduling.schemas import (
+    BatchRequest,
+    CompareRequest,
+    ExperimentReport,
+    ExperimentRequest,
+    GanttWindowRequest,
+    GanttWindowResponse,
+    OptimizeRequest,
+    OptimizeResponse,
+    ProcessIn,
+    SchedulabilityReport,
+    SchedulingRequest,
+    SchedulingResponse,
+    SessionAdvanceRequest,
+    SessionCreateRequest,
+    SessionState,
+    SessionSubmitRequest,
+    WorkerRegistration,
+)
+from scheduling.admission import AdmissionRejected, CostEstimate, admit, estimate_cost, jobs_cost
+from scheduling.cache import compare_hash, request_hash, workload_hash
+from scheduling.distributed import check_registration, coordinator
+from scheduling.eventlog import KINDS, EventLogReader
+from scheduling.gantt import GanttIndex
+from scheduling.experiment import experiment_cost, run_experiment, run_experiment_stream
+from scheduling.optimizer import optimize_config, optimize_cost
+from scheduling.playback import Playback
+from scheduling.pool import RESULT_COLUMNS, execute_shared, run_jobs_shared
+from scheduling.realtime import check_schedulability
+from scheduling.serialize import RESPONSE_FIELDS, parse_fields, response_json
+from scheduling.service import (
+    compare_jobs,
+    event_log_path,
+    execute_schedule,
+    gantt_window,
+    job_request,
+    remember_gantt,
+    run_job,
+)
+from scheduling.session import SimulationSession, sessions
+from scheduling.sink import SegmentSink
+from scheduling.store import METRICS, get_run_store
+from scheduling.workload import PreparedWorkload
 
 
 router = APIRouter()
 
+# Upper bound on ``limit`` for GET /events, so one page cannot buffer a whole log.
+MAX_EVENTS = 100_000
+
+
+async def _admit(cost: Callable[[], CostEstimate], pool: bool = True) -> CostEstimate:
+    """Admission for routes that simulate; the estimate is O(n), so it runs off the event loop too.
+
+    ``pool=False`` for routes that always run in-process, so they never report the pool tier.
+    """
+    try:
+        return admit(await run_in_threadpool(cost), pool)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=413, detail=str(e), headers=e.estimate.headers())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def _workload(processes: List[ProcessIn]) -> PreparedWorkload:
+    try:
+        return await run_in_threadpool(PreparedWorkload, processes)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def _prepare(
+    req: SchedulingRequest, gantt: bool = True, pool: bool = True
+) -> Tuple[PreparedWorkload, CostEstimate]:
+    """Prepared workload and admission for a single-schedule route, both built off the event loop."""
+    workload = await _workload(req.processes)
+    return workload, await _admit(lambda: estimate_cost(req, workload, gantt=gantt), pool)
+
+
+def _hashes(req: SchedulingRequest) -> Tuple[str, str]:
+    return request_hash(req), workload_hash(req.processes)
+
+
+def _execute_body(
+    req: SchedulingRequest, workload: PreparedWorkload, estimate: CostEstimate, fields: Optional[List[str]] = None
+) -> bytes:
+    """Run one admitted schedule, record it and encode the response."""
+    store = get_run_store()
+    if estimate.tier == "pool":
+        # Long runs go to a worker process so they do not hold the GIL the API threads share.
+        # The workload travels through shared memory; only the body and the stored fields come back.
+        body, kept, gantt = execute_shared(workload, req, fields, store.fields if store is not None else ())
+        if gantt is not None:
+            remember_gantt(req, GanttIndex.from_columns(*gantt))
+        if store is not None:
+            store.record(req, kept)
+        return body
+    result = execute_schedule(req, workload)
+    if store is not None:
+        store.record(req, result)
+    return response_json(result, fields)
+
 
 @router.post("/execute", response_model=SchedulingResponse)
 @router.post("/schedule", response_model=SchedulingResponse)
-async def execute(req: SchedulingRequest):
+async def execute(req: SchedulingRequest, fields: Optional[str] = None):
     try:
-        return execute_schedule(req)
+        selected = parse_fields(fields)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    rhash, whash = await run_in_threadpool(_hashes, req)
+    workload, estimate = await _prepare(req)
+
+    def run() -> bytes:
+        return _execute_body(req, workload, estimate, selected)
+
+    # The response shape options are not part of the request hash but change the payload.
+    key = f"execute:{rhash}:{req.gantt_format}:{req.gantt_compression}:{req.gantt_max_segments}:{','.join(selected or ())}"
+    try:
+        body = await inflight.run(key, run)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    headers = {"X-Request-Hash": rhash, "X-Workload-Hash": whash, **estimate.headers()}
+    # Returning a Response skips FastAPI's response_model re-validation; the model stays for the schema.
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.post("/execute/stream")
+async def execute_stream(req: SchedulingRequest):
+    """Same JSON as /execute, but the Gantt is spilled to disk and streamed back."""
+    rhash, whash = await run_in_threadpool(_hashes, req)
+    # The sink keeps the Gantt out of memory, so only the run time and per-job state count.
+    # The sink lives in this process, so even a long stream runs here.
+    workload, estimate = await _prepare(req, gantt=False, pool=False)
+    sink = SegmentSink()
+
+    def run() -> bytes:
+        result = execute_schedule(req, workload, False, sink)
+        store = get_run_store()
+        if store is not None:
+            store.record(req, result)
+        return response_json(result, [f for f in RESPONSE_FIELDS if f != "gantt"])
+
+    try:
+        rest = await run_in_threadpool(run)
+    except ValueError as e:
+        sink.close()
+        raise HTTPException(status_code=422, detail=str(e))
+    except BaseException:
+        sink.close()
+        raise
+
+    def body():
+        try:
+            yield '{"gantt":['
+            yield from sink.iter_json()
+            yield "]," + rest.decode("utf-8")[1:]
+        finally:
+            sink.close()
+
+    headers = {
+        "X-Request-Hash": rhash,
+        "X-Workload-Hash": whash,
+        "X-Gantt-Segments": str(len(sink)),
+        **estimate.headers(),
+    }
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
+def _run_jobs(
+    processes: List[ProcessIn],
+    workload: PreparedWorkload,
+    jobs: List[Dict[str, Any]],
+    distributed: bool,
+    parallel: bool,
+) -> Dict[str, Any]:
+    """compare/batch execution: remote workers, then the process pool (asked for or pool tier), then inline."""
+    store = get_run_store()
+    if distributed and coordinator.workers():
+        def on_metrics(i: int, metrics: Dict[str, Any]) -> None:
+            store.record_metrics(job_request(processes, jobs[i]), metrics)
+
+        return {"results": coordinator.run(processes, jobs, on_metrics if store is not None else None)}
+    if parallel:
+        if store is None:
+            return {"results": run_jobs_shared(workload, jobs)}
+        # The pool computes the stored metrics next to the summary columns; they are split off here.
+        rows = run_jobs_shared(workload, jobs, RESULT_COLUMNS + tuple(m for m in METRICS if m not in RESULT_COLUMNS))
+        for job, row in zip(jobs, rows):
+            store.record_metrics(job_request(processes, job), {m: row[m] for m in METRICS})
+        return {"results": [{k: row[k] for k in ("algorithm",) + RESULT_COLUMNS} for row in rows]}
+    on_result = store.record if store is not None else None
+    return {"results": [run_job(processes, workload, job, on_result) for job in jobs]}
 
 
 @router.post("/compare")
-async def compare(req: CompareRequest):
+async def compare(req: CompareRequest, response: Response):
+    jobs = compare_jobs(req)
+    workload = await _workload(req.processes)
+    estimate = await _admit(lambda: jobs_cost(req.processes, workload, jobs))
+
+    # Worker health checks, remote calls and local runs all block, so none of it runs on the event loop.
+    def run() -> Dict[str, Any]:
+        return _run_jobs(req.processes, workload, jobs, req.distributed, req.parallel or estimate.tier == "pool")
+
     try:
-        return compare_algorithms(req)
+        result = await inflight.run(f"compare:{compare_hash(req)}", run)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    response.headers["X-Workload-Hash"] = workload_hash(req.processes)
+    response.headers.update(estimate.headers())
+    return result
+
+
+@router.post("/batch")
+async def batch(req: BatchRequest, response: Response):
+    jobs = [r.dict() for r in req.runs]
+    workload = await _workload(req.processes)
+    estimate = await _admit(lambda: jobs_cost(req.processes, workload, jobs))
+    response.headers.update(estimate.headers())
+
+    def run() -> Dict[str, Any]:
+        return _run_jobs(req.processes, workload, jobs, req.distributed, req.parallel or estimate.tier == "pool")
+
+    try:
+        return await run_in_threadpool(run)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/optimize", response_model=OptimizeResponse)
+async def optimize(req: OptimizeRequest, response: Response):
+    estimate = await _admit(lambda: optimize_cost(req))
+    response.headers.update(estimate.headers())
+    if estimate.tier == "pool":
+        req = req.copy(update={"parallel": True})
+    try:
+        return await run_in_threadpool(optimize_config, req)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/experiment", response_model=ExperimentReport)
+async def experiment(req: ExperimentRequest, response: Response):
+    estimate = await _admit(lambda: experiment_cost(req))
+    response.headers.update(estimate.headers())
+    if estimate.tier == "pool":
+        req = req.copy(update={"parallel": True})
+    try:
+        return await run_in_threadpool(run_experiment, req)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/experiment/stream")
+async def experiment_stream(req: ExperimentRequest):
+    """NDJSON: one ``ExperimentReport`` line per round of replicates, as the intervals narrow."""
+    estimate = await _admit(lambda: experiment_cost(req))
+    if estimate.tier == "pool":
+        req = req.copy(update={"parallel": True})
+
+    def body():
+        for report in run_experiment_stream(req):
+            yield report.json() + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers=estimate.headers())
+
+
+@router.post("/estimate")
+async def estimate(req: SchedulingRequest):
+    """Admission estimate for /execute without running the simulation."""
+
+    def run() -> CostEstimate:
+        est = estimate_cost(req)
+        try:
+            admit(est)
+        except AdmissionRejected:
+            pass
+        return est
+
+    try:
+        return asdict(await run_in_threadpool(run))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/schedulability", response_model=SchedulabilityReport)
+async def schedulability(req: SchedulingRequest):
+    try:
+        return await run_in_threadpool(lambda: check_schedulability(req.algorithm, PreparedWorkload(req.processes)))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/workers/register")
+async def register_worker(req: WorkerRegistration, x_worker_token: Optional[str] = Header(None)):
+    try:
+        check_registration(req.url, x_worker_token)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    coordinator.register(req.url)
+    return {"workers": coordinator.status()}
+
+
+@router.get("/coalescing")
+async def coalescing_stats():
+    return inflight.stats()
+
+
+@router.get("/workers")
+async def list_workers():
+    return {"workers": coordinator.status()}
+
+
+@router.get("/runs/best")
+async def runs_best(workload_hash: str, metric: str = "avg_waiting_time"):
+    store = get_run_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Run store is disabled")
+    try:
+        ranking = await run_in_threadpool(store.best_algorithm, workload_hash, metric)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "workload_hash": workload_hash,
+        "metric": metric,
+        "best": ranking[0]["algorithm"] if ranking else None,
+        "ranking": ranking,
+    }
+
+
+@router.get("/runs/history")
+async def runs_history(
+    request_hash: Optional[str] = None,
+    algorithm: Optional[str] = None,
+    workload_hash: Optional[str] = None,
+    since: Optional[float] = None,
+    limit: int = 100,
+    include_gantt: bool = False,
+):
+    store = get_run_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Run store is disabled")
+    runs = await run_in_threadpool(
+        store.history,
+        request=request_hash,
+        algorithm=algorithm,
+        workload=workload_hash,
+        since=since,
+        limit=limit,
+        include_gantt=include_gantt,
+    )
+    return {"runs": runs}
+
+@router.get("/events/{log_id}")
+async def events(
+    log_id: str,
+    pid: Optional[str] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(10000, ge=1, le=MAX_EVENTS),
+):
+    """Decisions recorded with ``config.event_log``, read through the log's time and pid indexes."""
+    try:
+        path = event_log_path(log_id)
+        kinds = [k.strip() for k in kind.split(",") if k.strip()] if kind else None
+        unknown = [k for k in kinds or () if k not in KINDS]
+        if unknown:
+            raise ValueError(f"Unknown event kind(s): {', '.join(unknown)}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    def read() -> Dict[str, Any]:
+        with EventLogReader(path) as reader:
+            out = []
+            truncated = False
+            for e in reader.query(pid, start, end, kinds):
+                # Reading one event past the limit tells a full page from a cut-off one.
+                if len(out) == limit:
+                    truncated = True
+                    break
+                out.append(e._asdict())
+            return {"log": log_id, "events": out, "truncated": truncated}
+
+    try:
+        return await run_in_threadpool(read)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown event log: {log_id}")
+
+
+@router.post("/gantt/window", response_model=GanttWindowResponse)
+async def gantt_window_route(req: GanttWindowRequest, response: Response):
+    # A cache miss simulates the whole schedule here and keeps its Gantt index, so it never goes to the pool.
+    estimate = await _admit(lambda: estimate_cost(req.request), pool=False)
+    response.headers.update(estimate.headers())
+    try:
+        return await run_in_threadpool(gantt_window, req)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _session(session_id: str) -> SimulationSession:
+    try:
+        return sessions.get(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+
+
+@router.post("/sessions", response_model=SessionState)
+async def create_session(req: SessionCreateRequest):
+    try:
+        session = await run_in_threadpool(sessions.create, req)
+        return await run_in_threadpool(session.state)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=413, detail=str(e), headers=e.estimate.headers())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/sessions/{session_id}", response_model=SessionState)
+async def get_session(session_id: str, include_gantt: bool = False, include_metrics: bool = False):
+    return await run_in_threadpool(_session(session_id).state, include_gantt, include_metrics)
+
+
+@router.post("/sessions/{session_id}/processes", response_model=SessionState)
+async def submit_processes(session_id: str, req: SessionSubmitRequest, include_metrics: bool = False):
+    session = _session(session_id)
+    try:
+        await run_in_threadpool(session.submit, req.processes)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=413, detail=str(e), headers=e.estimate.headers())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await run_in_threadpool(session.state, False, include_metrics)
+
+
+@router.post("/sessions/{session_id}/advance", response_model=SessionState)
+async def advance_session(
+    session_id: str, req: SessionAdvanceRequest, include_gantt: bool = False, include_metrics: bool = False
+):
+    session = _session(session_id)
+    try:
+        await run_in_threadpool(session.advance, req.until)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await run_in_threadpool(session.state, include_gantt, include_metrics)
+
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return {"deleted": session_id}
+
+
+async def _playback_control(ws: WebSocket, queue: "asyncio.Queue[Optional[Dict[str, Any]]]") -> None:
+    try:
+        while True:
+            msg = await ws.receive_json()
+            await queue.put(msg if isinstance(msg, dict) else {})
+    except (WebSocketDisconnect, RuntimeError, ValueError):
+        await queue.put(None)
+
+
+@router.websocket("/ws/playback")
+async def playback(ws: WebSocket):
+    """Live schedule playback.
+
+    The first client message is ``{"request": {...}, "rate": ticks/s, "fps": n, "max_events": n}``.
+    The server answers ``start``, then one ``frame`` per 1/fps seconds and ``done`` at the end.
+    Control messages: ``{"action": "pause" | "resume" | "seek" | "rate", "time": t, "rate": r, "fps": n}``.
+    The engine only runs ahead by one frame, so a paused or slow client holds it in place.
+    """
+    await ws.accept()
+    try:
+        init = await ws.receive_json()
+
+        # Validation, the estimate and the engine setup are all O(n), so none of it runs on the event loop.
+        def prepare() -> Tuple[CostEstimate, Playback]:
+            req = SchedulingRequest(**init["request"])
+            workload = PreparedWorkload(req.processes)
+            return admit(estimate_cost(req, workload, gantt=False), pool=False), Playback(req, workload=workload)
+
+        estimate, pb = await run_in_threadpool(prepare)
+    except WebSocketDisconnect:
+        return
+    except AdmissionRejected as e:
+        await ws.send_json({"type": "error", "detail": str(e), "estimate": asdict(e.estimate)})
+        await ws.close(code=1008)
+        return
+    except (KeyError, TypeError, ValueError) as e:
+        await ws.send_json({"type": "error", "detail": str(e)})
+        await ws.close(code=1008)
+        return
+
+    rate = max(1e-3, float(init.get("rate") or 50))
+    fps = min(60.0, max(1.0, float(init.get("fps") or 10)))
+    max_events = max(10, int(init.get("max_events") or 1000))
+    await ws.send_json(
+        {"type": "start", "algorithm": pb.algorithm, "clock": pb.clock, "estimate": asdict(estimate), "warnings": pb.warnings}
+    )
+
+    queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    reader = asyncio.create_task(_playback_control(ws, queue))
+    paused = False
+    owed = 0.0
+    try:
+        while True:
+            if not paused and not pb.finished:
+                owed += rate / fps
+                ticks = int(owed)
+                owed -= ticks
+                if ticks:
+                    events = await run_in_threadpool(pb.advance, ticks, max_events)
+                    await ws.send_json({"type": "frame", "clock": pb.clock, "events": events})
+                    if pb.finished:
+                        await ws.send_json({"type": "done", "clock": pb.clock, **pb.summary()})
+            try:
+                # Sleeping on the queue paces frames and picks up control messages immediately.
+                msg = await asyncio.wait_for(queue.get(), timeout=None if paused or pb.finished else 1 / fps)
+            except asyncio.TimeoutError:
+                continue
+            if msg is None:
+                break
+            action = msg.get("action")
+            if action == "pause":
+                paused = True
+            elif action == "resume":
+                paused = False
+            elif action == "rate":
+                rate = max(1e-3, float(msg.get("rate") or rate))
+                fps = min(60.0, max(1.0, float(msg.get("fps") or fps)))
+            elif action == "seek":
+                snapshot = await run_in_threadpool(pb.seek, int(msg.get("time") or 0))
+                owed = 0.0
+                await ws.send_json({"type": "seek", "clock": pb.clock, "events": [snapshot]})
+            else:
+                await ws.send_json({"type": "error", "detail": f"Unknown action: {action!r}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
 
 @router.post("/fcfs")
-async def fcfs(payload: Any):
-    return _legacy_execute("FCFS", payload)
+async def fcfs(payload: Any = Body(...)):
+    return await _legacy_execute("FCFS", payload)
 
 
 @router.post("/sjf")
-async def sjf(payload: Any):
-    return _legacy_execute("SJF", payload)
+async def sjf(payload: Any = Body(...)):
+    return await _legacy_execute("SJF", payload)
 
 
 @router.post("/spn")
-async def spn(payload: Any):
-    return _legacy_execute("SPN", payload)
+async def spn(payload: Any = Body(...)):
+    return await _legacy_execute("SPN", payload)
 
 
 @router.post("/srtf")
-async def srtf(payload: Any):
-    return _legacy_execute("SRTF", payload)
+async def srtf(payload: Any = Body(...)):
+    return await _legacy_execute("SRTF", payload)
 
 
 @router.post("/rr")
-async def rr(payload: Any):
-    return _legacy_execute("RR", payload)
+async def rr(payload: Any = Body(...)):
+    return await _legacy_execute("RR", payload)
 
 
 @router.post("/hrrn")
-async def hrrn(payload: Any):
-    return _legacy_execute("HRRN", payload)
+async def hrrn(payload: Any = Body(...)):
+    return await _legacy_execute("HRRN", payload)
 
 
 @router.post("/mlq")
-async def mlq(payload: Any):
-    return _legacy_execute("MLQ", payload)
+async def mlq(payload: Any = Body(...)):
+    return await _legacy_execute("MLQ", payload)
 
 
 @router.post("/mlfq")
-async def mlfq(payload: Any):
-    return _legacy_execute("MLFQ", payload)
+async def mlfq(payload: Any = Body(...)):
+    return await _legacy_execute("MLFQ", payload)
 
 
-def _legacy_execute(algorithm: str, payload: Any) -> Dict[str, Any]:
+async def _legacy_execute(algorithm: str, payload: Any) -> Response:
     req: Dict[str, Any] = {}
     if isinstance(payload, dict):
         req = dict(payload)
@@ -94,7 +619,11 @@ def _legacy_execute(algorithm: str, payload: Any) -> Dict[str, Any]:
 
     try:
         parsed = SchedulingRequest.parse_obj(req)
-        result = execute_schedule(parsed)
-        return result.dict()
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    workload, estimate = await _prepare(parsed)
+    try:
+        body = await run_in_threadpool(_execute_body, parsed, workload, estimate)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(body, media_type="application/json", headers=estimate.headers())
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce identical in-flight calls: the first caller runs ``fn`` in the
+    thread pool, later callers with the same key await that same result.
+
+    A waiter that is cancelled (client gone) only detaches itself; the work is
+    cancelled once no waiter is left. Lives on the event loop thread, so no locks.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.counters: Dict[str, int] = {
+            "leaders": 0,
+            "coalesced": 0,
+            "cancelled": 0,
+            "abandoned": 0,
+            "errors": 0,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, in_flight=len(self._flights))
+
+    def _finished(self, key: str, flight: _Flight, task: "asyncio.Future[Any]") -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.counters["errors"] += 1
+
+    async def run(self, key: str, fn: Callable[[], T]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(run_in_threadpool(fn)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda t, k=key, f=flight: self._finished(k, f, t))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            self.counters["cancelled"] += 1
+            if flight.waiters == 1 and not flight.task.done():
+                # Last interested client went away: drop the result (the worker thread still finishes).
+                self.counters["abandoned"] += 1
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+
+inflight = SingleFlight()
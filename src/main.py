@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.routers import algorithms
+from scheduling.pool import shutdown_pool
+from scheduling.store import close_run_store
 
 app = FastAPI(title="CPU Scheduling Visualizer API", version="1.0.0")
 
@@ -15,6 +17,11 @@ app.add_middleware(
 
 app.include_router(algorithms.router)
 
+@app.on_event("shutdown")
+def flush_run_store():
+    close_run_store()
+    shutdown_pool()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the CPU Scheduling Algorithms API"}
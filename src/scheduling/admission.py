@@ -0,0 +1,342 @@
+"""Pre-simulation cost estimate and admission tiers.
+
+The engine's loop runs once per dispatch, plus once per arrival and I/O
+return. Dispatches follow from the request shape. Quantum-driven policies
+split every CPU burst into ``ceil(burst / quantum)`` runs. MLFQ walks its
+allotments level by level. A ``boost_period`` boost gives every unfinished
+process a fresh walk, so each boost in the schedule's span adds up to one run
+per upper level, capped at one run per tick. Arrival-preemptive policies can
+split a run at every arrival. The rest run each burst once. The estimate
+needs no simulation, so it is O(n).
+
+Run time and memory come from a linear model over
+(iterations, Gantt segments, jobs) fitted by ``calibrate``::
+
+    python -m scheduling.admission --out admission.json
+
+``ADMISSION_CALIBRATION`` points the service at the fitted coefficients.
+Without it the built-in defaults (fitted on a development machine) are used.
+A request then goes to the ``inline`` tier (the API's thread pool), the
+``pool`` tier (the local process pool), or is rejected.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from scheduling.policies import CFS, LOTTERY, MLFQ, MLQ, RR, STRIDE
+from scheduling.realtime import release_horizon
+from scheduling.schemas import ProcessIn, SchedulingRequest
+from scheduling.service import _build_policy, execute_schedule, job_request
+from scheduling.workload import PreparedWorkload
+
+INLINE_SECONDS = float(os.environ.get("ADMISSION_INLINE_SECONDS", "0.25"))
+MAX_SECONDS = float(os.environ.get("ADMISSION_MAX_SECONDS", "30"))
+MAX_MEMORY_BYTES = int(float(os.environ.get("ADMISSION_MAX_MEMORY_MB", "1024")) * (1 << 20))
+
+# seconds and bytes per (iteration, Gantt segment, job)
+DEFAULT_COEFFICIENTS: Dict[str, List[float]] = {
+    "seconds": [1.3e-06, 6.7e-06, 3.3e-05],
+    "memory": [34.0, 610.0, 1450.0],
+}
+
+
+@dataclass
+class CostEstimate:
+    jobs: int
+    dispatches: int
+    iterations: int
+    segments: int
+    seconds: float
+    memory_bytes: int
+    tier: str = "inline"
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-Cost-Iterations": str(self.iterations),
+            "X-Cost-Segments": str(self.segments),
+            "X-Cost-Seconds": f"{self.seconds:.4f}",
+            "X-Cost-Memory": str(self.memory_bytes),
+            "X-Admission-Tier": self.tier,
+        }
+
+
+def _load_coefficients() -> Dict[str, List[float]]:
+    path = os.environ.get("ADMISSION_CALIBRATION")
+    if not path:
+        return DEFAULT_COEFFICIENTS
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    return {k: [float(x) for x in data[k]] for k in ("seconds", "memory")}
+
+
+COEFFICIENTS = _load_coefficients()
+
+
+def _cpu_bursts(workload: PreparedWorkload, i: int) -> List[int]:
+    bursts = workload.io_bursts[i]
+    if bursts:
+        return [int(b) for b in bursts[0::2]]
+    return [int(workload.bursts[i])]
+
+
+def _split(burst: int, quantum: Optional[int]) -> int:
+    if not quantum:
+        return 1
+    return -(-burst // quantum)
+
+
+def _mlfq_runs(burst: int, slices: Sequence[Optional[int]], last: Optional[int]) -> int:
+    runs = 0
+    rem = burst
+    for s in slices:
+        if rem <= 0:
+            return runs
+        runs += 1
+        rem -= int(s)
+    return runs + (_split(rem, last) if rem > 0 else 0)
+
+
+def _boost_runs(policy: MLFQ, workload: PreparedWorkload, i: int, boosts: int) -> int:
+    # After a boost the remaining burst walks levels 0..2 again; runs last at least a tick.
+    last = policy.levels[3].quantum if policy.levels[3].algo == "RR" else None
+    cap = 3 * boosts
+    return sum(
+        min(cap, max(0, b - _mlfq_runs(b, policy.demote_slices[:3], last))) for b in _cpu_bursts(workload, i)
+    )
+
+
+def _span(workload: PreparedWorkload, horizon: Optional[int], cs: int, dispatches: int) -> int:
+    """Upper estimate of the schedule length: the arrival window plus all CPU, I/O and switch time."""
+    if horizon is not None:
+        return int(horizon)
+    if not len(workload):
+        return 0
+    work = sum(sum(int(x) for x in io) if io else int(b) for b, io in zip(workload.bursts, workload.io_bursts))
+    return max(workload.arrivals) - min(workload.arrivals) + work + cs * dispatches
+
+
+def _dispatches(policy: Any, workload: PreparedWorkload, i: int) -> int:
+    bursts = _cpu_bursts(workload, i)
+    if isinstance(policy, (RR, LOTTERY, STRIDE)):
+        return sum(_split(b, policy.quantum) for b in bursts)
+    if isinstance(policy, CFS):
+        # Slices are never shorter than the granularity, so this is an upper bound.
+        return sum(_split(b, policy.min_granularity) for b in bursts)
+    if isinstance(policy, MLFQ):
+        last = policy.levels[3].quantum if policy.levels[3].algo == "RR" else None
+        return sum(_mlfq_runs(b, policy.demote_slices[:3], last) for b in bursts)
+    if isinstance(policy, MLQ):
+        level = policy.queues[policy._map_priority(workload.priorities[i])]
+        return sum(_split(b, level.quantum if level.algo == "RR" else None) for b in bursts)
+    return len(bursts)
+
+
+def estimate_cost(req: SchedulingRequest, workload: Optional[PreparedWorkload] = None, gantt: bool = True) -> CostEstimate:
+    """Predicted loop iterations, segments, run time and memory; raises ValueError like ``execute_schedule``."""
+    policy = _build_policy(req, [])
+    if workload is None:
+        workload = PreparedWorkload(req.processes)
+    horizon = release_horizon(workload, req.config or {}, [])
+
+    jobs = dispatches = io_events = 0
+    copies_of: List[int] = []
+    for i in range(len(workload)):
+        copies = 1
+        period = workload.periods[i]
+        if period is not None and horizon is not None:
+            copies = max(1, -(-(horizon - workload.arrivals[i]) // int(period)))
+        per_job = _dispatches(policy, workload, i)
+        copies_of.append(copies)
+        jobs += copies
+        dispatches += copies * per_job
+        io_events += copies * (len(workload.io_bursts[i] or ()) // 2)
+    boosts = 0
+    if isinstance(policy, MLFQ) and policy.boost_period is not None:
+        boosts = _span(workload, horizon, int(req.context_switch_time), dispatches) // policy.boost_period
+        if boosts:
+            dispatches += sum(c * _boost_runs(policy, workload, i, boosts) for i, c in enumerate(copies_of))
+    if policy.preempt_on_arrival:
+        dispatches += jobs + io_events
+
+    iterations = dispatches + jobs + io_events + boosts
+    cs = int(req.context_switch_time) > 0 or (req.config or {}).get("context_switch") is not None
+    # Each dispatch can add a run, a CS and an idle gap; merging usually removes some.
+    segments = dispatches * (2 if cs else 1) + jobs if gantt and req.gantt_format != "none" else 0
+
+    a, b, c = COEFFICIENTS["seconds"]
+    ma, mb, mc = COEFFICIENTS["memory"]
+    return CostEstimate(
+        jobs=jobs,
+        dispatches=dispatches,
+        iterations=iterations,
+        segments=segments,
+        seconds=a * iterations + b * segments + c * jobs,
+        memory_bytes=int(ma * iterations + mb * segments + mc * jobs),
+    )
+
+
+def combine(estimates: Sequence[CostEstimate], retained: bool = False) -> CostEstimate:
+    """Cost of running ``estimates`` one after another; with ``retained`` their memory is held at once."""
+    memory = [e.memory_bytes for e in estimates]
+    return CostEstimate(
+        jobs=sum(e.jobs for e in estimates),
+        dispatches=sum(e.dispatches for e in estimates),
+        iterations=sum(e.iterations for e in estimates),
+        segments=sum(e.segments for e in estimates),
+        seconds=sum(e.seconds for e in estimates),
+        memory_bytes=sum(memory) if retained else max(memory, default=0),
+    )
+
+
+def scaled(estimate: CostEstimate, factor: float) -> CostEstimate:
+    """``estimate`` run ``factor`` times over (or on that fraction of the workload); memory is per run."""
+    return CostEstimate(
+        jobs=math.ceil(estimate.jobs * factor),
+        dispatches=math.ceil(estimate.dispatches * factor),
+        iterations=math.ceil(estimate.iterations * factor),
+        segments=math.ceil(estimate.segments * factor),
+        seconds=estimate.seconds * factor,
+        memory_bytes=estimate.memory_bytes if factor >= 1 else math.ceil(estimate.memory_bytes * factor),
+    )
+
+
+def jobs_cost(processes: List[ProcessIn], workload: PreparedWorkload, jobs: Sequence[Dict[str, Any]]) -> CostEstimate:
+    """Metrics-only compare/batch jobs on one workload, run one at a time."""
+    return combine([estimate_cost(job_request(processes, job), workload, gantt=False) for job in jobs])
+
+
+class AdmissionRejected(ValueError):
+    def __init__(self, estimate: CostEstimate):
+        self.estimate = estimate
+        super().__init__(
+            f"Estimated cost {estimate.seconds:.1f}s / {estimate.memory_bytes >> 20} MiB exceeds the admission limits "
+            f"({MAX_SECONDS:g}s / {MAX_MEMORY_BYTES >> 20} MiB); raise time_slice or use gantt_format='none'"
+        )
+
+
+def admit(estimate: CostEstimate, pool: bool = True) -> CostEstimate:
+    """Set ``estimate.tier``; raises ``AdmissionRejected`` for a request over the limits.
+
+    ``pool=False`` is for callers that always run in-process (streams, sessions,
+    playback); an admitted request is then ``inline`` whatever its cost.
+    """
+    if estimate.seconds > MAX_SECONDS or estimate.memory_bytes > MAX_MEMORY_BYTES:
+        estimate.tier = "reject"
+        raise AdmissionRejected(estimate)
+    estimate.tier = "pool" if pool and estimate.seconds > INLINE_SECONDS else "inline"
+    return estimate
+
+
+# -- calibration ------------------------------------------------------------------------
+
+
+def _solve3(rows: Sequence[Tuple[float, float, float]], ys: Sequence[float]) -> List[float]:
+    """Non-negative least squares for three unknowns, by dropping negative terms and refitting."""
+    active = [0, 1, 2]
+    while True:
+        k = len(active)
+        ata = [[sum(r[active[i]] * r[active[j]] for r in rows) for j in range(k)] for i in range(k)]
+        aty = [sum(r[active[i]] * y for r, y in zip(rows, ys)) for i in range(k)]
+        # Gaussian elimination with partial pivoting.
+        m = [ata[i] + [aty[i]] for i in range(k)]
+        for col in range(k):
+            piv = max(range(col, k), key=lambda r: abs(m[r][col]))
+            m[col], m[piv] = m[piv], m[col]
+            if abs(m[col][col]) < 1e-300:
+                continue
+            for r in range(k):
+                if r != col:
+                    f = m[r][col] / m[col][col]
+                    m[r] = [x - f * y for x, y in zip(m[r], m[col])]
+        sol = [m[i][k] / m[i][i] if abs(m[i][i]) > 1e-300 else 0.0 for i in range(k)]
+        neg = [active[i] for i, v in enumerate(sol) if v < 0]
+        if not neg:
+            out = [0.0, 0.0, 0.0]
+            for idx, v in zip(active, sol):
+                out[idx] = v
+            return out
+        active = [a for a in active if a not in neg]
+        if not active:
+            return [0.0, 0.0, 0.0]
+
+
+def _benchmark_requests(seed: int) -> List[SchedulingRequest]:
+    rng = random.Random(seed)
+    out: List[SchedulingRequest] = []
+    for n in (200, 1000, 4000):
+        for algo, ts, cs in (("FCFS", None, 0), ("RR", 1, 0), ("RR", 4, 1), ("SRTF", None, 0), ("MLFQ", 2, 0), ("CFS", 2, 0)):
+            procs = [
+                {"pid": f"P{i}", "arrival_time": rng.randint(0, n * 5), "burst_time": rng.randint(1, 40), "priority": rng.randint(1, 4)}
+                for i in range(n)
+            ]
+            for fmt in ("objects", "none"):
+                out.append(
+                    SchedulingRequest(
+                        algorithm=algo, processes=procs, time_slice=ts, context_switch_time=cs, gantt_format=fmt
+                    )
+                )
+    return out
+
+
+def calibrate(seed: int = 0, repeat: int = 3) -> Dict[str, Any]:
+    """Time and trace the benchmark grid and fit both linear models."""
+    feats: List[Tuple[float, float, float]] = []
+    secs: List[float] = []
+    mems: List[float] = []
+    for req in _benchmark_requests(seed):
+        est = estimate_cost(req)
+        workload = PreparedWorkload(req.processes)
+        best = math.inf
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            execute_schedule(req, workload)
+            best = min(best, time.perf_counter() - t0)
+        tracemalloc.start()
+        res = execute_schedule(req, workload)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del res
+        feats.append((float(est.iterations), float(est.segments), float(est.jobs)))
+        secs.append(best)
+        mems.append(float(peak))
+
+    coeffs = {"seconds": _solve3(feats, secs), "memory": _solve3(feats, mems)}
+
+    def errors(key: str, ys: Sequence[float]) -> List[float]:
+        cs = coeffs[key]
+        return sorted(abs(sum(c * f for c, f in zip(cs, row)) - y) / y for row, y in zip(feats, ys) if y > 0)
+
+    report: Dict[str, Any] = dict(coeffs)
+    for key, ys in (("seconds", secs), ("memory", mems)):
+        errs = errors(key, ys)
+        report[f"{key}_relative_error"] = {"median": errs[len(errs) // 2], "max": errs[-1]}
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fit the admission cost model on this machine.")
+    parser.add_argument("--out", help="write the coefficients here (for ADMISSION_CALIBRATION)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    coeffs = calibrate(seed=args.seed, repeat=args.repeat)
+    text = json.dumps(coeffs, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+from scheduling.schemas import CompareRequest, SchedulingRequest
+
+V = TypeVar("V")
+
+
+def _digest(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def workload_hash(processes) -> str:
+    return _digest(
+        {
+            "processes": [
+                [str(p.pid), int(p.arrival_time), int(p.burst_time), p.priority]
+                + ([list(p.bursts), p.io_device] if p.bursts else [])
+                + (["rt", p.deadline, p.period] if p.deadline is not None or p.period is not None else [])
+                for p in processes
+            ]
+        }
+    )
+
+
+def request_hash(req: SchedulingRequest) -> str:
+    return _digest(
+        {
+            "algorithm": req.algorithm.upper(),
+            "workload": workload_hash(req.processes),
+            "context_switch_time": int(req.context_switch_time),
+            "time_slice": req.time_slice,
+            "config": req.config or {},
+        }
+    )
+
+
+def compare_hash(req: CompareRequest) -> str:
+    return _digest(
+        {
+            "algorithms": [str(a).strip().upper() for a in req.algorithms] if req.algorithms else None,
+            "workload": workload_hash(req.processes),
+            "context_switch_time": int(req.context_switch_time),
+            "time_slice": req.time_slice,
+            "config": req.config or {},
+        }
+    )
+
+
+class LRUCache(Generic[V]):
+    """LRU map bounded by entry count and, with ``weigh``, by the total weight of its values.
+
+    A value heavier than ``max_weight`` on its own is not kept at all.
+    """
+
+    def __init__(self, capacity: int, max_weight: Optional[int] = None, weigh: Optional[Callable[[V], int]] = None):
+        if int(capacity) <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = int(capacity)
+        self.max_weight = int(max_weight) if max_weight is not None and weigh is not None else None
+        self.weight = 0
+        self._weigh = weigh
+        self._items: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _size(self, value: V) -> int:
+        return int(self._weigh(value)) if self._weigh is not None else 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> List[V]:
+        """Insert ``value``; returns the values evicted to stay within the bounds, oldest first."""
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.weight -= self._size(old)
+            self._items[key] = value
+            self.weight += self._size(value)
+            evicted: List[V] = []
+            while self._items and (
+                len(self._items) > self.capacity or (self.max_weight is not None and self.weight > self.max_weight)
+            ):
+                gone = self._items.popitem(last=False)[1]
+                self.weight -= self._size(gone)
+                evicted.append(gone)
+            return evicted
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._items.pop(key, None)
+            if value is not None:
+                self.weight -= self._size(value)
+            return value
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,348 @@
+"""Differential harness: random workloads through the reference loop and every registered engine.
+
+Run from ``src/``::
+
+    python -m scheduling.difftest --cases 500 --seed 1
+    python -m scheduling.difftest --engine online --perf-procs 5000 --max-time-ratio 3
+
+Each case is a random CPU-only, aperiodic workload (the reference predates I/O
+bursts and periodic releases) plus a random configuration for one of
+``SUPPORTED_ALGOS``. Gantt segments
+(or, for metrics-only engines, span and idle totals) and per-process
+first_start/completion must match exactly; the first
+mismatch per engine is shrunk to a minimal counterexample. Time and peak
+memory are measured against the reference so ratio limits can gate an
+engine's performance claims.
+
+The reference freezes only the simulation loop. It drives the same policy
+classes as the engines, so a bug inside a policy shows up identically on
+both sides and is not caught here. The harness checks the engine loops
+(resumption, sinks, totals) against each other, not the policies.
+
+On the small default corpus the resumable ``Engine`` costs about 1.25x the
+reference. The fixed per-run setup dominates there. It is about 1.1x on
+thousands of processes, mostly the pending-arrival heap that online
+submission and I/O wake-ups need.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from scheduling.engine import Engine, Policy, ProcState, ScheduleTotals, Segment, simulate, simulate_totals
+from scheduling.reference import reference_simulate
+from scheduling.schemas import SchedulingRequest
+from scheduling.service import SUPPORTED_ALGOS, _build_policy
+from scheduling.sink import SegmentSink
+from scheduling.workload import PreparedWorkload
+
+# Engines return either the merged Gantt or, for metrics-only engines, ScheduleTotals.
+EngineFn = Callable[[List[ProcState], Policy, int], Tuple[Any, List[ProcState]]]
+Fingerprint = Tuple[
+    Optional[List[Tuple[int, int, str]]],
+    List[Tuple[str, Optional[int], Optional[int]]],
+    Tuple[int, int, int],
+]
+
+
+@dataclass
+class EngineSpec:
+    name: str
+    fn: EngineFn
+    max_time_ratio: Optional[float] = None
+    max_mem_ratio: Optional[float] = None
+
+
+ENGINES: Dict[str, EngineSpec] = {}
+
+
+def register_engine(
+    name: str,
+    fn: EngineFn,
+    max_time_ratio: Optional[float] = None,
+    max_mem_ratio: Optional[float] = None,
+) -> None:
+    ENGINES[name] = EngineSpec(name, fn, max_time_ratio, max_mem_ratio)
+
+
+def _online_simulate(
+    processes: List[ProcState],
+    policy: Policy,
+    context_switch_time: int,
+) -> Tuple[List[Segment], List[ProcState]]:
+    # Submit each process only once the clock reaches its arrival, pausing at every arrival.
+    engine = Engine(policy, context_switch_time)
+    for p in sorted(processes, key=lambda p: (p.arrival_time, p.pid)):
+        engine.run(p.arrival_time)
+        engine.submit(p)
+    engine.run(None)
+    return engine.gantt(final=True), processes
+
+
+def _sink_simulate(
+    processes: List[ProcState],
+    policy: Policy,
+    context_switch_time: int,
+) -> Tuple[List[Segment], List[ProcState]]:
+    # Tiny chunks so that nearly every case exercises the spill file.
+    with SegmentSink(chunk_segments=4) as sink:
+        simulate_totals(processes, policy, context_switch_time, sink=sink)
+        return [Segment(s, e, pid) for s, e, pid in sink], processes
+
+
+register_engine("engine", simulate)
+register_engine("online", _online_simulate)
+register_engine("totals", simulate_totals, max_mem_ratio=1.0)
+register_engine("sink", _sink_simulate)
+
+
+@dataclass
+class Case:
+    algorithm: str
+    processes: List[Dict[str, Any]]
+    context_switch_time: int = 0
+    time_slice: Optional[int] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+
+    def request(self) -> SchedulingRequest:
+        return SchedulingRequest(
+            algorithm=self.algorithm,
+            processes=self.processes,
+            context_switch_time=self.context_switch_time,
+            time_slice=self.time_slice,
+            config=self.config,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, sort_keys=True)
+
+
+def random_case(rng: random.Random, max_procs: int = 12, max_time: int = 40, algorithm: Optional[str] = None) -> Case:
+    algo = algorithm or rng.choice(sorted(SUPPORTED_ALGOS))
+    n = rng.randint(1, max_procs)
+    processes = [
+        {
+            "pid": f"P{i}",
+            "arrival_time": rng.randint(0, max_time),
+            "burst_time": rng.randint(1, max(1, max_time // 2)),
+            "priority": rng.choice([None, 0, 1, 2, 3, 4]),
+        }
+        for i in range(n)
+    ]
+    if algo in {"EDF", "RM"}:
+        for p in processes:
+            if rng.random() < 0.7:
+                p["deadline"] = rng.randint(p["burst_time"], max_time)
+    config: Dict[str, Any] = {}
+    if algo == "MLQ" and rng.random() < 0.7:
+        config["queues"] = [
+            {"algorithm": rng.choice(["RR", "FCFS", "SJF", "HRRN"]), "time_slice": rng.randint(1, 6)}
+            for _ in range(4)
+        ]
+        config["priority_mapping"] = rng.choice(["1-4", "0-3"])
+    if algo == "MLFQ" and rng.random() < 0.7:
+        config["time_slices"] = [rng.randint(1, 8) for _ in range(3)] + [None]
+    if algo in {"LOTTERY", "STRIDE"} and rng.random() < 0.5:
+        config["tickets"] = {p["pid"]: rng.randint(1, 500) for p in processes if rng.random() < 0.5}
+        config["seed"] = rng.randint(0, 1000)
+    return Case(
+        algorithm=algo,
+        processes=processes,
+        context_switch_time=rng.choice([0, 0, 1, 2]),
+        time_slice=rng.randint(1, 6),
+        config=config,
+    )
+
+
+def _fingerprint(out: Any, procs: Sequence[ProcState]) -> Fingerprint:
+    metrics = [(p.pid, p.first_start, p.completion_time) for p in procs]
+    if isinstance(out, ScheduleTotals):
+        return None, metrics, (out.start, out.end, out.idle_time) if out.end > out.start else (0, 0, 0)
+    segments: Sequence[Segment] = out
+    totals = (0, 0, 0)
+    if segments:
+        idle = sum(s.end - s.start for s in segments if s.pid == "IDLE")
+        totals = (segments[0].start, segments[-1].end, idle)
+    return [(s.start, s.end, s.pid) for s in segments], metrics, totals
+
+
+def run_case(case: Case, fn: EngineFn, measure_memory: bool = False) -> Tuple[Fingerprint, float, int]:
+    req = case.request()
+    procs = PreparedWorkload(req.processes).states()
+    policy = _build_policy(req, [])
+    if measure_memory:
+        tracemalloc.start()
+        segments, out = fn(procs, policy, int(req.context_switch_time))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return _fingerprint(segments, out), 0.0, peak
+    t0 = time.perf_counter()
+    segments, out = fn(procs, policy, int(req.context_switch_time))
+    return _fingerprint(segments, out), time.perf_counter() - t0, 0
+
+
+def mismatch(case: Case, fn: EngineFn) -> Optional[str]:
+    try:
+        expected, _, _ = run_case(case, reference_simulate)
+    except ValueError:
+        return None
+    try:
+        got, _, _ = run_case(case, fn)
+    except Exception as e:  # an engine crash is a divergence too
+        return f"raised {type(e).__name__}: {e}"
+    if got[0] is not None and got[0] != expected[0]:
+        return f"gantt differs: expected {expected[0]} got {got[0]}"
+    if got[1] != expected[1]:
+        return f"metrics differ: expected {expected[1]} got {got[1]}"
+    if got[2] != expected[2]:
+        return f"totals (start, end, idle) differ: expected {expected[2]} got {got[2]}"
+    return None
+
+
+def shrink(case: Case, fn: EngineFn, budget: int = 500) -> Case:
+    progress = True
+    while progress and budget > 0:
+        progress = False
+        candidates: List[Case] = []
+        for i in range(len(case.processes)):
+            if len(case.processes) > 1:
+                candidates.append(replace(case, processes=case.processes[:i] + case.processes[i + 1:]))
+            p = case.processes[i]
+            for key, smaller in (("burst_time", max(1, p["burst_time"] // 2)), ("arrival_time", p["arrival_time"] // 2)):
+                if smaller != p[key]:
+                    procs = list(case.processes)
+                    procs[i] = dict(p, **{key: smaller})
+                    candidates.append(replace(case, processes=procs))
+        if case.context_switch_time:
+            candidates.append(replace(case, context_switch_time=0))
+        for cand in candidates:
+            budget -= 1
+            if mismatch(cand, fn) is not None:
+                case = cand
+                progress = True
+                break
+            if budget <= 0:
+                break
+    return case
+
+
+@dataclass
+class EngineReport:
+    name: str
+    cases: int = 0
+    mismatches: int = 0
+    counterexample: Optional[str] = None
+    detail: Optional[str] = None
+    ref_time: float = 0.0
+    time: float = 0.0
+    ref_mem: int = 0
+    mem: int = 0
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def time_ratio(self) -> Optional[float]:
+        return self.time / self.ref_time if self.ref_time > 0 else None
+
+    @property
+    def mem_ratio(self) -> Optional[float]:
+        return self.mem / self.ref_mem if self.ref_mem > 0 else None
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatches == 0 and not self.failures
+
+
+def _measure(report: EngineReport, case: Case, fn: EngineFn, repeat: int) -> None:
+    for _ in range(repeat):
+        report.ref_time += run_case(case, reference_simulate)[1]
+        report.time += run_case(case, fn)[1]
+    report.ref_mem = max(report.ref_mem, run_case(case, reference_simulate, measure_memory=True)[2])
+    report.mem = max(report.mem, run_case(case, fn, measure_memory=True)[2])
+
+
+def run(
+    cases: int = 300,
+    seed: int = 0,
+    engines: Optional[Sequence[str]] = None,
+    perf_procs: int = 0,
+    perf_repeat: int = 3,
+    max_time_ratio: Optional[float] = None,
+    max_mem_ratio: Optional[float] = None,
+) -> List[EngineReport]:
+    specs = [ENGINES[name] for name in (engines or sorted(ENGINES))]
+    rng = random.Random(seed)
+    corpus = [random_case(rng) for _ in range(cases)]
+    perf_corpus = [
+        random_case(random.Random(seed * 1000 + i), max_procs=perf_procs, max_time=perf_procs, algorithm=algo)
+        for i, algo in enumerate(sorted(SUPPORTED_ALGOS))
+    ] if perf_procs > 0 else []
+
+    reports: List[EngineReport] = []
+    for spec in specs:
+        report = EngineReport(spec.name)
+        for case in corpus:
+            report.cases += 1
+            detail = mismatch(case, spec.fn)
+            if detail is None:
+                continue
+            report.mismatches += 1
+            if report.counterexample is None:
+                small = shrink(case, spec.fn)
+                report.counterexample = small.to_json()
+                report.detail = mismatch(small, spec.fn)
+
+        for case in perf_corpus or corpus:
+            _measure(report, case, spec.fn, perf_repeat if perf_corpus else 1)
+
+        time_limit = spec.max_time_ratio if max_time_ratio is None else max_time_ratio
+        mem_limit = spec.max_mem_ratio if max_mem_ratio is None else max_mem_ratio
+        if time_limit is not None and report.time_ratio is not None and report.time_ratio > time_limit:
+            report.failures.append(f"time ratio {report.time_ratio:.2f} > {time_limit}")
+        if mem_limit is not None and report.mem_ratio is not None and report.mem_ratio > mem_limit:
+            report.failures.append(f"memory ratio {report.mem_ratio:.2f} > {mem_limit}")
+        reports.append(report)
+    return reports
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES), help="repeatable; default: all")
+    parser.add_argument("--perf-procs", type=int, default=0, help="size of the per-algorithm performance workloads")
+    parser.add_argument("--perf-repeat", type=int, default=3)
+    parser.add_argument("--max-time-ratio", type=float, default=None)
+    parser.add_argument("--max-mem-ratio", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    reports = run(
+        cases=args.cases,
+        seed=args.seed,
+        engines=args.engine,
+        perf_procs=args.perf_procs,
+        perf_repeat=args.perf_repeat,
+        max_time_ratio=args.max_time_ratio,
+        max_mem_ratio=args.max_mem_ratio,
+    )
+    for r in reports:
+        tr = f"{r.time_ratio:.2f}x" if r.time_ratio is not None else "-"
+        mr = f"{r.mem_ratio:.2f}x" if r.mem_ratio is not None else "-"
+        status = "ok" if r.ok else "FAIL"
+        print(f"{r.name:<12} {status:<4} cases={r.cases} mismatches={r.mismatches} time={tr} mem={mr}")
+        if r.counterexample:
+            print(f"  counterexample: {r.counterexample}")
+            print(f"  {r.detail}")
+        for f in r.failures:
+            print(f"  {f}")
+    return 0 if all(r.ok for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""Coordinator/worker execution of compare and batch runs.
+
+Start workers (from ``src/``) and point them at the API process::
+
+    WORKER_REGISTRATION_TOKEN=... python -m scheduling.distributed worker --port 9101 --coordinator http://127.0.0.1:8000
+
+The coordinator ships workloads to registered workers and trusts their
+results, so registration is closed unless ``WORKER_REGISTRATION_TOKEN`` (sent
+as ``X-Worker-Token``) or ``WORKER_ALLOWLIST`` (comma-separated ``host`` or
+``host:port``) is set. With both set, a worker must pass both.
+
+Protocol (plain HTTP + JSON):
+
+* ``GET  /health``                 liveness probe.
+* ``GET  /workloads/<hash>``       200 if the worker already holds the workload.
+* ``PUT  /workloads/<hash>``       ship the process list once; later jobs refer to it by hash.
+* ``POST /run``                    ``{"workload": hash, "jobs": [{"id", "algorithm", ...}]}``;
+  the reply streams one JSON object per line as each job finishes. A job with
+  ``"metrics": true`` also gets the run-store metrics of its run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hmac
+import http.client
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from scheduling.cache import LRUCache, workload_hash
+from scheduling.schemas import ProcessIn
+from scheduling.service import run_job
+from scheduling.store import run_metrics
+from scheduling.workload import PreparedWorkload
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+SHARD_SIZE = 4
+TOKEN_HEADER = "X-Worker-Token"
+
+
+def check_registration(url: str, token: Optional[str]) -> None:
+    """Raise ``PermissionError`` unless ``url`` may register under the env token and allowlist."""
+    expected = os.environ.get("WORKER_REGISTRATION_TOKEN", "")
+    allowlist = [a.strip().lower() for a in os.environ.get("WORKER_ALLOWLIST", "").split(",") if a.strip()]
+    if not expected and not allowlist:
+        raise PermissionError("Worker registration is disabled; set WORKER_REGISTRATION_TOKEN or WORKER_ALLOWLIST")
+    if expected and not hmac.compare_digest((token or "").encode("utf-8"), expected.encode("utf-8")):
+        raise PermissionError("Invalid worker token")
+    if allowlist:
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        hostport = f"[{host}]:{parsed.port}" if ":" in host else f"{host}:{parsed.port}"
+        if host not in allowlist and hostport not in allowlist:
+            raise PermissionError(f"Worker {url} is not in WORKER_ALLOWLIST")
+
+
+class WorkloadMissing(RuntimeError):
+    """The worker no longer holds the workload (evicted from its cache, or restarted)."""
+
+
+def _process_rows(processes: Sequence[ProcessIn]) -> List[Dict[str, Any]]:
+    return [p.dict(exclude_none=True) for p in processes]
+
+
+class _WorkerHandler(BaseHTTPRequestHandler):
+    server: "WorkerServer"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        log.debug("worker %s: " + fmt, self.server.url, *args)
+
+    def _json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._json(200, {"ok": True, "workloads": len(self.server.workloads)})
+        elif self.path.startswith("/workloads/"):
+            found = self.server.workloads.get(self.path.rsplit("/", 1)[-1]) is not None
+            self._json(200 if found else 404, {"found": found})
+        else:
+            self._json(404, {"detail": "Not found"})
+
+    def do_PUT(self) -> None:
+        if not self.path.startswith("/workloads/"):
+            self._json(404, {"detail": "Not found"})
+            return
+        key = self.path.rsplit("/", 1)[-1]
+        try:
+            processes = [ProcessIn.parse_obj(p) for p in self._body()]
+            if workload_hash(processes) != key:
+                raise ValueError("workload hash mismatch")
+            self.server.workloads.put(key, (processes, PreparedWorkload(processes)))
+        except ValueError as e:
+            self._json(422, {"detail": str(e)})
+            return
+        self._json(200, {"stored": key})
+
+    def do_POST(self) -> None:
+        if self.path != "/run":
+            self._json(404, {"detail": "Not found"})
+            return
+        payload = self._body()
+        entry = self.server.workloads.get(payload.get("workload"))
+        if entry is None:
+            self._json(409, {"detail": "Unknown workload"})
+            return
+        processes, workload = entry
+
+        # Stream one line per finished job; the coordinator keeps whatever arrived if we die mid-way.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for job in payload.get("jobs") or []:
+            try:
+                line = _run_line(processes, workload, job)
+            except ValueError as e:
+                line = {"id": job["id"], "error": str(e)}
+            self.wfile.write((json.dumps(line) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def _run_line(processes: List[ProcessIn], workload: PreparedWorkload, job: Dict[str, Any]) -> Dict[str, Any]:
+    runs: list = []
+    line: Dict[str, Any] = {"id": job["id"], "result": run_job(processes, workload, job, lambda _req, res: runs.append(res))}
+    if job.get("metrics"):
+        line["metrics"] = run_metrics(runs[0])
+    return line
+
+
+class WorkerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, cache_size: int = 16):
+        super().__init__((host, port), _WorkerHandler)
+        self.workloads: LRUCache[Tuple[List[ProcessIn], PreparedWorkload]] = LRUCache(cache_size)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class WorkerClient:
+    def __init__(self, url: str, timeout: float = 60.0):
+        parsed = urlparse(url)
+        self.url = url.rstrip("/")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self.alive = True
+        self.shipped: set = set()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        conn = self._conn()
+        try:
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            raw = resp.read()
+            return resp.status, json.loads(raw or b"null")
+        finally:
+            conn.close()
+
+    def healthy(self) -> bool:
+        try:
+            return self._request("GET", "/health")[0] == 200
+        except (OSError, http.client.HTTPException, ValueError):
+            return False
+
+    def ensure_workload(self, key: str, rows: List[Dict[str, Any]]) -> None:
+        if key in self.shipped:
+            return
+        status, _ = self._request("GET", f"/workloads/{key}")
+        if status != 200:
+            status, detail = self._request("PUT", f"/workloads/{key}", rows)
+            if status != 200:
+                raise RuntimeError(f"worker {self.url} rejected workload: {detail}")
+        self.shipped.add(key)
+
+    def run(self, key: str, jobs: List[Dict[str, Any]]):
+        conn = self._conn()
+        try:
+            conn.request(
+                "POST",
+                "/run",
+                body=json.dumps({"workload": key, "jobs": jobs}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            resp = conn.getresponse()
+            if resp.status == 409:
+                self.shipped.discard(key)
+                raise WorkloadMissing(f"worker {self.url} lost the workload")
+            if resp.status != 200:
+                raise RuntimeError(f"worker {self.url} returned {resp.status}")
+            for line in resp:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+
+class Coordinator:
+    """Registry of workers plus sharded fan-out of jobs with retry on worker failure."""
+
+    def __init__(self):
+        self._workers: Dict[str, WorkerClient] = {}
+        self._lock = threading.Lock()
+
+    def register(self, url: str) -> None:
+        with self._lock:
+            self._workers[url.rstrip("/")] = WorkerClient(url)
+
+    def unregister(self, url: str) -> None:
+        with self._lock:
+            self._workers.pop(url.rstrip("/"), None)
+
+    def workers(self) -> List[WorkerClient]:
+        with self._lock:
+            candidates = list(self._workers.values())
+        for w in candidates:
+            if not w.alive and w.healthy():
+                w.alive = True
+        return [w for w in candidates if w.alive]
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"url": w.url, "alive": w.alive} for w in self._workers.values()]
+
+    def run(
+        self,
+        processes: Sequence[ProcessIn],
+        jobs: List[Dict[str, Any]],
+        on_metrics: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Summaries in job order; ``on_metrics(i, run_metrics)`` is called once per job when given."""
+        if on_metrics is not None:
+            jobs = [dict(job, metrics=True) for job in jobs]
+        key = workload_hash(processes)
+        rows = _process_rows(processes)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        attempts = [0] * len(jobs)
+        todo: "queue.Queue[int]" = queue.Queue()
+        for i in range(len(jobs)):
+            todo.put(i)
+        lock = threading.Lock()
+        outstanding = [len(jobs)]
+
+        def drive(worker: WorkerClient) -> None:
+            while worker.alive:
+                try:
+                    shard = [todo.get(timeout=0.05)]
+                except queue.Empty:
+                    with lock:
+                        if outstanding[0] <= 0:
+                            return
+                    continue
+                while len(shard) < SHARD_SIZE:
+                    try:
+                        shard.append(todo.get_nowait())
+                    except queue.Empty:
+                        break
+                pending = set(shard)
+                try:
+                    for reship in range(MAX_ATTEMPTS):
+                        worker.ensure_workload(key, rows)
+                        try:
+                            for line in worker.run(key, [dict(jobs[i], id=i) for i in sorted(pending)]):
+                                i = int(line["id"])
+                                with lock:
+                                    if results[i] is None:
+                                        results[i] = line
+                                        outstanding[0] -= 1
+                                pending.discard(i)
+                            break
+                        except WorkloadMissing:
+                            # The 409 comes before any result, so the same shard is simply sent again.
+                            if reship == MAX_ATTEMPTS - 1:
+                                raise
+                    if pending:
+                        raise RuntimeError("worker closed the stream early")
+                except (OSError, http.client.HTTPException, RuntimeError, ValueError) as e:
+                    log.warning("worker %s failed: %s", worker.url, e)
+                    worker.alive = False
+                    for i in pending:
+                        attempts[i] += 1
+                        if attempts[i] < MAX_ATTEMPTS:
+                            todo.put(i)
+                        else:
+                            with lock:
+                                outstanding[0] -= 1
+
+        threads = [threading.Thread(target=drive, args=(w,), daemon=True) for w in self.workers()]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Whatever the workers could not finish (or no workers at all) runs here.
+        leftover = [i for i in range(len(jobs)) if results[i] is None]
+        if leftover:
+            workload = PreparedWorkload(processes)
+            for i in leftover:
+                if attempts[i] >= MAX_ATTEMPTS:
+                    log.warning("job %d failed on %d workers; running locally", i, attempts[i])
+                try:
+                    results[i] = _run_line(list(processes), workload, dict(jobs[i], id=i))
+                except ValueError as e:
+                    results[i] = {"id": i, "error": str(e)}
+
+        out: List[Dict[str, Any]] = []
+        for line in results:
+            assert line is not None
+            if "error" in line:
+                raise ValueError(line["error"])
+            out.append(line["result"])
+        if on_metrics is not None:
+            for i, line in enumerate(results):
+                if "metrics" in line:
+                    on_metrics(i, line["metrics"])
+        return out
+
+
+coordinator = Coordinator()
+
+
+def serve_worker(
+    host: str,
+    port: int,
+    coordinator_url: Optional[str] = None,
+    advertise: Optional[str] = None,
+    token: Optional[str] = None,
+) -> None:
+    server = WorkerServer(host, port)
+    url = advertise or server.url
+    if coordinator_url:
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers[TOKEN_HEADER] = token
+        req = urllib.request.Request(
+            coordinator_url.rstrip("/") + "/workers/register",
+            data=json.dumps({"url": url}).encode("utf-8"),
+            headers=headers,
+            method="POST",
+        )
+        urllib.request.urlopen(req, timeout=10).close()
+    print(f"worker listening on {url}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Distributed simulation worker")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("worker")
+    w.add_argument("--host", default="127.0.0.1")
+    w.add_argument("--port", type=int, default=0)
+    w.add_argument("--coordinator", default=None, help="API base URL to register with")
+    w.add_argument("--advertise", default=None, help="URL the coordinator should use to reach this worker")
+    w.add_argument(
+        "--token",
+        default=os.environ.get("WORKER_REGISTRATION_TOKEN"),
+        help="registration token (default: $WORKER_REGISTRATION_TOKEN)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    serve_worker(args.host, args.port, args.coordinator, args.advertise, args.token)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
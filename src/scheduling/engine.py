@@ -1,7 +1,20 @@
 from __future__ import annotations
 
+import heapq
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from scheduling import eventlog as ev
+from scheduling.eventlog import EventLog
+from scheduling.queuestats import QueueStats
+from scheduling.sink import SegmentSink
+from scheduling.switching import SwitchCostModel
+
+DEFAULT_IO_DEVICE = "io"
+
+_ARRIVAL = 0
+_WAKEUP = 1
 
 
 @dataclass
@@ -10,6 +23,9 @@ class ProcState:
     arrival_time: int
     burst_time: int
     priority: Optional[int] = None
+    # Alternating CPU/I/O burst lengths (CPU first and last); None means one CPU burst.
+    bursts: Optional[List[int]] = None
+    io_device: Optional[str] = None
 
     remaining: int = field(init=False)
     first_start: Optional[int] = None
@@ -18,8 +34,57 @@ class ProcState:
     quantum_left: Optional[int] = None
     level: int = 0
 
+    burst_index: int = 0
+    io_time: int = 0
+    io_wait: int = 0
+
+    # Real-time jobs: a periodic task releases job k+1 one period after job k, until release_until.
+    relative_deadline: Optional[int] = None
+    period: Optional[int] = None
+    release_until: Optional[int] = None
+    task: Optional[str] = None
+    job: int = 0
+    # Index into the engine's per-pid arrays (cost-model runs only); -1 until first dispatch.
+    slot: int = -1
+    deadline: Optional[int] = field(init=False)
+
     def __post_init__(self):
-        self.remaining = int(self.burst_time)
+        self.remaining = int(self.bursts[0]) if self.bursts else int(self.burst_time)
+        rel = self.relative_deadline if self.relative_deadline is not None else self.period
+        self.deadline = int(self.arrival_time) + int(rel) if rel is not None else None
+
+    def next_job(self) -> Optional["ProcState"]:
+        """The next release of this periodic task, or None once past ``release_until``."""
+        if self.period is None:
+            return None
+        at = int(self.arrival_time) + int(self.period)
+        if self.release_until is not None and at >= self.release_until:
+            return None
+        task = self.task if self.task is not None else self.pid
+        return ProcState(
+            pid=f"{task}#{self.job + 1}",
+            arrival_time=at,
+            burst_time=self.burst_time,
+            priority=self.priority,
+            bursts=list(self.bursts) if self.bursts else None,
+            io_device=self.io_device,
+            relative_deadline=self.relative_deadline,
+            period=self.period,
+            release_until=self.release_until,
+            task=task,
+            job=self.job + 1,
+        )
+
+    def has_io_next(self) -> bool:
+        return bool(self.bursts) and self.burst_index + 1 < len(self.bursts)
+
+
+@dataclass
+class IODevice:
+    name: str
+    free_at: int = 0
+    busy_time: int = 0
+    served: int = 0
 
 
 @dataclass
@@ -29,6 +94,21 @@ class Segment:
     pid: str
 
 
+@dataclass
+class ScheduleTotals:
+    """Running counters that stand in for the Gantt when segments are not recorded."""
+
+    start: int = 0
+    end: int = 0
+    idle_time: int = 0
+    cs_time: int = 0
+    cs_count: int = 0
+
+    @property
+    def busy_time(self) -> int:
+        return self.end - self.start - self.idle_time
+
+
 def merge_segments(segments: List[Segment]) -> List[Segment]:
     if not segments:
         return []
@@ -45,6 +125,8 @@ def merge_segments(segments: List[Segment]) -> List[Segment]:
 class Policy:
     name: str
     preempt_on_arrival: bool = False
+    # True when on_timer moves every queued process back to the top level (MLFQ boost).
+    timer_boosts: bool = False
 
     def on_arrival(self, p: ProcState, now: int) -> None:  # pragma: no cover
         raise NotImplementedError
@@ -64,135 +146,474 @@ class Policy:
     def put_back(self, p: ProcState, now: int) -> None:
         self.on_arrival(p, now)
 
+    def next_timer(self, after: int) -> Optional[int]:
+        """First policy timer strictly after ``after``, or None if the policy has none."""
+        return None
+
+    def on_timer(self, now: int) -> None:
+        pass
+
+
+class Engine:
+    """Resumable form of the ``simulate`` loop.
+
+    ``run(horizon)`` advances the schedule as far as it can without
+    committing anything that an arrival at or after ``horizon`` could still
+    change, so processes may be submitted between calls (online mode).
+    ``run(None)`` drains the schedule as the batch simulator does.
+    """
+
+    def __init__(
+        self,
+        policy: Policy,
+        context_switch_time: int,
+        record_segments: bool = True,
+        sink: Optional[SegmentSink] = None,
+        switch_cost: Optional[SwitchCostModel] = None,
+        queue_stats: Optional[QueueStats] = None,
+        event_log: Optional[EventLog] = None,
+        on_complete: Optional[Callable[[ProcState], None]] = None,
+    ):
+        self.policy = policy
+        self.context_switch_time = int(context_switch_time)
+        self.record_segments = record_segments
+        # Bounded-memory alternative to self.segments; only used when record_segments is False.
+        self.sink = sink
+        # None keeps the built-in flat rule; a model also needs per-pid last-run times.
+        self.switch_cost = switch_cost
+        self.queue_stats = queue_stats
+        self.event_log = event_log
+        # Called with each process as it completes; online sessions keep running sums with it.
+        self.on_complete = on_complete
+        self._last_ran = array("q")
+        self._prev_slot = -1
+        self.time = 0
+        self.done = 0
+        self.submitted = 0
+        self.current: Optional[ProcState] = None
+        self.segments: List[Segment] = []
+        self.totals = ScheduleTotals()
+        # Last two emitted (start, end, pid) triples; enough for the CS check and the end-of-run fix-ups.
+        self._tail_prev: Optional[Tuple[int, int, str]] = None
+        self._tail_last: Optional[Tuple[int, int, str]] = None
+        self.last_run_pid: Optional[str] = None
+        self.last_run_end: Optional[int] = None
+
+        # Arrivals and I/O wake-ups share one heap of (time, kind, pid, seq, proc).
+        self._pending: List[Tuple[int, int, str, int, ProcState]] = []
+        self.devices: Dict[str, IODevice] = {}
+        self._seq = 0
+        # Work already decided but not yet committed: ("cs", p, cs_end) or ("run", p, None).
+        self._phase: Optional[Tuple[str, ProcState, Optional[int]]] = None
+        # Policy timers are kept apart from arrivals so they never split idle gaps or cap runs.
+        self._next_timer = policy.next_timer(0)
+        # Jobs of periodic tasks released by the engine itself, in release order.
+        self.spawned: List[ProcState] = []
+
+    def submit(self, p: ProcState) -> None:
+        heapq.heappush(self._pending, (int(p.arrival_time), _ARRIVAL, str(p.pid), self._seq, p))
+        self._seq += 1
+        self.submitted += 1
+
+    def submit_sorted(self, procs: Sequence[ProcState]) -> None:
+        for p in procs:
+            # Already ordered by (arrival_time, pid): appending keeps the heap invariant.
+            self._pending.append((int(p.arrival_time), _ARRIVAL, str(p.pid), self._seq, p))
+            self._seq += 1
+        if len(self._pending) != len(procs):
+            heapq.heapify(self._pending)
+        self.submitted += len(procs)
+
+    def next_arrival_time(self) -> Optional[int]:
+        return self._pending[0][0] if self._pending else None
+
+    def push_arrivals(self, up_to: int) -> None:
+        if self._next_timer is not None:
+            self._push_with_timers(up_to)
+            return
+        qs = self.queue_stats
+        log = self.event_log
+        while self._pending and self._pending[0][0] <= up_to:
+            t, kind, _, _, p = heapq.heappop(self._pending)
+            if kind == _WAKEUP:
+                self.policy.put_back(p, t)
+            else:
+                self.policy.on_arrival(p, p.arrival_time)
+                if p.period is not None:
+                    self._release_next(p)
+            if qs is not None:
+                qs.enter(t, p.pid, p.level)
+            if log is not None:
+                log.record(t, ev.WAKEUP if kind == _WAKEUP else ev.ARRIVAL, p.pid, p.level)
+
+    def _release_next(self, p: ProcState) -> None:
+        # Releases are generated one job ahead, so the pending heap holds one entry per task.
+        nxt = p.next_job()
+        if nxt is not None:
+            self.submit(nxt)
+            self.spawned.append(nxt)
+
+    def _push_with_timers(self, up_to: int) -> None:
+        # Timers fire before arrivals and wake-ups due at the same instant.
+        while True:
+            nt = self._next_timer
+            if nt is not None and nt <= up_to and (not self._pending or nt <= self._pending[0][0]):
+                nxt = self.policy.next_timer(nt)
+                if self.policy.timer_boosts and nxt is not None:
+                    # Later boosts due before the next arrival or wake-up would find every queued
+                    # process already at the top, so the first one stands for all of them.
+                    bound = min(up_to, self._pending[0][0]) if self._pending else up_to
+                    if nxt <= bound:
+                        nxt = self.policy.next_timer(bound)
+                self._next_timer = nxt
+                self.policy.on_timer(nt)
+                if self.policy.timer_boosts:
+                    if self.queue_stats is not None:
+                        self.queue_stats.boost(nt)
+                    if self.event_log is not None:
+                        self.event_log.record(nt, ev.BOOST, None)
+                continue
+            if not self._pending or self._pending[0][0] > up_to:
+                return
+            t, kind, _, _, p = heapq.heappop(self._pending)
+            if kind == _WAKEUP:
+                self.policy.put_back(p, t)
+            else:
+                self.policy.on_arrival(p, p.arrival_time)
+                if p.period is not None:
+                    self._release_next(p)
+            if self.queue_stats is not None:
+                self.queue_stats.enter(t, p.pid, p.level)
+            if self.event_log is not None:
+                self.event_log.record(t, ev.WAKEUP if kind == _WAKEUP else ev.ARRIVAL, p.pid, p.level)
+
+    def _block(self, p: ProcState, now: int) -> None:
+        """Send ``p`` to its I/O device (FCFS) and schedule the wake-up."""
+        io_len = int(p.bursts[p.burst_index + 1])
+        name = p.io_device or DEFAULT_IO_DEVICE
+        device = self.devices.get(name)
+        if device is None:
+            device = self.devices[name] = IODevice(name)
+        start = max(now, device.free_at)
+        device.free_at = start + io_len
+        device.busy_time += io_len
+        device.served += 1
+
+        p.io_wait += start - now
+        p.io_time += io_len
+        p.burst_index += 2
+        p.remaining = int(p.bursts[p.burst_index])
+        heapq.heappush(self._pending, (device.free_at, _WAKEUP, str(p.pid), self._seq, p))
+        self._seq += 1
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> Optional[ProcState]:
+        return self._phase[1] if self._phase is not None else None
+
+    def _emit(self, start: int, end: int, pid: str) -> None:
+        if self.record_segments:
+            self.segments.append(Segment(start, end, pid))
+        elif self.sink is not None:
+            self.sink.append(start, end, pid)
+        totals = self.totals
+        if self._tail_last is None:
+            totals.start = start
+        totals.end = end
+        if pid == "IDLE":
+            totals.idle_time += end - start
+        elif pid == "CS":
+            totals.cs_time += end - start
+            totals.cs_count += 1
+        self._tail_prev = self._tail_last
+        self._tail_last = (start, end, pid)
+
+    def _switch_cost(self, p: ProcState, now: int, back_to_back: bool) -> int:
+        if p.slot < 0:
+            p.slot = len(self._last_ran)
+            self._last_ran.append(-1)
+        last = self._last_ran[p.slot]
+        return self.switch_cost.cost(p.slot == self._prev_slot, back_to_back, now - last if last >= 0 else None)
+
+    def run(self, horizon: Optional[int] = None) -> bool:
+        """Advance towards ``horizon``; returns True once every submitted process is done."""
+        policy = self.policy
+        # The simulator's hot path: hooks and policy methods are looked up once, and the clock
+        # and the other per-step fields live in locals that are written back on every exit.
+        select = policy.select
+        max_continuous_run = policy.max_continuous_run
+        on_run = policy.on_run
+        preempt_on_arrival = policy.preempt_on_arrival
+        push_arrivals = self.push_arrivals
+        pending = self._pending
+        qs, log = self.queue_stats, self.event_log
+        switch_cost = self.switch_cost
+        cs_time = self.context_switch_time
+        segments = self.segments if self.record_segments else None
+        sink = self.sink
+        totals = self.totals
+        on_complete = self.on_complete
+
+        now = self.time
+        done = self.done
+        current = self.current
+        phase = self._phase
+        last_pid, last_end = self.last_run_pid, self.last_run_end
+        try:
+            # A step can only be committed once every arrival before its end is known: with a
+            # horizon, that is any time before it (later processes may still be submitted).
+            while done < self.submitted or phase is not None:
+                if phase is None:
+                    if horizon is not None and now >= horizon:
+                        return False
+                    if self._next_timer is not None or (pending and pending[0][0] <= now):
+                        push_arrivals(now)
+
+                    selected = select(now, current)
+                    if selected is None:
+                        na = pending[0][0] if pending else None
+                        if na is None:
+                            if horizon is None:
+                                break
+                            return False
+                        if horizon is not None and na > horizon:
+                            return False
+                        if na > now:
+                            self._emit(now, na, "IDLE")
+                            last_pid = last_end = None
+                            now = na
+                        current = None
+                        continue
+                    if current is not None and selected.pid != current.pid:
+                        current = None
+                    if qs is not None:
+                        qs.leave(now, selected.pid)
+
+                    # A switch follows a run that ended right now; after IDLE or CS, last_pid is None.
+                    back_to_back = last_pid is not None and last_end == now
+                    if switch_cost is not None:
+                        cost = self._switch_cost(selected, now, back_to_back)
+                        if cost > 0:
+                            phase = ("cs", selected, now + cost)
+                    elif cs_time > 0 and back_to_back and last_pid != selected.pid:
+                        phase = ("cs", selected, now + cs_time)
+                else:
+                    kind, selected, cs_end = phase
+                    if kind == "run":
+                        phase = None
+
+                if phase is not None:
+                    # Context switch to ``selected``, ending at cs_end.
+                    cs_end = phase[2]
+                    if horizon is not None and cs_end >= horizon:
+                        return False
+                    self._emit(now, cs_end, "CS")
+                    if log is not None:
+                        log.record(now, ev.CONTEXT_SWITCH, selected.pid, selected.level, cs_end - now)
+                    now = cs_end
+                    push_arrivals(now)
+                    last_pid = last_end = None
+                    phase = None
+
+                if selected.first_start is None:
+                    selected.first_start = now
+
+                remaining = selected.remaining
+                max_run = max_continuous_run(selected, now)
+                if max_run is None or max_run > remaining:
+                    max_run = remaining
+                stop_at_arrival = None
+                if preempt_on_arrival and pending:
+                    na = pending[0][0]
+                    if na > now:
+                        stop_at_arrival = na
+                        if na - now < max_run:
+                            max_run = na - now
+
+                if max_run <= 0:
+                    na = pending[0][0] if pending else None
+                    if na is None:
+                        if horizon is None:
+                            break
+                        return False
+                    if na > now:
+                        self._emit(now, na, "IDLE")
+                        last_pid = last_end = None
+                        now = na
+                    current = None
+                    continue
+
+                end = now + max_run
+                if horizon is not None and end >= horizon:
+                    # Resume with the same selection on the next call.
+                    phase = ("run", selected, None)
+                    return False
+
+                pid = selected.pid
+                if segments is not None:
+                    segments.append(Segment(now, end, pid))
+                elif sink is not None:
+                    sink.append(now, end, pid)
+                if self._tail_last is None:
+                    totals.start = now
+                totals.end = end
+                self._tail_prev = self._tail_last
+                self._tail_last = (now, end, pid)
+                if log is not None:
+                    log.record(now, ev.SELECT, pid, selected.level, max_run)
+                last_pid, last_end = pid, end
+                if switch_cost is not None:
+                    self._last_ran[selected.slot] = end
+                    self._prev_slot = selected.slot
+
+                now = end
+                remaining -= max_run
+                selected.remaining = remaining
+                if qs is not None:
+                    qs.ran(pid, selected.level, max_run)
+                on_run(selected, max_run, end)
+                if self._next_timer is not None or (pending and pending[0][0] <= end):
+                    push_arrivals(end)
+
+                if remaining == 0:
+                    current = None
+                    if selected.bursts and selected.burst_index + 1 < len(selected.bursts):
+                        if log is not None:
+                            log.record(end, ev.BLOCK, pid, selected.level, selected.bursts[selected.burst_index + 1])
+                        self._block(selected, end)
+                        continue
+                    selected.completion_time = end
+                    done += 1
+                    if log is not None:
+                        log.record(end, ev.COMPLETE, pid, selected.level)
+                    if on_complete is not None:
+                        self.done = done
+                        on_complete(selected)
+                    continue
+
+                if preempt_on_arrival and stop_at_arrival is not None and end == stop_at_arrival:
+                    current = selected
+                    if qs is not None:
+                        qs.enter(end, pid, selected.level)
+                    if log is not None:
+                        log.record(end, ev.PREEMPT, pid, selected.level, remaining)
+                    continue
+
+                if qs is None and log is None:
+                    policy.on_timeslice_expired(selected, end)
+                else:
+                    level = selected.level
+                    policy.on_timeslice_expired(selected, end)
+                    if log is not None:
+                        log.record(end, ev.QUANTUM, pid, level, selected.remaining)
+                        if selected.level > level:
+                            log.record(end, ev.DEMOTE, pid, selected.level, level)
+                    if qs is not None:
+                        if selected.level > level:
+                            qs.demoted(pid)
+                        qs.enter(end, pid, selected.level)
+                current = None
+        finally:
+            self.time = now
+            self.done = done
+            self.current = current
+            self._phase = phase
+            self.last_run_pid, self.last_run_end = last_pid, last_end
+
+        return self.done >= self.submitted and self._phase is None
+
+    def gantt(self, final: bool = False) -> List[Segment]:
+        # A final gantt may merge in place; otherwise the engine keeps running on self.segments.
+        segments = self.segments if final else [Segment(s.start, s.end, s.pid) for s in self.segments]
+        if len(segments) >= 2 and segments[-2].pid == "CS" and segments[-1].pid == "IDLE":
+            cs = segments[-2]
+            idle = segments[-1]
+            segments[-2] = Segment(cs.start, idle.end, "IDLE")
+            segments.pop()
+        if segments and segments[-1].pid == "CS":
+            segments.pop()
+        return merge_segments(segments)
+
+    def final_totals(self) -> ScheduleTotals:
+        """Totals matching ``gantt(final=True)``, including its trailing CS/IDLE fix-ups."""
+        src = self.totals
+        t = ScheduleTotals(src.start, src.end, src.idle_time, src.cs_time, src.cs_count)
+        prev, last = self._tail_prev, self._tail_last
+        if prev is not None and prev[2] == "CS" and last[2] == "IDLE":
+            cs_len = prev[1] - prev[0]
+            t.cs_time -= cs_len
+            t.cs_count -= 1
+            t.idle_time += cs_len
+        elif last is not None and last[2] == "CS":
+            t.cs_time -= last[1] - last[0]
+            t.cs_count -= 1
+            t.end = last[0]
+        return t
+
 
 def simulate(
     processes: List[ProcState],
     policy: Policy,
     context_switch_time: int,
+    arrival_order: Optional[Sequence[int]] = None,
+    switch_cost: Optional[SwitchCostModel] = None,
+    queue_stats: Optional[QueueStats] = None,
+    event_log: Optional[EventLog] = None,
 ) -> Tuple[List[Segment], List[ProcState]]:
 
-    n = len(processes)
-    if n == 0:
+    if not processes:
         return [], processes
-    arrival_sorted = sorted(processes, key=lambda p: (p.arrival_time, p.pid))
-    idx = 0
-    time = 0
-    done = 0
-    current: Optional[ProcState] = None
-    segments: List[Segment] = []
-    last_run_pid: Optional[str] = None
-    last_run_end: Optional[int] = None
-
-    def next_arrival_time() -> Optional[int]:
-        return arrival_sorted[idx].arrival_time if idx < n else None
-
-    def push_arrivals(up_to: int) -> None:
-        nonlocal idx
-        while idx < n and arrival_sorted[idx].arrival_time <= up_to:
-            p = arrival_sorted[idx]
-            policy.on_arrival(p, p.arrival_time)
-            idx += 1
-
-    first_arrival = arrival_sorted[0].arrival_time
-    if first_arrival > 0:
-        segments.append(Segment(0, first_arrival, "IDLE"))
-        time = first_arrival
-        last_run_pid = None
-        last_run_end = None
-
-    while done < n:
-        push_arrivals(time)
-
-        selected = policy.select(time, current)
-        if selected is None:
-            na = next_arrival_time()
-            if na is None:
-                break
-            if na > time:
-                segments.append(Segment(time, na, "IDLE"))
-                last_run_pid = None
-                last_run_end = None
-                time = na
-            current = None
-            continue
-        if current is not None and selected.pid != current.pid:
-            current = None
-
-        if (
-            context_switch_time > 0
-
-            and last_run_pid is not None
-            and last_run_pid != selected.pid
-            and last_run_end == time
-
-            and segments
-            and segments[-1].pid not in ("IDLE", "CS")
-        ):
-
-            cs_start = time
-            cs_end = time + context_switch_time
-            segments.append(Segment(cs_start, cs_end, "CS"))
-            time = cs_end
-            push_arrivals(time)
-            last_run_pid = None
-            last_run_end = None
-
-        if selected.first_start is None:
-            selected.first_start = time
-
-        max_run = policy.max_continuous_run(selected, time)
-        if max_run is None:
-            max_run = selected.remaining
-        max_run = min(max_run, selected.remaining)
-        stop_at_arrival = None
-        if policy.preempt_on_arrival:
-            na = next_arrival_time()
-            if na is not None and na > time:
-                stop_at_arrival = na
-                max_run = min(max_run, na - time)
-
-        if max_run <= 0:
-            na = next_arrival_time()
-            if na is None:
-                break
-            if na > time:
-                segments.append(Segment(time, na, "IDLE"))
-                last_run_pid = None
-                last_run_end = None
-                time = na
-            current = None
-            continue
-
-        start = time
-        end = time + max_run
-        segments.append(Segment(start, end, selected.pid))
-        last_run_pid = selected.pid
-        last_run_end = end
-
-        time = end
-        selected.remaining -= max_run
-        policy.on_run(selected, max_run, time)
-        push_arrivals(time)
-
-        if selected.remaining == 0:
-            selected.completion_time = time
-            done += 1
-            current = None
-            continue
-
-        if policy.preempt_on_arrival and stop_at_arrival is not None and time == stop_at_arrival:
-            current = selected
-            continue
-
-        policy.on_timeslice_expired(selected, time)
-        current = None
-
-    if len(segments) >= 2 and segments[-2].pid == "CS" and segments[-1].pid == "IDLE":
-        cs = segments[-2]
-        idle = segments[-1]
-        segments[-2] = Segment(cs.start, idle.end, "IDLE")
-        segments.pop()
-    if segments and segments[-1].pid == "CS":
-        segments.pop()
-
-    return merge_segments(segments), processes
\ No newline at end of file
+    if arrival_order is not None:
+        arrival_sorted = [processes[i] for i in arrival_order]
+    else:
+        arrival_sorted = sorted(processes, key=lambda p: (p.arrival_time, p.pid))
+
+    engine = Engine(policy, context_switch_time, switch_cost=switch_cost, queue_stats=queue_stats, event_log=event_log)
+    engine.submit_sorted(arrival_sorted)
+    engine.run(None)
+    if queue_stats is not None:
+        queue_stats.close(engine.final_totals().end)
+    return engine.gantt(final=True), (processes + engine.spawned) if engine.spawned else processes
+
+
+def simulate_totals(
+    processes: List[ProcState],
+    policy: Policy,
+    context_switch_time: int,
+    arrival_order: Optional[Sequence[int]] = None,
+    sink: Optional[SegmentSink] = None,
+    switch_cost: Optional[SwitchCostModel] = None,
+    queue_stats: Optional[QueueStats] = None,
+    event_log: Optional[EventLog] = None,
+) -> Tuple[ScheduleTotals, List[ProcState]]:
+    """Metrics-only ``simulate``: same schedule, but no Segment is ever allocated.
+
+    With a ``sink``, the merged Gantt is streamed into it (and finished) instead.
+    """
+    if not processes:
+        return ScheduleTotals(), processes
+    if arrival_order is not None:
+        arrival_sorted = [processes[i] for i in arrival_order]
+    else:
+        arrival_sorted = sorted(processes, key=lambda p: (p.arrival_time, p.pid))
+
+    engine = Engine(
+        policy,
+        context_switch_time,
+        record_segments=False,
+        sink=sink,
+        switch_cost=switch_cost,
+        queue_stats=queue_stats,
+        event_log=event_log,
+    )
+    engine.submit_sorted(arrival_sorted)
+    engine.run(None)
+    if sink is not None:
+        sink.finish()
+    totals = engine.final_totals()
+    if queue_stats is not None:
+        queue_stats.close(totals.end)
+    return totals, (processes + engine.spawned) if engine.spawned else processes
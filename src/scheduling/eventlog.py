@@ -0,0 +1,243 @@
+"""Fixed-width binary log of engine decisions, with time and pid indexes.
+
+Each record is 24 bytes: ``<qqIBb2x`` for time, argument, pid id, kind and
+queue level. The argument depends on the kind: run length for ``select``,
+remaining CPU time for ``preempt`` and ``quantum``, the previous level for
+``demote``, the switch length for ``cs`` and the I/O length for ``block``.
+Records are packed into a buffer and written out ``buffer_records`` at a
+time.
+
+The engine logs in non-decreasing time order. So a sparse time index (the
+first time of every ``BLOCK_RECORDS`` block) plus binary search finds the
+blocks of a time window. Each pid also has a list of the blocks it appears
+in. Both indexes, and the pid table, are written after the records when the
+log is closed. A trailer points at them. A query such as "P123 between t1
+and t2" reads only the blocks that are in both ranges.
+
+    python -m scheduling.eventlog run.evl --pid P123 --start 1000000 --end 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+MAGIC = b"SCHEDEV1"
+RECORD = struct.Struct("<qqIBb2x")
+BLOCK_RECORDS = 1024
+_HEADER = struct.Struct("<8sII")
+_TRAILER = struct.Struct("<q8s")
+NO_PID = 0xFFFFFFFF
+
+ARRIVAL, WAKEUP, SELECT, CONTEXT_SWITCH, PREEMPT, QUANTUM, DEMOTE, BLOCK, COMPLETE, BOOST = range(1, 11)
+KIND_NAMES = {
+    ARRIVAL: "arrival",
+    WAKEUP: "wakeup",
+    SELECT: "select",
+    CONTEXT_SWITCH: "cs",
+    PREEMPT: "preempt",
+    QUANTUM: "quantum",
+    DEMOTE: "demote",
+    BLOCK: "block",
+    COMPLETE: "complete",
+    BOOST: "boost",
+}
+KINDS = {v: k for k, v in KIND_NAMES.items()}
+
+
+class Event(NamedTuple):
+    time: int
+    kind: str
+    pid: Optional[str]
+    level: int
+    arg: int
+
+
+class EventLog:
+    """Writer; pass it to ``simulate``/``simulate_totals`` as ``event_log`` and ``close`` it afterwards."""
+
+    def __init__(self, path: str, buffer_records: int = 4096):
+        self.path = path
+        self._fh: BinaryIO = open(path, "wb")
+        self._fh.write(_HEADER.pack(MAGIC, RECORD.size, BLOCK_RECORDS))
+        self._buf = bytearray()
+        self._flush_at = max(1, int(buffer_records)) * RECORD.size
+        self._pack = RECORD.pack
+        self._block = -1
+        self._left = 0
+        self.pids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._postings: List[array] = []
+        self._block_times = array("q")
+
+    def _pid_id(self, pid: str) -> int:
+        i = self.pids.get(pid)
+        if i is None:
+            i = self.pids[pid] = len(self._names)
+            self._names.append(pid)
+            self._postings.append(array("I"))
+        return i
+
+    def record(self, time: int, kind: int, pid: Optional[str], level: int = 0, arg: int = 0) -> None:
+        if not self._left:
+            self._block_times.append(time)
+            self._block += 1
+            self._left = BLOCK_RECORDS
+        self._left -= 1
+        if pid is None:
+            i = NO_PID
+        else:
+            i = self.pids.get(pid)
+            if i is None:
+                i = self._pid_id(pid)
+            posting = self._postings[i]
+            if not posting or posting[-1] != self._block:
+                posting.append(self._block)
+        self._buf += self._pack(time, arg, i, kind, level)
+        if len(self._buf) >= self._flush_at:
+            self._fh.write(self._buf)
+            self._buf.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self._block_times) * BLOCK_RECORDS - self._left
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        fh = self._fh
+        fh.write(self._buf)
+        self._buf.clear()
+        index_at = fh.tell()
+        fh.write(struct.pack("<qI", self.count, len(self._block_times)))
+        fh.write(self._block_times.tobytes())
+        fh.write(struct.pack("<I", len(self._names)))
+        for name, posting in zip(self._names, self._postings):
+            raw = name.encode("utf-8")
+            fh.write(struct.pack("<HI", len(raw), len(posting)))
+            fh.write(raw)
+            fh.write(posting.tobytes())
+        fh.write(_TRAILER.pack(index_at, MAGIC))
+        fh.close()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventLogReader:
+    def __init__(self, path: str):
+        if sys.byteorder != "little":  # pragma: no cover
+            raise ValueError("Event logs are read on little-endian hosts only")
+        self._fh = open(path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        if len(mm) < _HEADER.size + _TRAILER.size:
+            raise ValueError("Not an event log")
+        magic, record_size, self.block_records = _HEADER.unpack_from(mm, 0)
+        index_at, trailer = _TRAILER.unpack_from(mm, len(mm) - _TRAILER.size)
+        if magic != MAGIC or trailer != MAGIC or record_size != RECORD.size:
+            raise ValueError("Not an event log, or it was not closed")
+
+        self.count, n_blocks = struct.unpack_from("<qI", mm, index_at)
+        pos = index_at + 12
+        self.block_times = array("q")
+        self.block_times.frombytes(mm[pos : pos + 8 * n_blocks])
+        pos += 8 * n_blocks
+        (n_pids,) = struct.unpack_from("<I", mm, pos)
+        pos += 4
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.postings: Dict[str, array] = {}
+        for _ in range(n_pids):
+            name_len, n_post = struct.unpack_from("<HI", mm, pos)
+            pos += 6
+            name = bytes(mm[pos : pos + name_len]).decode("utf-8")
+            pos += name_len
+            posting = array("I")
+            posting.frombytes(mm[pos : pos + 4 * n_post])
+            pos += 4 * n_post
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.postings[name] = posting
+
+    def close(self) -> None:
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self) -> "EventLogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _blocks(self, pid: Optional[str], start: Optional[int], end: Optional[int]) -> Sequence[int]:
+        times = self.block_times
+        lo = max(0, bisect_left(times, start) - 1) if start is not None else 0
+        hi = bisect_right(times, end) if end is not None else len(times)
+        if pid is None:
+            return range(lo, hi)
+        posting = self.postings.get(pid)
+        if posting is None:
+            return ()
+        return posting[bisect_left(posting, lo) : bisect_left(posting, hi)]
+
+    def query(
+        self,
+        pid: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> Iterator[Event]:
+        """Events with ``start <= time <= end`` (either bound optional), for one pid and/or some kinds."""
+        pid_id = self.ids.get(pid) if pid is not None else None
+        if pid is not None and pid_id is None:
+            return
+        want_kinds = {KINDS[k] for k in kinds} if kinds else None
+        names = self.names
+        size = RECORD.size * self.block_records
+        base = _HEADER.size
+        limit = base + self.count * RECORD.size
+        for block in self._blocks(pid, start, end):
+            a = base + block * size
+            for time, arg, i, kind, level in RECORD.iter_unpack(self._mm[a : min(a + size, limit)]):
+                if end is not None and time > end:
+                    return
+                if start is not None and time < start:
+                    continue
+                if pid_id is not None and i != pid_id:
+                    continue
+                if want_kinds is not None and kind not in want_kinds:
+                    continue
+                yield Event(time, KIND_NAMES[kind], names[i] if i != NO_PID else None, level, arg)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query a binary scheduling event log.")
+    parser.add_argument("log")
+    parser.add_argument("--pid")
+    parser.add_argument("--start", type=float)
+    parser.add_argument("--end", type=float)
+    parser.add_argument("--kind", action="append", choices=sorted(KINDS))
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args(argv)
+    start = int(args.start) if args.start is not None else None
+    end = int(args.end) if args.end is not None else None
+    with EventLogReader(args.log) as reader:
+        for n, ev in enumerate(reader.query(args.pid, start, end, args.kind)):
+            if args.limit and n >= args.limit:
+                break
+            print(json.dumps(ev._asdict()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""Replicated random-workload experiments with sequential stopping.
+
+Replicate ``r`` draws its workload from ``WorkloadSpec`` with generators
+seeded from ``(seed, r)``. Arrivals, bursts and priorities each get their
+own stream. Every algorithm runs on the same replicate workload (common
+random numbers), so algorithms are compared on paired differences, which
+vary much less than the metrics themselves. Replicates run in rounds, on
+the local process pool with ``parallel``. Only seeds travel to the workers,
+which rebuild the workload themselves.
+
+After every round each metric gets a Student-t confidence interval. The
+algorithms are ranked by ``rank_by`` means, and each adjacent pair gets an
+interval for its paired difference at Bonferroni-corrected level
+``1 - (1 - confidence) / (k - 1)``. A pair is settled once that interval
+excludes zero ("different") or lies inside ``+-tolerance``
+("equivalent"). The experiment stops when every pair is settled (after at
+least ``min_replicates``) or at ``max_replicates``. Running sums (Welford)
+keep memory independent of the number of replicates.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from scheduling.admission import CostEstimate, jobs_cost, scaled
+from scheduling.pool import RESULT_COLUMNS, _column, _workers, get_pool
+from scheduling.schemas import (
+    ExperimentAlgorithm,
+    ExperimentComparison,
+    ExperimentReport,
+    ExperimentRequest,
+    MetricInterval,
+    ProcessIn,
+    WorkloadSpec,
+)
+from scheduling.service import SUPPORTED_ALGOS, execute_schedule, job_request
+from scheduling.stats import t_quantile
+from scheduling.workload import PreparedWorkload
+
+DEFAULT_ALGORITHMS = ["FCFS", "RR", "SJF", "SRTF", "HRRN", "MLQ", "MLFQ"]
+METRICS = set(RESULT_COLUMNS) | {"p99_response_time"}
+# Larger is better for these; every other metric is minimized.
+MAXIMIZED = {"cpu_utilization", "throughput"}
+
+
+def _stream(seed: int, replicate: int, name: str) -> random.Random:
+    # String seeds hash with SHA-512, so streams are stable across processes and runs.
+    return random.Random(f"{seed}:{replicate}:{name}")
+
+
+def generate_workload(spec: WorkloadSpec, seed: int, replicate: int) -> List[ProcessIn]:
+    n = spec.processes
+    arr = _stream(seed, replicate, "arrival")
+    arrivals: List[int] = []
+    if spec.arrival == "uniform":
+        span = n * spec.mean_interarrival
+        arrivals = sorted(int(arr.uniform(0, span)) for _ in range(n))
+    elif spec.arrival == "bursty":
+        t = 0.0
+        while len(arrivals) < n:
+            # Geometric batch size with mean batch_size, batches spaced to keep the mean rate.
+            size = 1 + int(math.log(1.0 - arr.random()) / math.log1p(-1.0 / spec.batch_size)) if spec.batch_size > 1 else 1
+            arrivals.extend([int(t)] * min(size, n - len(arrivals)))
+            t += arr.expovariate(1.0 / (spec.mean_interarrival * spec.batch_size))
+    else:
+        t = 0.0
+        for _ in range(n):
+            arrivals.append(int(t))
+            t += arr.expovariate(1.0 / spec.mean_interarrival)
+
+    bur = _stream(seed, replicate, "burst")
+    lo, hi = spec.min_burst, spec.max_burst
+    bursts: List[int] = []
+    for _ in range(n):
+        if spec.burst == "uniform":
+            b = bur.uniform(lo, hi)
+        elif spec.burst == "lognormal":
+            # Parameterized by the mean of the burst, not of its logarithm.
+            b = bur.lognormvariate(math.log(spec.mean_burst) - spec.sigma**2 / 2, spec.sigma)
+        elif spec.burst == "bimodal":
+            b = hi if bur.random() < spec.long_fraction else lo
+        else:
+            b = bur.expovariate(1.0 / spec.mean_burst)
+        bursts.append(min(hi, max(lo, int(round(b)))))
+
+    pri = _stream(seed, replicate, "priority")
+    levels = sorted(spec.priorities)
+    weights = [spec.priorities[p] for p in levels]
+    priorities = pri.choices(levels, weights=weights, k=n)
+
+    return [
+        ProcessIn.construct(pid=f"P{i + 1}", arrival_time=a, burst_time=b, priority=p)
+        for i, (a, b, p) in enumerate(zip(arrivals, bursts, priorities))
+    ]
+
+
+def _jobs(req: ExperimentRequest, replicate: int) -> List[Dict[str, Any]]:
+    config = dict(req.config or {})
+    # Lottery draws are part of the randomness being replicated, and shared across algorithms.
+    config.setdefault("seed", _stream(req.seed, replicate, "policy").getrandbits(31))
+    return [
+        {
+            "algorithm": a,
+            "context_switch_time": req.context_switch_time,
+            "time_slice": req.time_slice,
+            "config": config,
+        }
+        for a in _algorithms(req)
+    ]
+
+
+def run_replicate(req: ExperimentRequest, replicate: int) -> List[List[Optional[float]]]:
+    """Metric values (``req.metrics`` order) of every algorithm on replicate ``replicate``."""
+    processes = generate_workload(req.workload, req.seed, replicate)
+    workload = PreparedWorkload(processes)
+    rows = []
+    for job in _jobs(req, replicate):
+        res = execute_schedule(job_request(processes, job), workload, metrics_only=True)
+        rows.append([_column(res, m) for m in req.metrics])
+    return rows
+
+
+class _Running:
+    """Welford mean and variance."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    def half_width(self, confidence: float) -> Optional[float]:
+        if self.n < 2:
+            return None
+        sd = math.sqrt(self.m2 / (self.n - 1))
+        return t_quantile(1 - (1 - confidence) / 2, self.n - 1) * sd / math.sqrt(self.n)
+
+
+def _algorithms(req: ExperimentRequest) -> List[str]:
+    return [str(a).strip().upper() for a in (req.algorithms or DEFAULT_ALGORITHMS)]
+
+
+def _validate(req: ExperimentRequest) -> None:
+    algos = _algorithms(req)
+    if len(set(algos)) != len(algos):
+        raise ValueError("algorithms must be distinct")
+    for a in algos:
+        if a not in SUPPORTED_ALGOS:
+            raise ValueError(f"Unsupported algorithm: {a}")
+    for m in req.metrics:
+        if m not in METRICS:
+            raise ValueError(f"Unknown metric: {m}; expected one of {', '.join(sorted(METRICS))}")
+    if req.rank_by not in req.metrics:
+        raise ValueError("rank_by must be one of metrics")
+    # Fail fast on a bad config instead of in every replicate.
+    run_replicate(req.copy(update={"workload": req.workload.copy(update={"processes": 1})}), 0)
+
+
+def experiment_cost(req: ExperimentRequest) -> CostEstimate:
+    """Admission estimate: replicate 0's jobs, ``max_replicates`` times over."""
+    _validate(req)
+    processes = generate_workload(req.workload, req.seed, 0)
+    return scaled(jobs_cost(processes, PreparedWorkload(processes), _jobs(req, 0)), req.max_replicates)
+
+
+class Experiment:
+    def __init__(self, req: ExperimentRequest):
+        _validate(req)
+        self.req = req
+        self.algorithms = _algorithms(req)
+        self.replicates = 0
+        # stats[algorithm][metric]; missing values (e.g. no utilization) are skipped.
+        self.stats = [[_Running() for _ in req.metrics] for _ in self.algorithms]
+        # Paired differences of the ranking metric, for every ordered pair i < j.
+        self.diffs: Dict[Tuple[int, int], _Running] = {
+            (i, j): _Running() for i in range(len(self.algorithms)) for j in range(i + 1, len(self.algorithms))
+        }
+        self._rank = req.metrics.index(req.rank_by)
+
+    def add(self, rows: Sequence[Sequence[Optional[float]]]) -> None:
+        self.replicates += 1
+        for stats, row in zip(self.stats, rows):
+            for s, v in zip(stats, row):
+                if v is not None:
+                    s.add(float(v))
+        k = self._rank
+        for (i, j), d in self.diffs.items():
+            a, b = rows[i][k], rows[j][k]
+            if a is not None and b is not None:
+                d.add(float(b) - float(a))
+
+    def _sign(self) -> float:
+        return -1.0 if self.req.rank_by in MAXIMIZED else 1.0
+
+    def report(self) -> ExperimentReport:
+        req = self.req
+        k = self._rank
+        sign = self._sign()
+        order = sorted(range(len(self.algorithms)), key=lambda i: (sign * self.stats[i][k].mean, i))
+
+        pair_confidence = 1 - (1 - req.confidence) / max(1, len(order) - 1)
+        comparisons: List[ExperimentComparison] = []
+        for a, b in zip(order, order[1:]):
+            d = self.diffs[(min(a, b), max(a, b))]
+            # Oriented so a positive difference means ``b`` is worse than ``a``.
+            mean = sign * d.mean * (1 if a < b else -1)
+            hw = d.half_width(pair_confidence)
+            verdict = None
+            if hw is not None and self.replicates >= req.min_replicates:
+                if mean - hw > 0:
+                    verdict = "different"
+                elif abs(mean) + hw <= req.tolerance:
+                    verdict = "equivalent"
+            comparisons.append(
+                ExperimentComparison(
+                    better=self.algorithms[a], worse=self.algorithms[b], mean_difference=mean, half_width=hw, verdict=verdict
+                )
+            )
+
+        algorithms = []
+        for i in order:
+            metrics: Dict[str, MetricInterval] = {}
+            for name, s in zip(req.metrics, self.stats[i]):
+                if not s.n:
+                    continue
+                hw = s.half_width(req.confidence)
+                metrics[name] = MetricInterval(
+                    mean=s.mean,
+                    half_width=hw,
+                    low=s.mean - hw if hw is not None else None,
+                    high=s.mean + hw if hw is not None else None,
+                )
+            algorithms.append(ExperimentAlgorithm(algorithm=self.algorithms[i], metrics=metrics))
+
+        return ExperimentReport(
+            replicates=self.replicates,
+            settled=all(c.verdict is not None for c in comparisons) and self.replicates >= req.min_replicates,
+            rank_by=req.rank_by,
+            ranking=[self.algorithms[i] for i in order],
+            algorithms=algorithms,
+            comparisons=comparisons,
+        )
+
+
+def run_experiment_stream(req: ExperimentRequest) -> Iterator[ExperimentReport]:
+    """One report per round of replicates; the last one is settled or at ``max_replicates``."""
+    exp = Experiment(req)
+    batch = req.batch or (_workers() if req.parallel else 1)
+    pool = get_pool() if req.parallel else None
+    while True:
+        # The first round goes straight to min_replicates; none can settle before that.
+        size = max(batch, req.min_replicates - exp.replicates)
+        todo = range(exp.replicates, min(req.max_replicates, exp.replicates + size))
+        if pool is not None:
+            futures = [pool.submit(run_replicate, req, r) for r in todo]
+            try:
+                results = [f.result() for f in futures]
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                raise
+        else:
+            results = [run_replicate(req, r) for r in todo]
+        for rows in results:
+            exp.add(rows)
+        report = exp.report()
+        yield report
+        if report.settled or exp.replicates >= req.max_replicates:
+            return
+
+
+def run_experiment(req: ExperimentRequest) -> ExperimentReport:
+    report: Optional[ExperimentReport] = None
+    for report in run_experiment_stream(req):
+        pass
+    assert report is not None
+    return report
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from scheduling.engine import Segment
+
+try:  # optional: only needed for gantt_compression="zstd"
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPACT_VERSION = 1
+
+# Buckets covering at most this many segments get an exact time-weighted
+# dominant pid; wider ones fall back to the pid of their longest segment.
+EXACT_DOMINANT_SCAN = 32
+
+
+@dataclass
+class GanttBucket:
+    start: float
+    end: float
+    pid: Optional[str]
+    utilization: float
+    segments: int
+
+
+class GanttIndex:
+    """Sorted-start index over merged Gantt segments for window/LOD queries."""
+
+    def __init__(self, segments: Sequence[Segment]):
+        self._build([int(s.start) for s in segments], [int(s.end) for s in segments], [s.pid for s in segments])
+
+    @classmethod
+    def from_columns(cls, starts: Sequence[int], ends: Sequence[int], pids: Sequence[str]) -> "GanttIndex":
+        index = cls.__new__(cls)
+        index._build(list(starts), list(ends), list(pids))
+        return index
+
+    def _build(self, starts: List[int], ends: List[int], pids: List[str]) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.pids = pids
+
+        self._busy_prefix: List[int] = [0]
+        for s, e, pid in zip(self.starts, self.ends, self.pids):
+            self._busy_prefix.append(self._busy_prefix[-1] + (0 if pid == "IDLE" else e - s))
+
+        n = len(self.starts)
+        self._size = 1
+        while self._size < max(1, n):
+            self._size *= 2
+        self._longest: List[int] = [-1] * (2 * self._size)
+        self._longest[self._size:self._size + n] = range(n)
+        for i in range(self._size - 1, 0, -1):
+            self._longest[i] = self._pick_longer(self._longest[2 * i], self._longest[2 * i + 1])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def start(self) -> int:
+        return self.starts[0] if self.starts else 0
+
+    @property
+    def end(self) -> int:
+        return self.ends[-1] if self.ends else 0
+
+    def _dur(self, i: int) -> int:
+        return self.ends[i] - self.starts[i]
+
+    def _span(self, t0: float, t1: float) -> range:
+        lo = max(0, bisect_right(self.starts, t0) - 1)
+        if lo < len(self.ends) and self.ends[lo] <= t0:
+            lo += 1
+        hi = bisect_left(self.starts, t1)
+        return range(lo, max(lo, hi))
+
+    def _busy_until(self, t: float) -> float:
+        i = bisect_right(self.starts, t) - 1
+        if i < 0:
+            return 0.0
+        busy = float(self._busy_prefix[i])
+        if self.pids[i] != "IDLE":
+            busy += min(t, self.ends[i]) - self.starts[i]
+        return busy
+
+    def _pick_longer(self, a: int, b: int) -> int:
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        return a if self._dur(a) >= self._dur(b) else b
+
+    def _longest_in(self, lo: int, hi: int) -> int:
+        best = -1
+        lo += self._size
+        hi += self._size
+        while lo < hi:
+            if lo & 1:
+                best = self._pick_longer(best, self._longest[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._pick_longer(best, self._longest[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def window(self, t0: float, t1: float) -> List[Segment]:
+        return [
+            Segment(max(self.starts[i], int(t0)), min(self.ends[i], int(t1)), self.pids[i])
+            for i in self._span(t0, t1)
+        ]
+
+    def count(self, t0: float, t1: float) -> int:
+        return len(self._span(t0, t1))
+
+    def buckets(self, t0: float, t1: float, count: int) -> List[GanttBucket]:
+        if count <= 0 or t1 <= t0:
+            return []
+        width = (t1 - t0) / count
+        out: List[GanttBucket] = []
+        for k in range(count):
+            b0 = t0 + k * width
+            b1 = t1 if k == count - 1 else b0 + width
+            span = self._span(b0, b1)
+            if not span:
+                out.append(GanttBucket(b0, b1, None, 0.0, 0))
+                continue
+            busy = self._busy_until(b1) - self._busy_until(b0)
+            if len(span) <= EXACT_DOMINANT_SCAN:
+                share: Dict[str, float] = {}
+                for i in span:
+                    share[self.pids[i]] = share.get(self.pids[i], 0.0) + (
+                        min(self.ends[i], b1) - max(self.starts[i], b0)
+                    )
+                pid = max(share.items(), key=lambda kv: kv[1])[0]
+            else:
+                pid = self.pids[self._longest_in(span.start, span.stop)]
+            out.append(GanttBucket(b0, b1, pid, busy / (b1 - b0), len(span)))
+        return out
+
+
+def encode_compact(segments: Sequence[Segment], compression: Optional[str] = None) -> Dict[str, Any]:
+    """Columnar Gantt: pid dictionary, per-segment pid index, lengths and gaps to the previous end."""
+    pids: List[str] = []
+    pid_ids: Dict[str, int] = {}
+    index: List[int] = []
+    lengths: List[int] = []
+    gaps: List[int] = []
+    prev_end = segments[0].start if segments else 0
+    for seg in segments:
+        i = pid_ids.get(seg.pid)
+        if i is None:
+            i = pid_ids[seg.pid] = len(pids)
+            pids.append(seg.pid)
+        index.append(i)
+        lengths.append(seg.end - seg.start)
+        gaps.append(seg.start - prev_end)
+        prev_end = seg.end
+
+    columns: Dict[str, Any] = {
+        "v": COMPACT_VERSION,
+        "start": segments[0].start if segments else 0,
+        "pids": pids,
+        "pid_index": index,
+        "lengths": lengths,
+        # Merged schedules are contiguous, so the gap column is usually all zeros.
+        "gaps": gaps if any(gaps) else None,
+    }
+    if compression is None:
+        return columns
+
+    raw = json.dumps(columns, separators=(",", ":")).encode("utf-8")
+    if compression == "gzip":
+        data = gzip.compress(raw, 6)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ValueError("gantt_compression=zstd requires the zstandard package")
+        data = zstandard.ZstdCompressor(level=6).compress(raw)
+    else:
+        raise ValueError(f"Unsupported gantt_compression: {compression}")
+    return {"v": COMPACT_VERSION, "encoding": compression, "data": base64.b64encode(data).decode("ascii")}
+
+
+def decode_compact(payload: Dict[str, Any]) -> List[Segment]:
+    encoding = payload.get("encoding")
+    if encoding is not None:
+        data = base64.b64decode(payload["data"])
+        if encoding == "gzip":
+            raw = gzip.decompress(data)
+        elif encoding == "zstd" and zstandard is not None:
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raise ValueError(f"Unsupported gantt encoding: {encoding}")
+        payload = json.loads(raw)
+
+    pids = payload["pids"]
+    gaps = payload.get("gaps")
+    t = int(payload["start"])
+    out: List[Segment] = []
+    for k, (i, length) in enumerate(zip(payload["pid_index"], payload["lengths"])):
+        if gaps:
+            t += gaps[k]
+        out.append(Segment(t, t + length, pids[i]))
+        t += length
+    return out
@@ -0,0 +1,250 @@
+"""Successive-halving search over MLQ/MLFQ configurations.
+
+The first rung evaluates every sampled configuration on a short prefix of
+the workload, taken in arrival order. Each later rung multiplies the prefix
+length by ``eta`` and keeps the best ``1/eta`` of the candidates (at least
+``eta`` of them), ranked by Pareto front (non-dominated sorting) with
+average waiting time as the tie-break. The last rung runs the full workload. Its non-dominated
+candidates are returned as the Pareto front over average waiting time, p99
+response time and CPU utilization. With ``parallel`` each rung runs on the
+local process pool (``scheduling.pool``).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from scheduling.admission import CostEstimate, combine, estimate_cost, scaled
+from scheduling.pool import run_jobs_shared
+from scheduling.schemas import OptimizeCandidate, OptimizeRequest, OptimizeResponse, OptimizeRung
+from scheduling.service import MLFQ_LEVEL_ALGOS, execute_schedule, job_request
+from scheduling.stats import percentile
+from scheduling.workload import PreparedWorkload
+
+DEFAULT_QUANTA = [1, 2, 3, 4, 6, 8, 12, 16]
+MLQ_LEVEL_ALGOS = ["RR", "FCFS", "SJF", "HRRN"]
+# Shortest prefix a rung simulates; fewer processes say little about a configuration.
+MIN_PREFIX = 8
+
+OBJECTIVES = ("avg_waiting_time", "p99_response_time", "cpu_utilization")
+
+Scores = Tuple[float, float, float]
+
+
+def _default_config(req: OptimizeRequest) -> Dict[str, Any]:
+    ts = int(req.time_slice or 4)
+    if req.algorithm == "MLQ":
+        return {
+            "queues": [
+                {"algorithm": "RR", "time_slice": ts},
+                {"algorithm": "RR", "time_slice": ts},
+                {"algorithm": "FCFS"},
+                {"algorithm": "FCFS"},
+            ],
+            "priority_mapping": "1-4",
+        }
+    return {
+        "queues": [
+            {"algorithm": "RR", "time_slice": ts},
+            {"algorithm": "RR", "time_slice": ts * 2},
+            {"algorithm": "RR", "time_slice": ts * 4},
+            {"algorithm": "FCFS"},
+        ],
+        "boost_period": None,
+    }
+
+
+def _level(algo: str, quantum: Optional[int]) -> Dict[str, Any]:
+    return {"algorithm": algo, "time_slice": quantum} if quantum is not None else {"algorithm": algo}
+
+
+def _sample_mlq(rng: random.Random, quanta: Sequence[int]) -> Dict[str, Any]:
+    queues = []
+    for _ in range(4):
+        algo = rng.choice(MLQ_LEVEL_ALGOS)
+        queues.append(_level(algo, rng.choice(quanta) if algo == "RR" else None))
+    return {"queues": queues, "priority_mapping": rng.choice(["1-4", "0-3"])}
+
+
+def _sample_mlfq(rng: random.Random, quanta: Sequence[int]) -> Dict[str, Any]:
+    # Levels 0..2 always demote after their quantum; quanta do not shrink going down.
+    slices = sorted(rng.choice(quanta) for _ in range(3))
+    algos = sorted(MLFQ_LEVEL_ALGOS)
+    queues = [_level(rng.choice(algos), q) for q in slices]
+    last = rng.choice(algos)
+    queues.append(_level(last, rng.choice([q for q in quanta if q >= slices[2]] or [slices[2]]) if last == "RR" else None))
+    boost = rng.choice([None, 8 * slices[2], 32 * slices[2]])
+    return {"queues": queues, "boost_period": boost}
+
+
+def sample_configs(req: OptimizeRequest) -> List[Dict[str, Any]]:
+    """Default configuration first, then distinct random ones up to ``req.candidates``."""
+    rng = random.Random(req.seed)
+    quanta = sorted({int(q) for q in (req.quanta or DEFAULT_QUANTA)})
+    sample = _sample_mlq if req.algorithm == "MLQ" else _sample_mlfq
+    out = [_default_config(req)]
+    seen = {json.dumps(out[0], sort_keys=True)}
+    attempts = 0
+    while len(out) < req.candidates and attempts < 20 * req.candidates:
+        attempts += 1
+        cfg = sample(rng, quanta)
+        key = json.dumps(cfg, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            out.append(cfg)
+    return out[: req.candidates]
+
+
+def _prefix(workload: PreparedWorkload, size: int) -> PreparedWorkload:
+    if size >= len(workload):
+        return workload
+    keep = sorted(workload.arrival_order[:size])
+    sub = PreparedWorkload.__new__(PreparedWorkload)
+    for name in ("pids", "arrivals", "bursts", "priorities", "io_bursts", "io_devices", "deadlines", "periods"):
+        column = getattr(workload, name)
+        setattr(sub, name, [column[i] for i in keep])
+    sub.index = {pid: i for i, pid in enumerate(sub.pids)}
+    sub.arrival_order = sorted(range(len(keep)), key=lambda i: (sub.arrivals[i], sub.pids[i]))
+    return sub
+
+
+def _jobs(req: OptimizeRequest, configs: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "algorithm": req.algorithm,
+            "context_switch_time": req.context_switch_time,
+            "time_slice": req.time_slice,
+            "config": {**(req.config or {}), **cfg},
+        }
+        for cfg in configs
+    ]
+
+
+def _rungs(n: int, candidates: int, req: OptimizeRequest) -> Iterator[Tuple[int, int]]:
+    """(prefix size, candidates evaluated) of every rung, as ``optimize_config`` runs them."""
+    prefix = min(n, max(MIN_PREFIX, math.ceil(n * req.min_fraction)))
+    while True:
+        if prefix >= n or candidates <= 1:
+            yield n, candidates
+            return
+        yield prefix, candidates
+        candidates = min(candidates, max(req.eta, math.ceil(candidates / req.eta)))
+        prefix = min(n, prefix * req.eta)
+
+
+def optimize_cost(req: OptimizeRequest) -> CostEstimate:
+    """Admission estimate of ``optimize_config``, charging each rung for its costliest candidates."""
+    workload = PreparedWorkload(req.processes)
+    n = len(workload)
+    if not n:
+        return combine([])
+    full = sorted(
+        (estimate_cost(job_request(req.processes, job), workload, gantt=False) for job in _jobs(req, sample_configs(req))),
+        key=lambda e: e.seconds,
+        reverse=True,
+    )
+    return combine([scaled(e, size / n) for size, count in _rungs(n, len(full), req) for e in full[:count]])
+
+
+def _evaluate(
+    req: OptimizeRequest, workload: PreparedWorkload, configs: Sequence[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    jobs = _jobs(req, configs)
+    if req.parallel and len(jobs) > 1:
+        return run_jobs_shared(workload, jobs, columns=OBJECTIVES)
+    rows = []
+    for job in jobs:
+        res = execute_schedule(job_request([], job), workload, metrics_only=True)
+        rows.append(
+            {
+                "avg_waiting_time": res.avg_waiting_time,
+                "p99_response_time": percentile(res.response_time, 99),
+                "cpu_utilization": res.cpu_utilization,
+            }
+        )
+    return rows
+
+
+def _scores(row: Dict[str, Any]) -> Scores:
+    # All minimized; a missing p99/utilization counts as worst.
+    p99 = row.get("p99_response_time")
+    util = row.get("cpu_utilization")
+    return (
+        float(row["avg_waiting_time"]),
+        float(p99) if p99 is not None else math.inf,
+        -float(util) if util is not None else 0.0,
+    )
+
+
+def _dominates(a: Scores, b: Scores) -> bool:
+    return all(x <= y for x, y in zip(a, b)) and a != b
+
+
+def pareto_ranks(scores: Sequence[Scores]) -> List[int]:
+    """Non-dominated sorting: 0 for the Pareto front, 1 for the front without it, and so on."""
+    ranks = [-1] * len(scores)
+    remaining = set(range(len(scores)))
+    rank = 0
+    while remaining:
+        front = [i for i in remaining if not any(_dominates(scores[j], scores[i]) for j in remaining if j != i)]
+        for i in front:
+            ranks[i] = rank
+        remaining.difference_update(front)
+        rank += 1
+    return ranks
+
+
+def _order(scores: Sequence[Scores]) -> Tuple[List[int], List[int]]:
+    ranks = pareto_ranks(scores)
+    return sorted(range(len(scores)), key=lambda i: (ranks[i], scores[i], i)), ranks
+
+
+def optimize_config(req: OptimizeRequest) -> OptimizeResponse:
+    workload = PreparedWorkload(req.processes)
+    if not len(workload):
+        raise ValueError("processes must not be empty")
+    if workload.periodic:
+        raise ValueError("The optimizer does not support periodic processes")
+
+    configs = sample_configs(req)
+    n = len(workload)
+    prefix = min(n, max(MIN_PREFIX, math.ceil(n * req.min_fraction)))
+    rungs: List[OptimizeRung] = []
+    simulations = 0
+
+    while True:
+        final = prefix >= n or len(configs) <= 1
+        size = n if final else prefix
+        rows = _evaluate(req, _prefix(workload, size), configs)
+        simulations += len(rows)
+        scores = [_scores(r) for r in rows]
+        order, ranks = _order(scores)
+        if final:
+            rungs.append(OptimizeRung(prefix=size, evaluated=len(configs), promoted=0))
+            break
+        # Keep at least eta candidates so the full-workload rung still has a front to report.
+        keep = min(len(configs), max(req.eta, math.ceil(len(configs) / req.eta)))
+        rungs.append(OptimizeRung(prefix=size, evaluated=len(configs), promoted=keep))
+        configs = [configs[i] for i in order[:keep]]
+        prefix = min(n, prefix * req.eta)
+
+    finalists = [
+        OptimizeCandidate(
+            config=configs[i],
+            avg_waiting_time=rows[i]["avg_waiting_time"],
+            p99_response_time=rows[i]["p99_response_time"],
+            cpu_utilization=rows[i]["cpu_utilization"],
+            rank=ranks[i],
+        )
+        for i in order
+    ]
+    return OptimizeResponse(
+        algorithm=req.algorithm,
+        simulations=simulations,
+        rungs=rungs,
+        pareto=[c for c in finalists if c.rank == 0],
+        finalists=finalists,
+    )
@@ -0,0 +1,217 @@
+"""Incremental replay of one schedule for live playback.
+
+``Playback`` owns an ``Engine`` that runs without recording segments. Each
+``advance`` moves the engine clock forward by a few ticks with
+``Engine.run(horizon)`` and drains what was emitted meanwhile into a small
+buffer. Nothing is kept between frames except the engine itself and a couple of
+held-back segments, so memory does not grow with the schedule length. The
+held-back segments are needed to merge runs the way ``merge_segments`` does
+and for the end-of-run CS/IDLE fix-ups of ``Engine.gantt(final=True)``.
+
+Seeking restores the nearest earlier checkpoint (a deep copy of the engine)
+and fast-forwards from there. Checkpoints are taken every
+``checkpoint_every`` ticks. When there are more than ``max_checkpoints``,
+every other one is dropped and the interval doubles, so their number stays
+bounded whatever the schedule length.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+from scheduling.engine import Engine, ProcState
+from scheduling.realtime import release_horizon
+from scheduling.schemas import Averages, SchedulingRequest
+from scheduling.service import _build_policy, process_metrics
+from scheduling.switching import build_switch_model
+from scheduling.workload import PreparedWorkload
+
+Event = Dict[str, Any]
+
+
+class _Buffer:
+    """Engine sink that just queues raw segments until the next drain."""
+
+    def __init__(self):
+        self.items: List[Tuple[int, int, str]] = []
+
+    def append(self, start: int, end: int, pid: str) -> None:
+        self.items.append((start, end, pid))
+
+
+class Playback:
+    def __init__(self, req: SchedulingRequest, max_checkpoints: int = 16, workload: Optional[PreparedWorkload] = None):
+        self.algorithm = req.algorithm.upper()
+        self.warnings: List[str] = []
+        if workload is None:
+            workload = PreparedWorkload(req.processes)
+        if not len(workload):
+            raise ValueError("processes must not be empty")
+        horizon = release_horizon(workload, req.config or {}, self.warnings)
+        self._buffer = _Buffer()
+        self.engine = Engine(
+            _build_policy(req, self.warnings),
+            int(req.context_switch_time),
+            record_segments=False,
+            sink=self._buffer,
+            switch_cost=build_switch_model(int(req.context_switch_time), req.config or {}, self.warnings),
+        )
+        procs = workload.states(horizon)
+        self.engine.submit_sorted([procs[i] for i in workload.arrival_order])
+        self.procs: Dict[str, ProcState] = {p.pid: p for p in procs}
+        self._spawned_seen = 0
+        self._held: List[Tuple[int, int, str]] = []
+        self._merged: Optional[Tuple[int, int, str]] = None
+        self.start = int(workload.first_arrival() or 0)
+        self.clock = self.start
+        self.finished = False
+
+        self.max_checkpoints = max(2, int(max_checkpoints))
+        # A lower bound on the makespan spreads the first checkpoints over the whole run.
+        self.checkpoint_every = max(1, sum(workload.bursts) // self.max_checkpoints)
+        self._checkpoints: List[Tuple[int, Any]] = []
+        self._checkpoint()
+
+    # -- state ----------------------------------------------------------------------
+
+    def _snapshot(self) -> Any:
+        # The buffer is shared, not copied: it is drained at every checkpoint anyway.
+        memo = {id(self._buffer): self._buffer}
+        return copy.deepcopy((self.engine, self.procs, self._spawned_seen, self._held, self._merged, self.finished), memo)
+
+    def _restore(self, clock: int, snap: Any) -> None:
+        memo = {id(self._buffer): self._buffer}
+        self.engine, self.procs, self._spawned_seen, self._held, self._merged, self.finished = copy.deepcopy(snap, memo)
+        self.clock = clock
+
+    def _checkpoint(self) -> None:
+        self._checkpoints.append((self.clock, self._snapshot()))
+        if len(self._checkpoints) > self.max_checkpoints:
+            self._checkpoints = self._checkpoints[::2]
+            self.checkpoint_every *= 2
+
+    def _proc(self, pid: str) -> Optional[ProcState]:
+        p = self.procs.get(pid)
+        if p is None:
+            spawned = self.engine.spawned
+            while self._spawned_seen < len(spawned):
+                job = spawned[self._spawned_seen]
+                self.procs[job.pid] = job
+                self._spawned_seen += 1
+            p = self.procs.get(pid)
+        return p
+
+    # -- events ---------------------------------------------------------------------
+
+    def _segment_events(self, seg: Tuple[int, int, str], out: List[Event]) -> None:
+        start, end, pid = seg
+        if end <= start:
+            return
+        if pid in ("IDLE", "CS"):
+            out.append({"kind": pid.lower(), "start": start, "end": end})
+            return
+        out.append({"kind": "dispatch", "pid": pid, "start": start, "end": end})
+        p = self._proc(pid)
+        done = p is not None and p.completion_time is not None and int(p.completion_time) == end
+        out.append({"kind": "complete" if done else "preempt", "pid": pid, "time": end})
+
+    def _merge(self, seg: Tuple[int, int, str], out: Optional[List[Event]]) -> None:
+        # Streaming merge_segments: only a change of pid (or a gap) closes a segment.
+        last = self._merged
+        if last is not None and last[2] == seg[2] and last[1] == seg[0]:
+            self._merged = (last[0], seg[1], seg[2])
+            return
+        if last is not None and out is not None:
+            self._segment_events(last, out)
+        self._merged = seg
+
+    def _drain(self, out: Optional[List[Event]], final: bool = False) -> None:
+        held = self._held
+        held.extend(self._buffer.items)
+        self._buffer.items = []
+        # The last two raw segments stay back for the end-of-run fix-ups of Engine.gantt(final=True).
+        while len(held) > 2:
+            self._merge(held.pop(0), out)
+        if not final:
+            return
+        if len(held) == 2 and held[0][2] == "CS" and held[1][2] == "IDLE":
+            held[:] = [(held[0][0], held[1][1], "IDLE")]
+        if held and held[-1][2] == "CS":
+            held.pop()
+        for seg in held:
+            self._merge(seg, out)
+        held.clear()
+        if self._merged is not None and out is not None:
+            self._segment_events(self._merged, out)
+        self._merged = None
+
+    def snapshot_event(self) -> Event:
+        engine = self.engine
+        running = engine.running or engine.current
+        return {
+            "kind": "queue",
+            "time": self.clock,
+            "ready": engine.submitted - engine.done - engine.pending_count - (1 if running is not None else 0),
+            "running": running.pid if running is not None else None,
+            "completed": engine.done,
+            "submitted": engine.submitted,
+        }
+
+    # -- control --------------------------------------------------------------------
+
+    def advance(self, ticks: int, max_events: int = 1000) -> List[Event]:
+        """Run about ``ticks`` more ticks, stopping early once ``max_events`` events are ready."""
+        out: List[Event] = []
+        if self.finished:
+            return out
+        target = self.clock + max(1, int(ticks))
+        # One tick can emit at most a run, a CS and an idle gap, so small sub-steps bound the batch.
+        step = max(1, int(max_events) // 3)
+        while self.clock < target and len(out) < max_events:
+            until = min(target, self.clock + step)
+            done = self.engine.run(until)
+            self.clock = until
+            if done:
+                self.clock = self.engine.time
+                self.finished = True
+            self._drain(out, final=self.finished)
+            if self.finished:
+                break
+            if self.clock - self._checkpoints[-1][0] >= self.checkpoint_every:
+                self._checkpoint()
+        out.append(self.snapshot_event())
+        return out
+
+    def seek(self, time: int) -> Event:
+        """Jump to ``time``: restore the nearest checkpoint at or before it and fast-forward silently."""
+        time = max(self.start, int(time))
+        clock, snap = self._checkpoints[0]
+        for c, s in self._checkpoints:
+            if c <= time:
+                clock, snap = c, s
+        if not (clock <= self.clock <= time):
+            self._restore(clock, snap)
+        while self.clock < time and not self.finished:
+            # Bounded steps keep the discarded segments from piling up in the buffer.
+            until = min(time, self.clock + self.checkpoint_every)
+            done = self.engine.run(until)
+            self.clock = until
+            if done:
+                self.clock = self.engine.time
+                self.finished = True
+            self._drain(None, final=self.finished)
+            if self.clock - self._checkpoints[-1][0] >= self.checkpoint_every:
+                self._checkpoint()
+        return self.snapshot_event()
+
+    def summary(self) -> Dict[str, Any]:
+        self._proc("")  # pick up any remaining periodic jobs
+        metrics = [process_metrics(p) for p in self.procs.values() if p.completion_time is not None]
+        n = len(metrics) or 1
+        averages = Averages(
+            avg_waiting_time=sum(m.waiting_time for m in metrics) / n,
+            avg_turnaround_time=sum(m.turnaround_time for m in metrics) / n,
+            avg_response_time=sum(m.response_time for m in metrics) / n,
+        )
+        return {"completed": len(metrics), "averages": averages.dict(), "warnings": self.warnings}
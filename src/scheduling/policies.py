@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import heapq
+import random
 from collections import deque
-from typing import Deque, List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from scheduling.engine import Policy, ProcState
 
@@ -152,6 +153,68 @@ class SRTF(Policy):
     def on_timeslice_expired(self, p: ProcState, now: int) -> None:
         raise RuntimeError("SRTF does not use fixed time slices")
 
+class _PreemptiveHeap(Policy):
+    """Preemptive single-heap policy: the smallest ``_key`` runs, arrivals may preempt."""
+
+    preempt_on_arrival = True
+
+    def __init__(self):
+        self.h: List[Tuple[Any, int, str, ProcState]] = []
+
+    def _key(self, p: ProcState) -> Any:  # pragma: no cover
+        raise NotImplementedError
+
+    def _entry(self, p: ProcState) -> Tuple[Any, int, str, ProcState]:
+        return (self._key(p), int(p.arrival_time), str(p.pid), p)
+
+    def on_arrival(self, p: ProcState, now: int) -> None:
+        _mark_ready(p, now)
+        heapq.heappush(self.h, self._entry(p))
+
+    def select(self, now: int, current: Optional[ProcState]) -> Optional[ProcState]:
+        if current is None:
+            return heapq.heappop(self.h)[-1] if self.h else None
+        if not self.h:
+            return current
+        cur = self._entry(current)
+        if self.h[0][:3] < cur[:3]:
+            heapq.heappush(self.h, cur)
+            return heapq.heappop(self.h)[-1]
+        return current
+
+    def max_continuous_run(self, p: ProcState, now: int) -> Optional[int]:
+        return int(p.remaining)
+
+    def on_timeslice_expired(self, p: ProcState, now: int) -> None:
+        raise RuntimeError(f"{self.name} does not use fixed time slices")
+
+
+_NO_DEADLINE = float("inf")
+
+
+class EDF(_PreemptiveHeap):
+    """Earliest absolute deadline first; jobs without a deadline run in the background."""
+
+    name = "EDF"
+
+    def _key(self, p: ProcState) -> Any:
+        return p.deadline if p.deadline is not None else _NO_DEADLINE
+
+
+class RM(_PreemptiveHeap):
+    """Rate monotonic: fixed priority by period (shorter first).
+
+    Aperiodic jobs rank by their relative deadline, or run in the background.
+    """
+
+    name = "RM"
+
+    def _key(self, p: ProcState) -> Any:
+        if p.period is not None:
+            return p.period
+        return p.relative_deadline if p.relative_deadline is not None else _NO_DEADLINE
+
+
 class RR(Policy):
     name = "RR"
     preempt_on_arrival = False
@@ -181,7 +244,269 @@ class RR(Policy):
     def on_timeslice_expired(self, p: ProcState, now: int) -> None:
         self.put_back(p, now)
 
+class _Fenwick:
+    """Binary indexed tree over slot weights: O(log n) update and weighted draw."""
+
+    def __init__(self, capacity: int = 16):
+        self.n = max(1, int(capacity))
+        self.tree = [0] * (self.n + 1)
+        self.weights = [0] * self.n
+        self.total = 0
+
+    def _grow(self) -> None:
+        weights = self.weights + [0] * self.n
+        self.n *= 2
+        self.weights = weights
+        tree = [0] + weights
+        for i in range(1, self.n + 1):
+            j = i + (i & -i)
+            if j <= self.n:
+                tree[j] += tree[i]
+        self.tree = tree
+
+    def set(self, slot: int, weight: int) -> None:
+        while slot >= self.n:
+            self._grow()
+        delta = int(weight) - self.weights[slot]
+        if not delta:
+            return
+        self.weights[slot] = int(weight)
+        self.total += delta
+        i = slot + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target: int) -> int:
+        """Slot whose cumulative range contains ``target`` (0 <= target < total)."""
+        pos = 0
+        step = 1 << (self.n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+def _shares(p: ProcState, table: Dict[str, int], base: int) -> int:
+    """Tickets for ``p``: explicit per-pid value, else ``base`` scaled down by priority."""
+    pid = str(p.pid)
+    if pid in table:
+        n = int(table[pid])
+        if n <= 0:
+            raise ValueError(f"tickets for {pid} must be > 0")
+        return n
+    if p.priority is None:
+        return base
+    return max(1, base // (1 + max(0, int(p.priority))))
+
+
+class LOTTERY(Policy):
+    """Proportional share by lottery: each dispatch draws a winning ticket.
+
+    Ready processes occupy slots of a Fenwick tree weighted by their tickets,
+    so a draw and an enqueue each cost O(log n). The generator is seeded, so
+    the same request always yields the same schedule.
+    """
+
+    name = "LOTTERY"
+    preempt_on_arrival = False
+
+    def __init__(self, quantum: int, tickets: Optional[Dict[str, int]] = None, base_tickets: int = 100, seed: int = 0):
+        if int(quantum) <= 0:
+            raise ValueError("time_slice must be > 0 for LOTTERY")
+        if int(base_tickets) <= 0:
+            raise ValueError("default_tickets must be > 0")
+        self.quantum = int(quantum)
+        self.tickets = dict(tickets or {})
+        self.base_tickets = int(base_tickets)
+        self.rng = random.Random(seed)
+        self.tree = _Fenwick()
+        self.slots: List[Optional[ProcState]] = []
+        self.free: List[int] = []
+
+    def on_arrival(self, p: ProcState, now: int) -> None:
+        _mark_ready(p, now)
+        if self.free:
+            slot = self.free.pop()
+            self.slots[slot] = p
+        else:
+            slot = len(self.slots)
+            self.slots.append(p)
+        self.tree.set(slot, _shares(p, self.tickets, self.base_tickets))
+
+    def put_back(self, p: ProcState, now: int) -> None:
+        self.on_arrival(p, now)
+
+    def select(self, now: int, current: Optional[ProcState]) -> Optional[ProcState]:
+        if current is not None:
+            return current
+        if self.tree.total <= 0:
+            return None
+        slot = self.tree.find(self.rng.randrange(self.tree.total))
+        p = self.slots[slot]
+        self.slots[slot] = None
+        self.tree.set(slot, 0)
+        self.free.append(slot)
+        return p
+
+    def max_continuous_run(self, p: ProcState, now: int) -> Optional[int]:
+        return min(int(p.remaining), self.quantum)
+
+    def on_timeslice_expired(self, p: ProcState, now: int) -> None:
+        self.put_back(p, now)
+
+
+class STRIDE(Policy):
+    """Deterministic proportional share: lowest pass value runs next.
+
+    Each process advances its pass by ``STRIDE1 / tickets`` per tick of CPU.
+    Newcomers start at the global pass so they cannot monopolise the CPU.
+    """
+
+    name = "STRIDE"
+    preempt_on_arrival = False
+    STRIDE1 = 1 << 20
+
+    def __init__(self, quantum: int, tickets: Optional[Dict[str, int]] = None, base_tickets: int = 100):
+        if int(quantum) <= 0:
+            raise ValueError("time_slice must be > 0 for STRIDE")
+        if int(base_tickets) <= 0:
+            raise ValueError("default_tickets must be > 0")
+        self.quantum = int(quantum)
+        self.tickets = dict(tickets or {})
+        self.base_tickets = int(base_tickets)
+        self.h: List[Tuple[int, int, str, ProcState]] = []
+        self.global_pass = 0
+
+    def _push(self, p: ProcState, now: int) -> None:
+        _mark_ready(p, now)
+        heapq.heappush(self.h, (p.pass_value, int(p.arrival_time), str(p.pid), p))
+
+    def on_arrival(self, p: ProcState, now: int) -> None:
+        p.stride = self.STRIDE1 // _shares(p, self.tickets, self.base_tickets)
+        p.pass_value = self.global_pass
+        self._push(p, now)
+
+    def put_back(self, p: ProcState, now: int) -> None:
+        if not hasattr(p, "stride"):
+            self.on_arrival(p, now)
+            return
+        # Back from I/O: do not bank credit for the time spent blocked.
+        p.pass_value = max(p.pass_value, self.global_pass)
+        self._push(p, now)
+
+    def select(self, now: int, current: Optional[ProcState]) -> Optional[ProcState]:
+        if current is not None:
+            return current
+        if not self.h:
+            return None
+        p = heapq.heappop(self.h)[-1]
+        self.global_pass = max(self.global_pass, p.pass_value)
+        return p
+
+    def max_continuous_run(self, p: ProcState, now: int) -> Optional[int]:
+        return min(int(p.remaining), self.quantum)
+
+    def on_run(self, p: ProcState, ran_for: int, now: int) -> None:
+        p.pass_value += p.stride * int(ran_for)
+
+    def on_timeslice_expired(self, p: ProcState, now: int) -> None:
+        self._push(p, now)
+
+
+# Linux load weights for nice -20..19 (kernel/sched/core.c).
+NICE_WEIGHTS = [
+    88761, 71755, 56483, 46273, 36291, 29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906, 3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423, 335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45, 36, 29, 23, 18, 15,
+]
+NICE_0_LOAD = 1024
+
+
+class CFS(Policy):
+    """Completely-fair-style scheduling on virtual runtime.
+
+    A process's priority is read as its nice value (default 0). It runs for
+    its weighted share of ``sched_latency`` (at least ``min_granularity``),
+    and its vruntime advances by ``ran_for * NICE_0_LOAD / weight``. The
+    smallest vruntime runs next.
+    """
+
+    name = "CFS"
+    preempt_on_arrival = False
+
+    def __init__(self, sched_latency: int = 24, min_granularity: int = 3, weights: Optional[Dict[str, int]] = None):
+        if int(sched_latency) <= 0 or int(min_granularity) <= 0:
+            raise ValueError("CFS sched_latency and min_granularity must be > 0")
+        self.sched_latency = int(sched_latency)
+        self.min_granularity = int(min_granularity)
+        self.weights = dict(weights or {})
+        self.h: List[Tuple[float, int, str, ProcState]] = []
+        self.load = 0
+        self.min_vruntime = 0.0
+
+    def _weight(self, p: ProcState) -> int:
+        pid = str(p.pid)
+        if pid in self.weights:
+            w = int(self.weights[pid])
+            if w <= 0:
+                raise ValueError(f"weight for {pid} must be > 0")
+            return w
+        nice = 0 if p.priority is None else max(-20, min(19, int(p.priority)))
+        return NICE_WEIGHTS[nice + 20]
+
+    def _push(self, p: ProcState, now: int) -> None:
+        _mark_ready(p, now)
+        self.load += p.weight
+        heapq.heappush(self.h, (p.vruntime, int(p.arrival_time), str(p.pid), p))
+
+    def on_arrival(self, p: ProcState, now: int) -> None:
+        p.weight = self._weight(p)
+        p.vruntime = self.min_vruntime
+        self._push(p, now)
+
+    def put_back(self, p: ProcState, now: int) -> None:
+        if not hasattr(p, "vruntime"):
+            self.on_arrival(p, now)
+            return
+        p.vruntime = max(p.vruntime, self.min_vruntime)
+        self._push(p, now)
+
+    def select(self, now: int, current: Optional[ProcState]) -> Optional[ProcState]:
+        if current is not None:
+            return current
+        if not self.h:
+            return None
+        p = heapq.heappop(self.h)[-1]
+        self.load -= p.weight
+        self.min_vruntime = max(self.min_vruntime, p.vruntime)
+        return p
+
+    def max_continuous_run(self, p: ProcState, now: int) -> Optional[int]:
+        share = self.sched_latency * p.weight // (self.load + p.weight)
+        return min(int(p.remaining), max(self.min_granularity, share))
+
+    def on_run(self, p: ProcState, ran_for: int, now: int) -> None:
+        p.vruntime += int(ran_for) * NICE_0_LOAD / p.weight
+
+    def on_timeslice_expired(self, p: ProcState, now: int) -> None:
+        self._push(p, now)
+
+
 class _QueueAlgo:
+    """One ready queue of MLQ/MLFQ.
+
+    FIFO entries live in a chain of chunks so that whole queues can be
+    spliced into another level (MLFQ priority boost) without touching each
+    process. Heap and scan queues order entries by key alone, so they keep a
+    single chunk and merge on ``absorb``; ``pick`` never walks a growing
+    list of chunks.
+    """
+
     def __init__(self, algo: str, quantum: Optional[int] = None):
         self.algo = (algo or "FCFS").strip().upper()
         self.quantum = int(quantum) if quantum is not None else None
@@ -189,46 +514,57 @@ class _QueueAlgo:
         if self.algo == "RR":
             if self.quantum is None or self.quantum <= 0:
                 raise ValueError("RR queue requires time_slice > 0")
-            self.q: Deque[ProcState] = deque()
-        elif self.algo == "FCFS":
-            self.q = deque()
+        elif self.algo not in {"FCFS", "SJF", "SPN", "HRRN"}:
+            self.algo = "FCFS"
+
+        if self.algo in {"RR", "FCFS"}:
+            self.kind = "fifo"
         elif self.algo in {"SJF", "SPN"}:
-            self.h: List[Tuple[int, int, str, ProcState]] = []
-        elif self.algo == "HRRN":
-            self.ready: List[ProcState] = []
+            self.kind = "heap"
         else:
-            self.algo = "FCFS"
-            self.q = deque()
+            self.kind = "scan"
+        self._chunks: Deque[Any] = deque()
+        self._size = 0
+
+    @staticmethod
+    def _entry(p: ProcState) -> Tuple[int, int, str, ProcState]:
+        return (int(p.remaining), int(p.arrival_time), str(p.pid), p)
 
     def add(self, p: ProcState, now: int) -> None:
         _mark_ready(p, now)
-        if self.algo in {"RR", "FCFS"}:
-            self.q.append(p)
-        elif self.algo in {"SJF", "SPN"}:
-            heapq.heappush(self.h, (int(p.remaining), int(p.arrival_time), str(p.pid), p))
+        if not self._chunks:
+            self._chunks.append(deque() if self.kind == "fifo" else [])
+        if self.kind == "fifo":
+            self._chunks[-1].append(p)
+        elif self.kind == "heap":
+            heapq.heappush(self._chunks[0], self._entry(p))
         else:
-            self.ready.append(p)
+            self._chunks[0].append(p)
+        self._size += 1
 
     def empty(self) -> bool:
-        if self.algo in {"RR", "FCFS"}:
-            return not self.q
-        if self.algo in {"SJF", "SPN"}:
-            return not self.h
-        return not self.ready
+        return self._size == 0
+
+    def __len__(self) -> int:
+        return self._size
 
     def pick(self, now: int) -> Optional[ProcState]:
-        if self.empty():
+        if self._size == 0:
             return None
+        self._size -= 1
 
-        if self.algo in {"RR", "FCFS"}:
-            return self.q.popleft()
+        if self.kind == "fifo":
+            while not self._chunks[0]:
+                self._chunks.popleft()
+            return self._chunks[0].popleft()
 
-        if self.algo in {"SJF", "SPN"}:
-            return heapq.heappop(self.h)[-1]
+        chunk = self._chunks[0]
+        if self.kind == "heap":
+            return heapq.heappop(chunk)[-1]
 
         best_i = 0
         best_rr = -1.0
-        for i, p in enumerate(self.ready):
+        for i, p in enumerate(chunk):
             waiting = max(0, int(now) - _ready_since(p))
             service = max(1, int(p.remaining))
             rr = (waiting + service) / service
@@ -236,9 +572,52 @@ class _QueueAlgo:
                 best_rr = rr
                 best_i = i
             elif rr == best_rr:
-                if _key_arrival_pid(p) < _key_arrival_pid(self.ready[best_i]):
+                if _key_arrival_pid(p) < _key_arrival_pid(chunk[best_i]):
                     best_i = i
-        return self.ready.pop(best_i)
+        return chunk.pop(best_i)
+
+    def absorb(self, other: "_QueueAlgo") -> None:
+        """Move every entry of ``other`` behind this queue's entries.
+
+        FIFO queues hand over their chunks as they are (O(chunks)). A heap
+        takes the smaller side into the larger one, and a scan list is
+        extended. Mixed kinds re-key the moved entries.
+        """
+        if other._size == 0:
+            return
+        if other.kind == self.kind == "fifo":
+            self._chunks.extend(c for c in other._chunks if c)
+        elif other.kind == self.kind == "heap":
+            # Entries keep their keys: the remaining time does not change while queued.
+            self._merge_heap([e for chunk in other._chunks for e in chunk])
+        else:
+            procs: List[ProcState] = []
+            for chunk in other._chunks:
+                if other.kind == "heap":
+                    procs.extend(e[-1] for e in sorted(chunk))
+                else:
+                    procs.extend(chunk)
+            if self.kind == "fifo":
+                self._chunks.append(deque(procs))
+            elif self.kind == "heap":
+                self._merge_heap([self._entry(p) for p in procs])
+            elif self._chunks:
+                self._chunks[0].extend(procs)
+            else:
+                self._chunks.append(procs)
+        self._size += other._size
+        other._chunks = deque()
+        other._size = 0
+
+    def _merge_heap(self, entries: List[Tuple[int, int, str, ProcState]]) -> None:
+        base = self._chunks[0] if self._chunks else []
+        if len(entries) <= len(base):
+            for e in entries:
+                heapq.heappush(base, e)
+        else:
+            base = base + entries
+            heapq.heapify(base)
+        self._chunks = deque([base])
 
     def max_run(self, p: ProcState) -> int:
         if self.algo == "RR":
@@ -321,15 +700,29 @@ class MLQ(Policy):
 
 
 class MLFQ(Policy):
+    """Four-level feedback queue; levels 0..2 demote after their allotment.
+
+    With ``boost_period`` every queued process returns to level 0 each
+    ``boost_period`` ticks. The boost runs as an engine timer: the lower
+    queues are spliced onto level 0 and each process picks up its new
+    level and a fresh allotment lazily, when the boost epoch it last saw is
+    stale.
+    """
+
     name = "MLFQ"
     preempt_on_arrival = False
+    timer_boosts = True
 
-    def __init__(self, queues: List[dict]):
+    def __init__(self, queues: List[dict], boost_period: Optional[int] = None):
         if len(queues) != 4:
             raise ValueError("MLFQ requires exactly 4 levels")
+        if boost_period is not None and int(boost_period) <= 0:
+            raise ValueError("MLFQ boost_period must be > 0")
 
         self.levels: List[_QueueAlgo] = []
         self.demote_slices: List[Optional[int]] = [None, None, None, None]
+        self.boost_period = int(boost_period) if boost_period is not None else None
+        self.epoch = 0
 
         for i, cfg in enumerate(list(queues)):
             algo = cfg.get("algorithm") or cfg.get("algo") or "FCFS"
@@ -343,12 +736,32 @@ class MLFQ(Policy):
 
             self.levels.append(_QueueAlgo(algo, quantum=ts_int))
 
+    def next_timer(self, after: int) -> Optional[int]:
+        if self.boost_period is None:
+            return None
+        return (int(after) // self.boost_period + 1) * self.boost_period
+
+    def on_timer(self, now: int) -> None:
+        self.epoch += 1
+        top = self.levels[0]
+        for lvl in range(1, 4):
+            top.absorb(self.levels[lvl])
+
+    def _refresh(self, p: ProcState) -> None:
+        # A boost happened since p last queued or ran: back to the top with a new allotment.
+        if getattr(p, "boost_epoch", 0) != self.epoch:
+            p.boost_epoch = self.epoch
+            p.level = 0
+            p.quantum_left = 0
+
     def on_arrival(self, p: ProcState, now: int) -> None:
         p.level = 0
         p.quantum_left = 0
+        p.boost_epoch = self.epoch
         self.levels[0].add(p, now)
 
     def put_back(self, p: ProcState, now: int) -> None:
+        self._refresh(p)
         lvl = max(0, min(3, int(getattr(p, "level", 0))))
         self.levels[lvl].add(p, now)
 
@@ -372,6 +785,7 @@ class MLFQ(Policy):
             if not self.levels[lvl].empty():
                 p = self.levels[lvl].pick(now)
                 if p is not None:
+                    self._refresh(p)
                     p.level = lvl
                     if lvl < 3 and (p.quantum_left is None or int(p.quantum_left) <= 0):
                         p.quantum_left = int(self.demote_slices[lvl])
@@ -381,7 +795,7 @@ class MLFQ(Policy):
     def max_continuous_run(self, p: ProcState, now: int) -> Optional[int]:
         lvl = int(getattr(p, "level", 0))
         if lvl == 3:
-            return int(p.remaining)
+            return self.levels[3].max_run(p)
         ql = int(self.demote_slices[lvl]) if (p.quantum_left is None or int(p.quantum_left) <= 0) else int(p.quantum_left)
         return min(int(p.remaining), ql)
 
@@ -395,6 +809,11 @@ class MLFQ(Policy):
             p.quantum_left = int(p.quantum_left) - int(ran_for)
 
     def on_timeslice_expired(self, p: ProcState, now: int) -> None:
+        if getattr(p, "boost_epoch", 0) != self.epoch:
+            # Boosted while running: no demotion for the slice that straddled the boost.
+            self.put_back(p, now)
+            return
+
         lvl = int(getattr(p, "level", 0))
 
         if lvl == 3:
@@ -0,0 +1,168 @@
+"""Local process-pool execution of compare/batch jobs over a shared-memory workload.
+
+The workload is packed once into a ``SharedWorkload``. Each task carries only
+the block handles, its row number and the job dict, and it writes its
+summary into a ``SharedResults`` row. So a task costs the same to submit
+whatever the number of processes. ``execute_shared`` does the same for one
+``/execute`` run: the request goes without its process list and the worker
+sends back the encoded response body, plus the Gantt columns when the Gantt
+was too long to return, so the parent can index it for ``/gantt/window``. ``SIM_POOL_WORKERS`` sizes the pool; it
+defaults to the CPU count.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import re
+import threading
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from scheduling.engine import Segment
+from scheduling.schemas import SchedulingRequest, SchedulingResponse
+from scheduling.shm import ResultsHandle, SharedResults, SharedWorkload, WorkloadHandle, WorkloadView, write_row
+from scheduling.stats import percentile
+from scheduling.workload import PreparedWorkload
+RESULT_COLUMNS = (
+    "avg_waiting_time",
+    "avg_turnaround_time",
+    "avg_response_time",
+    "cpu_utilization",
+    "throughput",
+    "deadline_misses",
+    "context_switch_overhead",
+)
+_INT_COLUMNS = {"deadline_misses"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _workers() -> int:
+    return max(1, int(os.environ.get("SIM_POOL_WORKERS") or os.cpu_count() or 1))
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+_PERCENTILE = re.compile(r"p(\d+)_(waiting|turnaround|response)_time")
+
+
+def _column(res: Any, name: str) -> Optional[float]:
+    m = _PERCENTILE.fullmatch(name)
+    if m is not None:
+        return percentile(getattr(res, f"{m.group(2)}_time"), int(m.group(1)))
+    return getattr(res, name)
+
+
+def _run_shared(
+    workload: WorkloadHandle, results: ResultsHandle, row: int, job: Dict[str, Any], columns: Sequence[str]
+) -> None:
+    # Imported here so the module stays cheap to import in the parent.
+    from scheduling.service import execute_schedule, job_request
+
+    view = WorkloadView(workload)
+    try:
+        res = execute_schedule(job_request([], job), view.workload, metrics_only=True)
+    finally:
+        # The parent unlinks the block once its last task is done; a cached mapping would outlive that.
+        view.close()
+    write_row(results, row, [_column(res, c) for c in columns])
+
+
+# (starts, ends, pids) of a Gantt the worker left out of the response
+GanttColumns = Tuple[array, array, List[str]]
+
+
+def _execute_shared(
+    workload: WorkloadHandle, req: SchedulingRequest, fields: Optional[Sequence[str]], keep: Sequence[str]
+) -> Tuple[bytes, Optional[SchedulingResponse], Optional[GanttColumns]]:
+    from scheduling.serialize import response_json
+    from scheduling.service import execute_schedule
+
+    omitted: List[Segment] = []
+    view = WorkloadView(workload)
+    try:
+        # The request here has no processes, so its hash is not the caller's: the parent caches the index.
+        res = execute_schedule(req, view.workload, on_gantt_omitted=omitted.extend)
+    finally:
+        view.close()
+    kept = SchedulingResponse.construct(**{f: getattr(res, f) for f in keep}) if keep else None
+    gantt = None
+    if omitted:
+        gantt = (array("q", [s.start for s in omitted]), array("q", [s.end for s in omitted]), [s.pid for s in omitted])
+    return response_json(res, fields), kept, gantt
+
+
+def execute_shared(
+    workload: PreparedWorkload,
+    req: SchedulingRequest,
+    fields: Optional[Sequence[str]] = None,
+    keep: Sequence[str] = (),
+) -> Tuple[bytes, Optional[SchedulingResponse], Optional[GanttColumns]]:
+    """Run one schedule in the pool; returns the JSON body (restricted to ``fields``).
+
+    The second value is a partial response holding only the ``keep`` fields,
+    e.g. what the run store reads, or None when ``keep`` is empty. The third
+    holds the Gantt columns when it exceeded ``gantt_max_segments``, else None.
+    """
+    with SharedWorkload(workload) as shared:
+        shared.acquire()
+        fut = get_pool().submit(
+            _execute_shared, shared.handle, req.copy(update={"processes": []}), fields, tuple(keep)
+        )
+        fut.add_done_callback(lambda _f: shared.release())
+        return fut.result()
+
+
+def run_jobs_shared(
+    workload: PreparedWorkload, jobs: Sequence[Dict[str, Any]], columns: Sequence[str] = RESULT_COLUMNS
+) -> List[Dict[str, Any]]:
+    """Run every job in the pool; one ``{"algorithm", *columns}`` row per job, in job order.
+
+    With the default columns the rows are the same as ``run_job``'s summaries.
+    ``pNN_waiting_time``, ``pNN_turnaround_time`` and ``pNN_response_time`` are also available.
+    """
+    if not jobs:
+        return []
+    columns = tuple(columns)
+    pool = get_pool()
+    with SharedWorkload(workload) as shared, SharedResults(len(jobs), len(columns)) as results:
+        futures: List[Future] = []
+        for row, job in enumerate(jobs):
+            shared.acquire()
+            results.acquire()
+            fut = pool.submit(_run_shared, shared.handle, results.handle, row, job, columns)
+            fut.add_done_callback(lambda _f: (shared.release(), results.release()))
+            futures.append(fut)
+        try:
+            for fut in futures:
+                fut.result()
+        except BaseException:
+            for fut in futures:
+                fut.cancel()
+            raise
+        rows = results.rows()
+
+    out: List[Dict[str, Any]] = []
+    for job, values in zip(jobs, rows):
+        summary: Dict[str, Any] = {"algorithm": str(job["algorithm"]).strip().upper()}
+        for col, v in zip(columns, values):
+            summary[col] = int(v) if v is not None and col in _INT_COLUMNS else v
+        out.append(summary)
+    return out
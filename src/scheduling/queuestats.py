@@ -0,0 +1,191 @@
+"""Time-weighted ready-queue statistics, updated on enqueue/dequeue events only.
+
+The engine reports three kinds of event. A process enters the ready state
+(arrival, I/O return, preemption, slice expiry). It leaves it (dispatch).
+Or it runs for a while at some level. Between events the depth is
+constant, so each event adds ``depth * dt`` to the running integrals and
+``dt`` to the histogram bin of the current depth. That is O(1) per event
+(O(levels) for the per-level counters). Only depths that last a positive
+amount of time count towards the maximum.
+
+MLFQ boosts are applied lazily in the policy; here ``boost`` moves every
+ready process to level 0 in O(levels). Ready time is split at the boost.
+
+With ``timeline_points`` the depth is also kept as a series of equal-width
+buckets (time-weighted mean and max per bucket). The width starts at one
+tick and doubles, merging neighbours, whenever the series grows past twice
+the target. So the series always has between ``timeline_points`` and
+``2 * timeline_points`` buckets.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class QueueStats:
+    def __init__(self, levels: int = 0, timeline_points: int = 0):
+        if int(timeline_points) < 0:
+            raise ValueError("timeline_points must be >= 0")
+        self.levels = int(levels)
+        self.timeline_points = int(timeline_points)
+
+        self.start: Optional[int] = None
+        self.last: Optional[int] = None
+        self.depth = 0
+        self.max_depth = 0
+        self.area = 0
+        self.histogram: Dict[int, int] = {}
+
+        self.level_depth = [0] * self.levels
+        self.level_area = [0] * self.levels
+        self.level_max = [0] * self.levels
+
+        # pid -> (time it became ready, level, boost epoch)
+        self._ready: Dict[str, Tuple[int, int, int]] = {}
+        self.ready_time: Dict[str, List[int]] = {}
+        self.run_time: Dict[str, List[int]] = {}
+        self.demotions: Dict[str, int] = {}
+        self.epoch = 0
+        self._boosts: List[int] = []
+
+        self._width = 1
+        self._buckets: List[List[int]] = []  # [area, max] per bucket
+
+    def _advance(self, t: int) -> None:
+        if self.start is None:
+            self.start = self.last = t
+            return
+        dt = t - self.last
+        if dt <= 0:
+            return
+        d = self.depth
+        self.area += d * dt
+        self.histogram[d] = self.histogram.get(d, 0) + dt
+        if d > self.max_depth:
+            self.max_depth = d
+        for lvl in range(self.levels):
+            ld = self.level_depth[lvl]
+            if ld:
+                self.level_area[lvl] += ld * dt
+                if ld > self.level_max[lvl]:
+                    self.level_max[lvl] = ld
+        if self.timeline_points:
+            self._fill(self.last, t, d)
+        self.last = t
+
+    def _fill(self, t0: int, t1: int, d: int) -> None:
+        while t0 < t1:
+            buckets = self._buckets
+            idx = (t0 - self.start) // self._width
+            while idx >= len(buckets):
+                buckets.append([0, 0])
+            end = min(t1, self.start + (idx + 1) * self._width)
+            b = buckets[idx]
+            b[0] += d * (end - t0)
+            if d > b[1]:
+                b[1] = d
+            t0 = end
+            if len(buckets) > 2 * self.timeline_points:
+                self._coarsen()
+
+    def _coarsen(self) -> None:
+        old = self._buckets
+        self._buckets = [
+            [old[i][0] + (old[i + 1][0] if i + 1 < len(old) else 0), max(old[i][1], old[i + 1][1] if i + 1 < len(old) else 0)]
+            for i in range(0, len(old), 2)
+        ]
+        self._width *= 2
+
+    def _per_process(self, table: Dict[str, List[int]], pid: str) -> List[int]:
+        row = table.get(pid)
+        if row is None:
+            row = table[pid] = [0] * max(1, self.levels)
+        return row
+
+    def enter(self, t: int, pid: str, level: int = 0) -> None:
+        if pid in self._ready:
+            return
+        self._advance(max(t, self.last) if self.last is not None else t)
+        level = min(max(0, int(level)), self.levels - 1) if self.levels else 0
+        self._ready[pid] = (self.last, level, self.epoch)
+        self.depth += 1
+        if self.levels:
+            self.level_depth[level] += 1
+
+    def leave(self, t: int, pid: str) -> None:
+        entry = self._ready.pop(pid, None)
+        if entry is None:
+            return
+        self._advance(t)
+        since, level, epoch = entry
+        level_now = 0 if epoch != self.epoch else level
+        self.depth -= 1
+        if self.levels:
+            self.level_depth[level_now] -= 1
+            row = self._per_process(self.ready_time, pid)
+            if epoch != self.epoch:
+                boosted_at = self._boosts[epoch]
+                row[level] += boosted_at - since
+                row[0] += self.last - boosted_at
+            else:
+                row[level] += self.last - since
+
+    def ran(self, pid: str, level: int, ticks: int) -> None:
+        if self.levels:
+            self._per_process(self.run_time, pid)[min(max(0, int(level)), self.levels - 1)] += int(ticks)
+
+    def demoted(self, pid: str) -> None:
+        self.demotions[pid] = self.demotions.get(pid, 0) + 1
+
+    def boost(self, t: int) -> None:
+        """Every ready process moves to level 0 (MLFQ priority boost)."""
+        if not self.levels:
+            return
+        if self.start is not None:
+            self._advance(t)
+        self.level_depth = [sum(self.level_depth)] + [0] * (self.levels - 1)
+        self._boosts.append(t)
+        self.epoch += 1
+
+    def close(self, t: int) -> None:
+        if self.start is not None:
+            self._advance(t)
+
+    def report(self) -> Dict[str, Any]:
+        span = (self.last - self.start) if self.start is not None else 0
+        out: Dict[str, Any] = {
+            "avg_depth": self.area / span if span > 0 else 0.0,
+            "max_depth": self.max_depth,
+            "histogram": [{"depth": d, "time": self.histogram[d]} for d in sorted(self.histogram)],
+            "demotions": sum(self.demotions.values()),
+        }
+        if self.levels:
+            out["levels"] = [
+                {
+                    "level": lvl,
+                    "avg_depth": self.level_area[lvl] / span if span > 0 else 0.0,
+                    "max_depth": self.level_max[lvl],
+                }
+                for lvl in range(self.levels)
+            ]
+            pids = list(dict.fromkeys(list(self.run_time) + list(self.ready_time)))
+            zero = [0] * self.levels
+            out["processes"] = [
+                {
+                    "pid": pid,
+                    "run_time": self.run_time.get(pid, zero),
+                    "ready_time": self.ready_time.get(pid, zero),
+                    "demotions": self.demotions.get(pid, 0),
+                }
+                for pid in pids
+            ]
+        if self.timeline_points and self.start is not None:
+            w = self._width
+            out["timeline"] = []
+            for i, (area, peak) in enumerate(self._buckets):
+                b0 = self.start + i * w
+                b1 = min(b0 + w, self.last)
+                if b1 > b0:
+                    out["timeline"].append({"start": b0, "end": b1, "avg_depth": area / (b1 - b0), "max_depth": peak})
+        return out
@@ -0,0 +1,161 @@
+"""Periodic-task helpers for EDF/RM: release horizon, schedulability pre-checks, lateness.
+
+The pre-checks use the classic uniprocessor analysis. Tasks are released
+synchronously, context switches are free and a task's WCET is its total CPU
+demand. For RM and EDF that assumption is the worst case, so a "schedulable"
+verdict still holds for the offsets in the request.
+"""
+
+from __future__ import annotations
+
+import math
+from functools import reduce
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from scheduling.engine import ProcState
+from scheduling.schemas import SchedulabilityReport, TaskResponseTime
+from scheduling.stats import percentile
+from scheduling.workload import PreparedWorkload
+
+REALTIME_ALGOS = {"EDF", "RM"}
+MAX_RELEASE_HORIZON = 1_000_000
+MAX_RELEASED_JOBS = 1_000_000
+# Demand-bound checkpoints the EDF processor-demand test may visit before giving up.
+MAX_DEMAND_POINTS = 200_000
+
+Task = Tuple[str, int, int, int]  # (pid, wcet, period, deadline)
+
+
+def _tasks(workload: PreparedWorkload) -> List[Task]:
+    out: List[Task] = []
+    for i in workload.periodic:
+        period = int(workload.periods[i])
+        deadline = workload.deadlines[i]
+        deadline = int(deadline) if deadline is not None else period
+        out.append((workload.pids[i], int(workload.bursts[i]), period, deadline))
+    return out
+
+
+def release_horizon(workload: PreparedWorkload, config: Dict[str, Any], warnings: List[str]) -> Optional[int]:
+    """Time after which periodic tasks stop releasing jobs; None when there are no periodic tasks."""
+    periodic = workload.periodic
+    if not periodic:
+        return None
+    raw = (config or {}).get("horizon")
+    if raw is not None:
+        horizon = int(raw)
+        if horizon <= 0:
+            raise ValueError("config.horizon must be > 0")
+    else:
+        hyper = reduce(lambda a, b: a * b // math.gcd(a, b), (int(workload.periods[i]) for i in periodic), 1)
+        horizon = max(workload.arrivals[i] for i in periodic) + hyper
+        if horizon > MAX_RELEASE_HORIZON:
+            warnings.append(
+                f"Hyperperiod horizon {horizon} capped at {MAX_RELEASE_HORIZON}; set config.horizon to override"
+            )
+            horizon = MAX_RELEASE_HORIZON
+
+    jobs = sum(max(0, -(-(horizon - workload.arrivals[i]) // int(workload.periods[i]))) for i in periodic)
+    if jobs > MAX_RELEASED_JOBS:
+        raise ValueError(
+            f"Periodic tasks would release {jobs} jobs before horizon {horizon} (limit {MAX_RELEASED_JOBS})"
+        )
+    return horizon
+
+
+def _rm_response_times(tasks: Sequence[Task]) -> List[TaskResponseTime]:
+    # Rate-monotonic order, ties broken like the RM policy (period, then pid).
+    ordered = sorted(tasks, key=lambda t: (t[2], t[0]))
+    out: List[TaskResponseTime] = []
+    for i, (pid, c, t, d) in enumerate(ordered):
+        hp = ordered[:i]
+        limit = min(d, t)
+        r = c + sum(cj for _, cj, _, _ in hp)
+        while r <= limit:
+            nxt = c + sum(-(-r // tj) * cj for _, cj, tj, _ in hp)
+            if nxt == r:
+                break
+            r = nxt
+        out.append(TaskResponseTime(pid=pid, wcet=c, period=t, deadline=d, response_time=r if r <= limit else None))
+    return out
+
+
+def _edf_demand_ok(tasks: Sequence[Task], u: float) -> Tuple[Optional[bool], Optional[str]]:
+    """Processor-demand test: dbf(t) <= t at every absolute deadline up to the busy-period bound."""
+    hyper = reduce(lambda a, b: a * b // math.gcd(a, b), (t for _, _, t, _ in tasks), 1)
+    bound = hyper + max(d for _, _, _, d in tasks)
+    if u < 1:
+        l_star = sum((t - d) * (c / t) for _, c, t, d in tasks) / (1 - u)
+        bound = min(bound, max(max(d for _, _, _, d in tasks), math.ceil(l_star)))
+    if sum(max(0, (bound - d) // t + 1) for _, _, t, d in tasks) > MAX_DEMAND_POINTS:
+        return None, "too many deadlines to check; simulate instead"
+    points = sorted({d + k * t for _, _, t, d in tasks for k in range(max(0, (bound - d) // t + 1))})
+    for x in points:
+        demand = sum(((x - d) // t + 1) * c for _, c, t, d in tasks if x >= d)
+        if demand > x:
+            return False, f"demand {demand} exceeds supply {x} at t={x}"
+    return True, None
+
+
+def check_schedulability(algorithm: str, workload: PreparedWorkload) -> SchedulabilityReport:
+    algo = algorithm.upper()
+    if algo not in REALTIME_ALGOS:
+        raise ValueError(f"Schedulability analysis supports EDF and RM, not {algo}")
+    tasks = _tasks(workload)
+    if not tasks:
+        raise ValueError("Schedulability analysis needs at least one periodic process")
+
+    n = len(tasks)
+    u = sum(c / t for _, c, t, _ in tasks)
+    implicit = all(d >= t for _, _, t, d in tasks)
+    base = dict(algorithm=algo, tasks=n, utilization=u)
+
+    if u > 1:
+        return SchedulabilityReport(
+            **base, bound=1.0, test="utilization", schedulable=False, detail=f"utilization {u:.3f} > 1"
+        )
+
+    if algo == "EDF":
+        if implicit:
+            return SchedulabilityReport(**base, bound=1.0, test="utilization", schedulable=True)
+        density = sum(c / min(d, t) for _, c, t, d in tasks)
+        if density <= 1:
+            return SchedulabilityReport(**base, bound=1.0, test="density", schedulable=True)
+        ok, detail = _edf_demand_ok(tasks, u)
+        return SchedulabilityReport(**base, bound=1.0, test="processor-demand", schedulable=ok, detail=detail)
+
+    ll = n * (2 ** (1 / n) - 1)
+    if implicit and u <= ll:
+        return SchedulabilityReport(**base, bound=ll, test="liu-layland", schedulable=True)
+    rts = _rm_response_times(tasks)
+    misses = [r.pid for r in rts if r.response_time is None]
+    # With deadlines beyond the period the test only checks the first job, so a miss is inconclusive.
+    verdict: Optional[bool] = not misses
+    if misses and not all(d <= t for _, _, t, d in tasks):
+        verdict = None
+    return SchedulabilityReport(
+        **base,
+        bound=ll,
+        test="response-time",
+        schedulable=verdict,
+        detail=f"worst-case response exceeds min(deadline, period) for {', '.join(misses)}" if misses else None,
+        response_times=rts,
+    )
+
+
+def lateness_stats(procs: Sequence[ProcState]) -> Dict[str, Any]:
+    """Deadline-miss count and lateness percentiles over jobs that have a deadline."""
+    late = sorted(
+        int(p.completion_time) - int(p.deadline)
+        for p in procs
+        if p.deadline is not None and p.completion_time is not None
+    )
+    if not late:
+        return {}
+    return {
+        "deadline_misses": sum(1 for x in late if x > 0),
+        "max_lateness": late[-1],
+        "p50_lateness": percentile(late, 50, True),
+        "p95_lateness": percentile(late, 95, True),
+        "p99_lateness": percentile(late, 99, True),
+    }
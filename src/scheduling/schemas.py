@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 
 from pydantic import BaseModel, Field, root_validator, validator
 
@@ -10,6 +11,11 @@ class ProcessIn(BaseModel):
     arrival_time: int = 0
     burst_time: int
     priority: Optional[int] = None
+    bursts: Optional[List[int]] = None
+    io_device: Optional[str] = None
+    # Real-time: deadline is relative to each release; period makes the process a periodic task.
+    deadline: Optional[int] = None
+    period: Optional[int] = None
 
     @root_validator(pre=True)
     def _normalize_keys(cls, values: Dict[str, Any]):
@@ -22,6 +28,15 @@ class ProcessIn(BaseModel):
             v["burst_time"] = v.pop("burstTime")
         if "priority" not in v and "prio" in v:
             v["priority"] = v.pop("prio")
+        if "io_device" not in v and "ioDevice" in v:
+            v["io_device"] = v.pop("ioDevice")
+        if "deadline" not in v and "relativeDeadline" in v:
+            v["deadline"] = v.pop("relativeDeadline")
+        if "burst_time" not in v and isinstance(v.get("bursts"), list):
+            try:
+                v["burst_time"] = sum(int(b) for b in v["bursts"][0::2])
+            except (TypeError, ValueError):
+                pass
         return v
 
     @validator("arrival_time")
@@ -36,6 +51,24 @@ class ProcessIn(BaseModel):
             raise ValueError("burst_time must be > 0")
         return v
 
+    @validator("deadline", "period")
+    def _rt_positive(cls, v: Optional[int], field):
+        if v is not None and v <= 0:
+            raise ValueError(f"{field.name} must be > 0")
+        return v
+
+    @validator("bursts")
+    def _bursts_alternate(cls, v: Optional[List[int]], values: Dict[str, Any]):
+        if v is None:
+            return v
+        if len(v) % 2 == 0:
+            raise ValueError("bursts must alternate CPU/I/O and start and end with a CPU burst")
+        if any(b <= 0 for b in v):
+            raise ValueError("bursts must all be > 0")
+        if "burst_time" in values and sum(v[0::2]) != values["burst_time"]:
+            raise ValueError("burst_time must equal the sum of the CPU bursts")
+        return v
+
 
 class SchedulingRequest(BaseModel):
     algorithm: str
@@ -43,6 +76,9 @@ class SchedulingRequest(BaseModel):
     context_switch_time: int = 0
     time_slice: Optional[int] = None
     config: Dict[str, Any] = Field(default_factory=dict)
+    gantt_max_segments: Optional[int] = None
+    gantt_format: str = "objects"
+    gantt_compression: Optional[str] = None
 
     @root_validator(pre=True)
     def _normalize_request_keys(cls, values: Dict[str, Any]):
@@ -51,6 +87,28 @@ class SchedulingRequest(BaseModel):
             v["context_switch_time"] = v.pop("contextSwitchTime")
         if "time_slice" not in v and "timeSlice" in v:
             v["time_slice"] = v.pop("timeSlice")
+        if "gantt_max_segments" not in v and "ganttMaxSegments" in v:
+            v["gantt_max_segments"] = v.pop("ganttMaxSegments")
+        if "gantt_format" not in v and "ganttFormat" in v:
+            v["gantt_format"] = v.pop("ganttFormat")
+        if "gantt_compression" not in v and "ganttCompression" in v:
+            v["gantt_compression"] = v.pop("ganttCompression")
+        return v
+
+    @validator("gantt_format")
+    def _gantt_format(cls, v: str):
+        v = (v or "objects").strip().lower()
+        if v not in {"objects", "compact", "none"}:
+            raise ValueError("gantt_format must be 'objects', 'compact' or 'none'")
+        return v
+
+    @validator("gantt_compression")
+    def _gantt_compression(cls, v: Optional[str]):
+        if v is None:
+            return v
+        v = v.strip().lower()
+        if v not in {"gzip", "zstd"}:
+            raise ValueError("gantt_compression must be 'gzip' or 'zstd'")
         return v
 
     @validator("context_switch_time")
@@ -72,6 +130,8 @@ class CompareRequest(BaseModel):
     context_switch_time: int = 0
     time_slice: Optional[int] = None
     config: Dict[str, Any] = Field(default_factory=dict)
+    distributed: bool = False
+    parallel: bool = False
 
     @root_validator(pre=True)
     def _normalize_keys(cls, values: Dict[str, Any]):
@@ -101,6 +161,10 @@ class ProcessMetrics(BaseModel):
     turnaround_time: int
     response_time: int
     completion_time: int
+    io_time: int = 0
+    io_wait_time: int = 0
+    deadline: Optional[int] = None
+    lateness: Optional[int] = None
 
 
 class Averages(BaseModel):
@@ -109,6 +173,60 @@ class Averages(BaseModel):
     avg_response_time: float
 
 
+class TaskResponseTime(BaseModel):
+    pid: str
+    wcet: int
+    period: int
+    deadline: int
+    response_time: Optional[int] = None
+
+
+class SchedulabilityReport(BaseModel):
+    algorithm: str
+    tasks: int
+    utilization: float
+    bound: Optional[float] = None
+    test: str
+    schedulable: Optional[bool] = None
+    detail: Optional[str] = None
+    response_times: List[TaskResponseTime] = Field(default_factory=list)
+
+
+class DepthBin(BaseModel):
+    depth: int
+    time: int
+
+
+class LevelOccupancy(BaseModel):
+    level: int
+    avg_depth: float
+    max_depth: int
+
+
+class ProcessLevelTime(BaseModel):
+    pid: str
+    run_time: List[int]
+    ready_time: List[int]
+    demotions: int = 0
+
+
+class DepthPoint(BaseModel):
+    start: int
+    end: int
+    avg_depth: float
+    max_depth: int
+
+
+class QueueStatsReport(BaseModel):
+    avg_depth: float
+    max_depth: int
+    histogram: List[DepthBin]
+    demotions: int = 0
+    levels: Optional[List[LevelOccupancy]] = None
+    processes: Optional[List[ProcessLevelTime]] = None
+    timeline: Optional[List[DepthPoint]] = None
+
+
 class SchedulingResponse(BaseModel):
     algorithm: str
     gantt: List[GanttEntry]
@@ -130,3 +248,377 @@ class SchedulingResponse(BaseModel):
     cpu_utilization: Optional[float] = None
     throughput: Optional[float] = None
     warnings: List[str] = Field(default_factory=list)
+    gantt_omitted: bool = False
+    gantt_compact: Optional[Dict[str, Any]] = None
+
+    deadline_misses: Optional[int] = None
+    max_lateness: Optional[int] = None
+    p50_lateness: Optional[float] = None
+    p95_lateness: Optional[float] = None
+    p99_lateness: Optional[float] = None
+    schedulability: Optional[SchedulabilityReport] = None
+
+    context_switches: Optional[int] = None
+    context_switch_time_total: Optional[int] = None
+    context_switch_overhead: Optional[float] = None
+
+    queue_stats: Optional[QueueStatsReport] = None
+    # Id of the decision log written for config.event_log; query it with GET /events/{id}.
+    event_log: Optional[str] = None
+
+
+class GanttWindowRequest(BaseModel):
+    request: SchedulingRequest
+    start: Optional[int] = None
+    end: Optional[int] = None
+    max_buckets: int = 1000
+
+    @root_validator(pre=True)
+    def _normalize_keys(cls, values: Dict[str, Any]):
+        v = dict(values or {})
+        if "max_buckets" not in v and "maxBuckets" in v:
+            v["max_buckets"] = v.pop("maxBuckets")
+        return v
+
+    @validator("max_buckets")
+    def _buckets_positive(cls, v: int):
+        if v <= 0:
+            raise ValueError("max_buckets must be > 0")
+        return v
+
+
+class GanttBucketOut(BaseModel):
+    start: float
+    end: float
+    pid: Optional[str]
+    utilization: float
+    segments: int
+
+
+class GanttWindowResponse(BaseModel):
+    start: int
+    end: int
+    total_segments: int
+    window_segments: int
+    gantt: List[GanttEntry] = Field(default_factory=list)
+    buckets: List[GanttBucketOut] = Field(default_factory=list)
+
+
+class SessionCreateRequest(SchedulingRequest):
+    processes: List[ProcessIn] = Field(default_factory=list)
+
+
+class SessionSubmitRequest(BaseModel):
+    processes: List[ProcessIn]
+
+
+class SessionAdvanceRequest(BaseModel):
+    until: Optional[int] = None
+
+    @validator("until")
+    def _until_non_negative(cls, v: Optional[int]):
+        if v is not None and v < 0:
+            raise ValueError("until must be >= 0")
+        return v
+
+
+class SessionState(BaseModel):
+    session_id: str
+    algorithm: str
+    clock: int
+    submitted: int
+    completed: int
+    running: Optional[str] = None
+    ready: int = 0
+    finished: bool
+    metrics: List[ProcessMetrics]
+    averages: Optional[Averages] = None
+    cpu_utilization: Optional[float] = None
+    gantt: List[GanttEntry] = Field(default_factory=list)
+    warnings: List[str] = Field(default_factory=list)
+
+
+class BatchRun(BaseModel):
+    algorithm: str
+    context_switch_time: int = 0
+    time_slice: Optional[int] = None
+    config: Dict[str, Any] = Field(default_factory=dict)
+
+    @root_validator(pre=True)
+    def _normalize_keys(cls, values: Dict[str, Any]):
+        v = dict(values or {})
+        if "context_switch_time" not in v and "contextSwitchTime" in v:
+            v["context_switch_time"] = v.pop("contextSwitchTime")
+        if "time_slice" not in v and "timeSlice" in v:
+            v["time_slice"] = v.pop("timeSlice")
+        return v
+
+    @validator("algorithm")
+    def _algo_normalize(cls, v: str):
+        if not isinstance(v, str) or not v.strip():
+            raise ValueError("algorithm is required")
+        return v.strip().upper()
+
+
+class BatchRequest(BaseModel):
+    processes: List[ProcessIn]
+    runs: List[BatchRun]
+    distributed: bool = False
+    parallel: bool = False
+
+
+class OptimizeRequest(BaseModel):
+    algorithm: str = "MLFQ"
+    processes: List[ProcessIn]
+    context_switch_time: int = 0
+    time_slice: Optional[int] = None
+    config: Dict[str, Any] = Field(default_factory=dict)
+    candidates: int = 27
+    eta: int = 3
+    min_fraction: float = 0.1
+    quanta: Optional[List[int]] = None
+    seed: int = 0
+    parallel: bool = True
+
+    @root_validator(pre=True)
+    def _normalize_keys(cls, values: Dict[str, Any]):
+        v = dict(values or {})
+        if "context_switch_time" not in v and "contextSwitchTime" in v:
+            v["context_switch_time"] = v.pop("contextSwitchTime")
+        if "time_slice" not in v and "timeSlice" in v:
+            v["time_slice"] = v.pop("timeSlice")
+        if "min_fraction" not in v and "minFraction" in v:
+            v["min_fraction"] = v.pop("minFraction")
+        return v
+
+    @validator("algorithm")
+    def _algo(cls, v: str):
+        v = (v or "").strip().upper()
+        if v not in {"MLQ", "MLFQ"}:
+            raise ValueError("algorithm must be 'MLQ' or 'MLFQ'")
+        return v
+
+    @validator("candidates")
+    def _candidates(cls, v: int):
+        if not 1 <= v <= 512:
+            raise ValueError("candidates must be between 1 and 512")
+        return v
+
+    @validator("eta")
+    def _eta(cls, v: int):
+        if v < 2:
+            raise ValueError("eta must be >= 2")
+        return v
+
+    @validator("min_fraction")
+    def _min_fraction(cls, v: float):
+        if not 0 < v <= 1:
+            raise ValueError("min_fraction must be in (0, 1]")
+        return v
+
+    @validator("quanta")
+    def _quanta(cls, v: Optional[List[int]]):
+        if v is not None and (not v or any(int(q) <= 0 for q in v)):
+            raise ValueError("quanta must be a non-empty list of positive integers")
+        return v
+
+
+class OptimizeCandidate(BaseModel):
+    config: Dict[str, Any]
+    avg_waiting_time: float
+    p99_response_time: Optional[float] = None
+    cpu_utilization: Optional[float] = None
+    rank: int = 0
+
+
+class OptimizeRung(BaseModel):
+    prefix: int
+    evaluated: int
+    promoted: int
+
+
+class OptimizeResponse(BaseModel):
+    algorithm: str
+    simulations: int
+    rungs: List[OptimizeRung]
+    pareto: List[OptimizeCandidate]
+    finalists: List[OptimizeCandidate]
+
+
+class WorkloadSpec(BaseModel):
+    """Random workload distribution for replicated experiments."""
+
+    processes: int = 100
+    # poisson: exponential gaps; uniform: arrivals spread over processes * mean_interarrival;
+    # bursty: Poisson batches of geometric size (mean batch_size).
+    arrival: str = "poisson"
+    mean_interarrival: float = 4.0
+    batch_size: float = 4.0
+    # exponential(mean) | uniform(min, max) | lognormal(mean, sigma) | bimodal(min, max, long_fraction)
+    burst: str = "exponential"
+    mean_burst: float = 6.0
+    min_burst: int = 1
+    max_burst: int = 100
+    sigma: float = 1.0
+    long_fraction: float = 0.2
+    # priority -> weight; the default is an even mix of 1..4.
+    priorities: Dict[int, float] = Field(default_factory=lambda: {1: 1.0, 2: 1.0, 3: 1.0, 4: 1.0})
+
+    @validator("processes")
+    def _processes(cls, v: int):
+        if not 1 <= v <= 100_000:
+            raise ValueError("processes must be between 1 and 100000")
+        return v
+
+    @validator("arrival")
+    def _arrival(cls, v: str):
+        v = (v or "").strip().lower()
+        if v not in {"poisson", "uniform", "bursty"}:
+            raise ValueError("arrival must be 'poisson', 'uniform' or 'bursty'")
+        return v
+
+    @validator("burst")
+    def _burst(cls, v: str):
+        v = (v or "").strip().lower()
+        if v not in {"exponential", "uniform", "lognormal", "bimodal"}:
+            raise ValueError("burst must be 'exponential', 'uniform', 'lognormal' or 'bimodal'")
+        return v
+
+    @validator("mean_interarrival", "batch_size", "mean_burst", "sigma")
+    def _positive(cls, v: float):
+        if v <= 0:
+            raise ValueError("distribution parameters must be > 0")
+        return v
+
+    @validator("max_burst")
+    def _burst_range(cls, v: int, values: Dict[str, Any]):
+        if v < max(1, int(values.get("min_burst") or 1)):
+            raise ValueError("max_burst must be >= min_burst >= 1")
+        return v
+
+    @validator("long_fraction")
+    def _fraction(cls, v: float):
+        if not 0 <= v <= 1:
+            raise ValueError("long_fraction must be in [0, 1]")
+        return v
+
+    @validator("priorities")
+    def _mix(cls, v: Dict[int, float]):
+        if not v or any(w < 0 for w in v.values()) or sum(v.values()) <= 0:
+            raise ValueError("priorities must map priorities to non-negative weights with a positive sum")
+        return v
+
+
+class ExperimentRequest(BaseModel):
+    workload: WorkloadSpec = Field(default_factory=WorkloadSpec)
+    algorithms: Optional[List[str]] = None
+    context_switch_time: int = 0
+    time_slice: Optional[int] = None
+    config: Dict[str, Any] = Field(default_factory=dict)
+    metrics: List[str] = Field(default_factory=lambda: ["avg_waiting_time", "avg_turnaround_time", "avg_response_time"])
+    rank_by: str = "avg_waiting_time"
+    confidence: float = 0.95
+    # Pairs whose mean difference is surely within +-tolerance count as tied (and settled).
+    tolerance: float = 0.0
+    min_replicates: int = 5
+    max_replicates: int = 200
+    # Replicates per round; 0 means one per pool worker.
+    batch: int = 0
+    seed: int = 0
+    parallel: bool = True
+
+    @root_validator(pre=True)
+    def _normalize_keys(cls, values: Dict[str, Any]):
+        v = dict(values or {})
+        if "context_switch_time" not in v and "contextSwitchTime" in v:
+            v["context_switch_time"] = v.pop("contextSwitchTime")
+        if "time_slice" not in v and "timeSlice" in v:
+            v["time_slice"] = v.pop("timeSlice")
+        return v
+
+    @validator("context_switch_time")
+    def _cs_non_negative(cls, v: int):
+        if v < 0:
+            raise ValueError("context_switch_time must be >= 0")
+        return v
+
+    @validator("confidence")
+    def _confidence(cls, v: float):
+        if not 0 < v < 1:
+            raise ValueError("confidence must be in (0, 1)")
+        return v
+
+    @validator("tolerance")
+    def _tolerance(cls, v: float):
+        if v < 0:
+            raise ValueError("tolerance must be >= 0")
+        return v
+
+    @validator("min_replicates")
+    def _min_replicates(cls, v: int):
+        if v < 2:
+            raise ValueError("min_replicates must be >= 2")
+        return v
+
+    @validator("max_replicates")
+    def _max_replicates(cls, v: int, values: Dict[str, Any]):
+        if not (values.get("min_replicates") or 2) <= v <= 10_000:
+            raise ValueError("max_replicates must be between min_replicates and 10000")
+        return v
+
+    @validator("batch")
+    def _batch(cls, v: int):
+        if v < 0:
+            raise ValueError("batch must be >= 0")
+        return v
+
+
+class MetricInterval(BaseModel):
+    mean: float
+    half_width: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+
+class ExperimentAlgorithm(BaseModel):
+    algorithm: str
+    metrics: Dict[str, MetricInterval]
+
+
+class ExperimentComparison(BaseModel):
+    better: str
+    worse: str
+    mean_difference: float
+    half_width: Optional[float] = None
+    # "different", "equivalent" or None while still open
+    verdict: Optional[str] = None
+
+
+class ExperimentReport(BaseModel):
+    replicates: int
+    settled: bool
+    rank_by: str
+    ranking: List[str]
+    algorithms: List[ExperimentAlgorithm]
+    comparisons: List[ExperimentComparison]
+
+
+class WorkerRegistration(BaseModel):
+    url: str
+
+    @validator("url")
+    def _worker_url(cls, v: str):
+        """``http://host:port`` only: the worker protocol is plain HTTP at the server root."""
+        try:
+            parts = urlsplit((v or "").strip())
+            port = parts.port
+        except ValueError as e:
+            raise ValueError(f"invalid worker url: {e}")
+        if parts.scheme != "http":
+            raise ValueError("worker url must start with http://")
+        if not parts.hostname:
+            raise ValueError("worker url needs a host")
+        if parts.path not in ("", "/") or parts.query or parts.fragment or parts.username or parts.password:
+            raise ValueError("worker url must be http://host:port with no path, query or credentials")
+        host = f"[{parts.hostname}]" if ":" in parts.hostname else parts.hostname
+        return f"http://{host}:{port or 80}"
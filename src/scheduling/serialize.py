@@ -0,0 +1,83 @@
+"""Direct JSON encoding of ``SchedulingResponse``.
+
+With ``response_model`` set, FastAPI re-validates the model, walks it with
+``jsonable_encoder`` and only then dumps it. Plain fields are already
+int/float/str or lists of them, and each nested model has a converter in
+``_NESTED``, so ``response_json`` reads the attributes directly and encodes
+them once. ``fields`` keeps only the named top-level keys, e.g. to drop the
+repeated averages and per-process columns.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from scheduling.schemas import SchedulingResponse
+
+try:  # optional: several times faster than the stdlib encoder
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+RESPONSE_FIELDS = tuple(SchedulingResponse.__fields__)
+
+
+def parse_fields(spec: Optional[str]) -> Optional[List[str]]:
+    """``"a,b,c"`` -> field names in the order given; None/empty means every field."""
+    if not spec:
+        return None
+    names = [f.strip() for f in spec.split(",") if f.strip()]
+    unknown = [f for f in names if f not in SchedulingResponse.__fields__]
+    if unknown:
+        raise ValueError(f"Unknown response field(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def _gantt(res: SchedulingResponse) -> List[Dict[str, Any]]:
+    return [{"start": g.start, "end": g.end, "pid": g.pid} for g in res.gantt]
+
+
+def _metrics(res: SchedulingResponse) -> List[Dict[str, Any]]:
+    return [
+        {
+            "pid": m.pid,
+            "waiting_time": m.waiting_time,
+            "turnaround_time": m.turnaround_time,
+            "response_time": m.response_time,
+            "completion_time": m.completion_time,
+            "io_time": m.io_time,
+            "io_wait_time": m.io_wait_time,
+            "deadline": m.deadline,
+            "lateness": m.lateness,
+        }
+        for m in res.metrics
+    ]
+
+
+_NESTED: Dict[str, Callable[[SchedulingResponse], Any]] = {
+    "gantt": _gantt,
+    "metrics": _metrics,
+    "averages": lambda res: res.averages.dict(),
+    "schedulability": lambda res: res.schedulability.dict() if res.schedulability is not None else None,
+    "queue_stats": lambda res: res.queue_stats.dict() if res.queue_stats is not None else None,
+}
+
+
+def response_payload(res: SchedulingResponse, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Same content as ``res.dict()`` (restricted to ``fields``) without the pydantic walk."""
+    out: Dict[str, Any] = {}
+    for name in fields or RESPONSE_FIELDS:
+        nested = _NESTED.get(name)
+        out[name] = nested(res) if nested is not None else getattr(res, name)
+    return out
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def response_json(res: SchedulingResponse, fields: Optional[Sequence[str]] = None) -> bytes:
+    return dumps(response_payload(res, fields))
@@ -1,20 +1,44 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
 
-from scheduling.engine import ProcState, simulate
-from scheduling.policies import FCFS, HRRN, MLQ, MLFQ, RR, SJF, SRTF
+from scheduling.cache import LRUCache, request_hash
+from scheduling.engine import ProcState, Segment, simulate, simulate_totals
+from scheduling.eventlog import EventLog
+from scheduling.gantt import GanttIndex, encode_compact
+from scheduling.policies import CFS, EDF, FCFS, HRRN, LOTTERY, MLQ, MLFQ, RM, RR, SJF, SRTF, STRIDE
+from scheduling.queuestats import QueueStats
+from scheduling.realtime import REALTIME_ALGOS, check_schedulability, lateness_stats, release_horizon
 from scheduling.schemas import (
     Averages,
     CompareRequest,
+    GanttBucketOut,
     GanttEntry,
+    GanttWindowRequest,
+    GanttWindowResponse,
+    ProcessIn,
     ProcessMetrics,
+    QueueStatsReport,
     SchedulingRequest,
     SchedulingResponse,
 )
+from scheduling.sink import SegmentSink
+from scheduling.switching import build_switch_model
+from scheduling.workload import PreparedWorkload
 
 
-SUPPORTED_ALGOS = {"FCFS", "RR", "SJF", "SPN", "SRTF", "HRRN", "MLQ", "MLFQ"}
+SUPPORTED_ALGOS = {"FCFS", "RR", "SJF", "SPN", "SRTF", "HRRN", "MLQ", "MLFQ", "LOTTERY", "STRIDE", "CFS", "EDF", "RM"}
+MLFQ_LEVEL_ALGOS = {"RR", "FCFS", "SJF", "SPN", "HRRN"}
+
+# Only Gantts too long to return are indexed, so the cache is bounded by their total segment count.
+_GANTT_INDEXES: LRUCache[GanttIndex] = LRUCache(
+    32, max_weight=int(os.environ.get("GANTT_INDEX_MAX_SEGMENTS", "4000000")), weigh=len
+)
 
 
 def _build_policy(req: SchedulingRequest, warnings: List[str]):
@@ -30,10 +54,33 @@ def _build_policy(req: SchedulingRequest, warnings: List[str]):
         return HRRN()
     if algo == "SRTF":
         return SRTF()
+    if algo == "EDF":
+        return EDF()
+    if algo == "RM":
+        return RM()
     if algo == "RR":
         if req.time_slice is None:
             raise ValueError("time_slice is required for RR")
         return RR(int(req.time_slice))
+    if algo in {"LOTTERY", "STRIDE"}:
+        if req.time_slice is None:
+            raise ValueError(f"time_slice is required for {algo}")
+        cfg = req.config or {}
+        tickets = cfg.get("tickets") or {}
+        if not isinstance(tickets, dict):
+            raise ValueError("config.tickets must map pid to ticket count")
+        base = int(cfg.get("default_tickets", cfg.get("defaultTickets", 100)))
+        if algo == "STRIDE":
+            return STRIDE(int(req.time_slice), tickets=tickets, base_tickets=base)
+        return LOTTERY(int(req.time_slice), tickets=tickets, base_tickets=base, seed=int(cfg.get("seed", 0)))
+    if algo == "CFS":
+        cfg = req.config or {}
+        weights = cfg.get("weights") or {}
+        if not isinstance(weights, dict):
+            raise ValueError("config.weights must map pid to load weight")
+        latency = int(cfg.get("sched_latency", cfg.get("schedLatency", 24)))
+        granularity = int(cfg.get("min_granularity", cfg.get("minGranularity", req.time_slice or 3)))
+        return CFS(sched_latency=latency, min_granularity=granularity, weights=weights)
     if algo == "MLQ":
         cfg = req.config or {}
         queues = cfg.get("queues")
@@ -50,78 +97,242 @@ def _build_policy(req: SchedulingRequest, warnings: List[str]):
         return MLQ(queues=queues, priority_mapping=mapping)
     if algo == "MLFQ":
         cfg = req.config or {}
+        qs = cfg.get("queues")
+        if not (isinstance(qs, list) and len(qs) == 4 and all(isinstance(q, dict) for q in qs)):
+            qs = None
         slices = cfg.get("time_slices") or cfg.get("timeSlices")
-        if slices is None:
-            qs = cfg.get("queues")
-            if isinstance(qs, list) and len(qs) == 4:
-                slices = [q.get("time_slice") or q.get("timeSlice") for q in qs]
+        if slices is None and qs is not None:
+            slices = [q.get("time_slice") or q.get("timeSlice") for q in qs]
         if not isinstance(slices, list) or len(slices) != 4:
             if req.time_slice is None:
                 raise ValueError("time_slice is required for MLFQ (or provide config.time_slices)")
             base = int(req.time_slice)
             warnings.append("MLFQ config time_slices missing/invalid; using default [ts, 2ts, 4ts, FCFS]")
             slices = [base, base * 2, base * 4, None]
-        # Normalize: last level is always FCFS (no quantum)
-        slices = [slices[0], slices[1], slices[2], None]
-        queues = [
-            {"algorithm": "RR", "time_slice": slices[0]},
-            {"algorithm": "RR", "time_slice": slices[1]},
-            {"algorithm": "RR", "time_slice": slices[2]},
-            {"algorithm": "FCFS"},
-        ]
-        return MLFQ(queues=queues)
+
+        # Per-level algorithms come from config.queues; default RR, RR, RR, FCFS.
+        level_algos = ["RR", "RR", "RR", "FCFS"]
+        if qs is not None:
+            for i, q in enumerate(qs):
+                name = str(q.get("algorithm") or q.get("algo") or level_algos[i]).strip().upper()
+                if name not in MLFQ_LEVEL_ALGOS:
+                    warnings.append(f"MLFQ level {i} does not support {name}; using FCFS")
+                    name = "FCFS"
+                level_algos[i] = name
+        # Levels 0..2 demote after their slice whatever their algorithm; level 3 only
+        # has a quantum when it runs RR.
+        if level_algos[3] != "RR":
+            slices = [slices[0], slices[1], slices[2], None]
+        queues = [{"algorithm": a, "time_slice": ts} for a, ts in zip(level_algos, slices)]
+
+        boost = cfg.get("boost_period", cfg.get("boostPeriod"))
+        return MLFQ(queues=queues, boost_period=int(boost) if boost is not None else None)
 
     raise ValueError(f"Unsupported algorithm: {algo}")
 
 
-def execute_schedule(req: SchedulingRequest) -> SchedulingResponse:
+def process_metrics(p: ProcState) -> ProcessMetrics:
+    if p.completion_time is None or p.first_start is None:
+        raise ValueError(f"Process {p.pid} did not complete")
+    ct = int(p.completion_time)
+    tat = ct - int(p.arrival_time)
+    wt = tat - int(p.burst_time) - int(p.io_time) - int(p.io_wait)
+    rt = int(p.first_start) - int(p.arrival_time)
+    return ProcessMetrics(
+        pid=p.pid,
+        waiting_time=wt,
+        turnaround_time=tat,
+        response_time=rt,
+        completion_time=ct,
+        io_time=int(p.io_time),
+        io_wait_time=int(p.io_wait),
+        deadline=p.deadline,
+        lateness=ct - int(p.deadline) if p.deadline is not None else None,
+    )
+
+
+def _queue_stats(req: SchedulingRequest) -> Optional[QueueStats]:
+    """``config.queue_stats``: true, or ``{"timeline_points": n}`` to also get a depth series."""
+    spec = (req.config or {}).get("queue_stats")
+    if not spec:
+        return None
+    if spec is True:
+        spec = {}
+    if not isinstance(spec, dict):
+        raise ValueError("config.queue_stats must be true or an object")
+    points = int(spec.get("timeline_points", spec.get("timelinePoints", 0)))
+    return QueueStats(levels=4 if req.algorithm.upper() in {"MLQ", "MLFQ"} else 0, timeline_points=points)
+
+
+def event_log_path(log_id: str) -> str:
+    """File of event log ``log_id`` under ``EVENT_LOG_DIR``; raises ValueError when logging is off or the id is bad."""
+    root = os.environ.get("EVENT_LOG_DIR", "")
+    if not root:
+        raise ValueError("Event logging is disabled; set EVENT_LOG_DIR")
+    if not re.fullmatch(r"[0-9a-f]{32}", log_id or ""):
+        raise ValueError(f"Invalid event log id: {log_id}")
+    return os.path.join(root, f"{log_id}.evl")
+
+
+_LOG_NAME = re.compile(r"[0-9a-f]{32}\.evl")
+_PRUNE_LOCK = threading.Lock()
+
+
+def prune_event_logs(root: str, reserve: int = 0) -> int:
+    """Delete the oldest logs in ``root`` until it is within the retention limits; returns how many went.
+
+    ``EVENT_LOG_MAX_FILES`` (default 1000) caps the number of logs, ``EVENT_LOG_MAX_MB``
+    (default 1024) their total size and ``EVENT_LOG_MAX_AGE`` (seconds, default off) their
+    age; 0 turns a limit off. ``reserve`` slots are kept free for logs about to be created.
+    Only files named like log ids are considered.
+    """
+    max_files = int(os.environ.get("EVENT_LOG_MAX_FILES", "1000"))
+    max_bytes = int(float(os.environ.get("EVENT_LOG_MAX_MB", "1024")) * (1 << 20))
+    max_age = float(os.environ.get("EVENT_LOG_MAX_AGE", "0"))
+    if max_files <= 0 and max_bytes <= 0 and max_age <= 0:
+        return 0
+    with _PRUNE_LOCK:
+        logs = []
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if not _LOG_NAME.fullmatch(entry.name):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    logs.append((st.st_mtime, st.st_size, entry.path))
+        except FileNotFoundError:
+            return 0
+        # Newest first: logs are kept until the first one over a limit, which goes with every older one.
+        logs.sort(reverse=True)
+        cutoff = time.time() - max_age
+        files, total, removed = reserve, 0, 0
+        evicting = False
+        for mtime, size, path in logs:
+            evicting = (
+                evicting
+                or (max_files > 0 and files + 1 > max_files)
+                or (max_bytes > 0 and total + size > max_bytes)
+                or (max_age > 0 and mtime < cutoff)
+            )
+            if evicting:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                continue
+            files += 1
+            total += size
+        return removed
+
+
+def _event_log(req: SchedulingRequest) -> Optional[EventLog]:
+    """``config.event_log: true`` records every scheduling decision to a new file in ``EVENT_LOG_DIR``.
+
+    Older logs are pruned to the retention limits first (``prune_event_logs``).
+    """
+    if not (req.config or {}).get("event_log"):
+        return None
+    path = event_log_path(uuid.uuid4().hex)
+    root = os.path.dirname(path) or "."
+    os.makedirs(root, exist_ok=True)
+    prune_event_logs(root, reserve=1)
+    return EventLog(path)
+
+
+def execute_schedule(
+    req: SchedulingRequest,
+    workload: Optional[PreparedWorkload] = None,
+    metrics_only: bool = False,
+    sink: Optional[SegmentSink] = None,
+    on_gantt_omitted: Optional[Callable[[List[Segment]], None]] = None,
+) -> SchedulingResponse:
+    """Run one schedule. With ``sink`` the Gantt goes there (bounded memory) and ``gantt`` stays empty.
+
+    A Gantt over ``gantt_max_segments`` is handed to ``on_gantt_omitted``, which by default
+    indexes it for ``/gantt/window`` in this process.
+    """
     warnings: List[str] = []
     policy = _build_policy(req, warnings)
+    switch_cost = build_switch_model(int(req.context_switch_time), req.config or {}, warnings)
+    if workload is None:
+        workload = PreparedWorkload(req.processes)
+    metrics_only = metrics_only or req.gantt_format == "none" or sink is not None
 
-    procs = [
-        ProcState(
-            pid=p.pid,
-            arrival_time=int(p.arrival_time),
-            burst_time=int(p.burst_time),
-            priority=p.priority,
-        )
-        for p in req.processes
-    ]
+    horizon = release_horizon(workload, req.config or {}, warnings)
+    schedulability = None
+    if horizon is not None and req.algorithm.upper() in REALTIME_ALGOS:
+        # Cheap analytical verdict before paying for the simulation.
+        schedulability = check_schedulability(req.algorithm, workload)
+        if schedulability.schedulable is False:
+            if (req.config or {}).get("require_schedulable"):
+                raise ValueError(
+                    f"Task set is not schedulable under {schedulability.algorithm}: {schedulability.detail}"
+                )
+            warnings.append(f"Task set fails the {schedulability.test} test; deadline misses are expected")
 
-    gantt_segments, mutated = simulate(
-        processes=procs,
-        policy=policy,
-        context_switch_time=int(req.context_switch_time),
-    )
+    procs = workload.states(horizon)
+    queue_stats = _queue_stats(req)
+    event_log = _event_log(req)
+
+    gantt_segments: List[Segment] = []
+    try:
+        if metrics_only:
+            totals, procs = simulate_totals(
+                processes=procs,
+                policy=policy,
+                context_switch_time=int(req.context_switch_time),
+                arrival_order=workload.arrival_order,
+                sink=sink,
+                switch_cost=switch_cost,
+                queue_stats=queue_stats,
+                event_log=event_log,
+            )
+        else:
+            gantt_segments, procs = simulate(
+                processes=procs,
+                policy=policy,
+                context_switch_time=int(req.context_switch_time),
+                arrival_order=workload.arrival_order,
+                switch_cost=switch_cost,
+                queue_stats=queue_stats,
+                event_log=event_log,
+            )
+    finally:
+        if event_log is not None:
+            event_log.close()
+
+    if metrics_only:
+        total_time = totals.end - totals.start
+        idle_time = totals.idle_time
+        cs_time, cs_count = totals.cs_time, totals.cs_count
+    else:
+        total_time = gantt_segments[-1].end - gantt_segments[0].start if gantt_segments else 0
+        idle_time = 0
+        cs_time = cs_count = 0
+        for seg in gantt_segments:
+            if seg.pid == "IDLE":
+                idle_time += seg.end - seg.start
+            elif seg.pid == "CS":
+                cs_time += seg.end - seg.start
+                cs_count += 1
 
-    by_pid = {p.pid: p for p in mutated}
     metrics: List[ProcessMetrics] = []
     wt_list: List[int] = []
     tat_list: List[int] = []
     rt_list: List[int] = []
     ct_list: List[int] = []
 
-    for p_in in req.processes:
-        p = by_pid[p_in.pid]
-        if p.completion_time is None or p.first_start is None:
-            raise ValueError(f"Process {p.pid} did not complete")
-        ct = int(p.completion_time)
-        tat = ct - int(p.arrival_time)
-        wt = tat - int(p.burst_time)
-        rt = int(p.first_start) - int(p.arrival_time)
-        metrics.append(
-            ProcessMetrics(
-                pid=p.pid,
-                waiting_time=wt,
-                turnaround_time=tat,
-                response_time=rt,
-                completion_time=ct,
-            )
-        )
-        wt_list.append(wt)
-        tat_list.append(tat)
-        rt_list.append(rt)
-        ct_list.append(ct)
+    for p in procs:
+        m = process_metrics(p)
+        metrics.append(m)
+        wt_list.append(m.waiting_time)
+        tat_list.append(m.turnaround_time)
+        rt_list.append(m.response_time)
+        ct_list.append(m.completion_time)
 
     n = len(metrics) or 1
     avg_wt = sum(wt_list) / n
@@ -130,14 +341,33 @@ def execute_schedule(req: SchedulingRequest) -> SchedulingResponse:
 
     cpu_utilization = None
     throughput = None
-    if gantt_segments:
-        total_time = gantt_segments[-1].end - gantt_segments[0].start
-        idle_time = sum(s.end - s.start for s in gantt_segments if s.pid == "IDLE")
-        if total_time > 0:
-            cpu_utilization = (total_time - idle_time) / total_time
-            first_arr = min(p.arrival_time for p in procs)
-            makespan = max(p.completion_time or 0 for p in procs) - first_arr
-            throughput = (len(procs) / makespan) if makespan > 0 else None
+    if total_time > 0:
+        cpu_utilization = (total_time - idle_time) / total_time
+        first_arr = workload.first_arrival()
+        makespan = max(p.completion_time or 0 for p in procs) - first_arr
+        throughput = (len(procs) / makespan) if makespan > 0 else None
+
+    gantt_omitted = (
+        not metrics_only
+        and req.gantt_max_segments is not None
+        and len(gantt_segments) > int(req.gantt_max_segments)
+    )
+    if gantt_omitted:
+        if on_gantt_omitted is not None:
+            on_gantt_omitted(gantt_segments)
+        else:
+            remember_gantt(req, GanttIndex(gantt_segments))
+        warnings.append(
+            f"Gantt has {len(gantt_segments)} segments (> gantt_max_segments); query /gantt/window instead"
+        )
+
+    gantt: List[GanttEntry] = []
+    gantt_compact = None
+    if not (gantt_omitted or metrics_only):
+        if req.gantt_format == "compact":
+            gantt_compact = encode_compact(gantt_segments, req.gantt_compression)
+        else:
+            gantt = [GanttEntry(start=s.start, end=s.end, pid=s.pid) for s in gantt_segments]
 
     averages = Averages(
         avg_waiting_time=avg_wt,
@@ -147,7 +377,7 @@ def execute_schedule(req: SchedulingRequest) -> SchedulingResponse:
 
     return SchedulingResponse(
         algorithm=req.algorithm.upper(),
-        gantt=[GanttEntry(start=s.start, end=s.end, pid=s.pid) for s in gantt_segments],
+        gantt=gantt,
         metrics=metrics,
         averages=averages,
         waiting_time=wt_list,
@@ -163,29 +393,128 @@ def execute_schedule(req: SchedulingRequest) -> SchedulingResponse:
         cpu_utilization=cpu_utilization,
         throughput=throughput,
         warnings=warnings,
+        gantt_omitted=gantt_omitted,
+        gantt_compact=gantt_compact,
+        schedulability=schedulability,
+        context_switches=cs_count,
+        context_switch_time_total=cs_time,
+        context_switch_overhead=cs_time / total_time if total_time > 0 else None,
+        queue_stats=QueueStatsReport(**queue_stats.report()) if queue_stats is not None else None,
+        event_log=os.path.basename(event_log.path)[:-4] if event_log is not None else None,
+        **lateness_stats(procs),
     )
 
 
-def compare_algorithms(req: CompareRequest) -> Dict[str, Any]:
+def summarize(res: SchedulingResponse) -> Dict[str, Any]:
+    return {
+        "algorithm": res.algorithm,
+        "avg_waiting_time": res.avg_waiting_time,
+        "avg_turnaround_time": res.avg_turnaround_time,
+        "avg_response_time": res.avg_response_time,
+        "cpu_utilization": res.cpu_utilization,
+        "throughput": res.throughput,
+        "deadline_misses": res.deadline_misses,
+        "context_switch_overhead": res.context_switch_overhead,
+    }
+
+
+def compare_jobs(req: CompareRequest) -> List[Dict[str, Any]]:
     algos = req.algorithms or ["FCFS", "RR", "SJF", "SPN", "SRTF", "HRRN", "MLQ", "MLFQ"]
-    results: List[Dict[str, Any]] = []
-    for a in algos:
-        sreq = SchedulingRequest(
-            algorithm=a,
-            processes=req.processes,
-            context_switch_time=req.context_switch_time,
-            time_slice=req.time_slice,
-            config=req.config,
-        )
-        res = execute_schedule(sreq)
-        results.append(
-            {
-                "algorithm": res.algorithm,
-                "avg_waiting_time": res.avg_waiting_time,
-                "avg_turnaround_time": res.avg_turnaround_time,
-                "avg_response_time": res.avg_response_time,
-                "cpu_utilization": res.cpu_utilization,
-                "throughput": res.throughput,
-            }
+    return [
+        {
+            "algorithm": str(a).strip().upper(),
+            "context_switch_time": req.context_switch_time,
+            "time_slice": req.time_slice,
+            "config": req.config,
+        }
+        for a in algos
+    ]
+
+
+def job_request(processes: List[ProcessIn], job: Dict[str, Any]) -> SchedulingRequest:
+    """Unvalidated request for a compare/batch job dict (the caller already validated it)."""
+    return SchedulingRequest.construct(
+        algorithm=str(job["algorithm"]).strip().upper(),
+        processes=processes,
+        context_switch_time=int(job.get("context_switch_time") or 0),
+        time_slice=job.get("time_slice"),
+        config=job.get("config") or {},
+    )
+
+
+def run_job(
+    processes: List[ProcessIn],
+    workload: PreparedWorkload,
+    job: Dict[str, Any],
+    on_result: Optional[Callable[[SchedulingRequest, SchedulingResponse], None]] = None,
+    metrics_only: bool = True,
+) -> Dict[str, Any]:
+    sreq = job_request(processes, job)
+    res = execute_schedule(sreq, workload, metrics_only=metrics_only)
+    if on_result is not None:
+        on_result(sreq, res)
+    return summarize(res)
+
+
+def compare_algorithms(
+    req: CompareRequest,
+    on_result: Optional[Callable[[SchedulingRequest, SchedulingResponse], None]] = None,
+) -> Dict[str, Any]:
+    workload = PreparedWorkload(req.processes)
+    return {"results": [run_job(req.processes, workload, job, on_result) for job in compare_jobs(req)]}
+
+
+def remember_gantt(req: SchedulingRequest, index: GanttIndex) -> None:
+    """Keep the index ``/gantt/window`` pages through for ``req``."""
+    _GANTT_INDEXES.put(request_hash(req), index)
+
+
+def _gantt_index(req: SchedulingRequest) -> GanttIndex:
+    key = request_hash(req)
+    index = _GANTT_INDEXES.get(key)
+    if index is None:
+        workload = PreparedWorkload(req.processes)
+        segments, _ = simulate(
+            processes=workload.states(release_horizon(workload, req.config or {}, [])),
+            policy=_build_policy(req, []),
+            context_switch_time=int(req.context_switch_time),
+            arrival_order=workload.arrival_order,
+            switch_cost=build_switch_model(int(req.context_switch_time), req.config or {}, []),
         )
-    return {"results": results}
+        index = GanttIndex(segments)
+        remember_gantt(req, index)
+    return index
+
+
+def gantt_window(req: GanttWindowRequest) -> GanttWindowResponse:
+    index = _gantt_index(req.request)
+    start = index.start if req.start is None else int(req.start)
+    end = index.end if req.end is None else int(req.end)
+    if end < start:
+        raise ValueError("end must be >= start")
+
+    in_window = index.count(start, end)
+    gantt: List[GanttEntry] = []
+    buckets: List[GanttBucketOut] = []
+    if in_window <= req.max_buckets:
+        gantt = [GanttEntry(start=s.start, end=s.end, pid=s.pid) for s in index.window(start, end)]
+    else:
+        buckets = [
+            GanttBucketOut(
+                start=b.start,
+                end=b.end,
+                pid=b.pid,
+                utilization=b.utilization,
+                segments=b.segments,
+            )
+            for b in index.buckets(start, end, req.max_buckets)
+        ]
+
+    return GanttWindowResponse(
+        start=start,
+        end=end,
+        total_segments=len(index),
+        window_segments=in_window,
+        gantt=gantt,
+        buckets=buckets,
+    )
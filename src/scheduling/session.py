@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from typing import List, Optional, Sequence, Set
+
+from scheduling.admission import CostEstimate, admit, combine, estimate_cost
+from scheduling.cache import LRUCache
+from scheduling.engine import Engine, ProcState
+from scheduling.schemas import (
+    Averages,
+    GanttEntry,
+    ProcessIn,
+    ProcessMetrics,
+    SessionCreateRequest,
+    SessionState,
+)
+from scheduling.service import _build_policy, process_metrics
+from scheduling.sink import SegmentSink
+from scheduling.switching import build_switch_model
+from scheduling.workload import state_from_input
+
+
+class SimulationSession:
+    """Long-lived engine that accepts processes while the clock moves forward.
+
+    Metrics are summed as processes complete and utilization comes from the
+    engine's running totals, so a state update does not revisit the history.
+    The Gantt goes to a ``SegmentSink`` that spills to disk and is only read
+    back when a client asks for it. Every submission passes admission
+    control against the cost of all the processes submitted so far.
+    """
+
+    def __init__(self, session_id: str, req: SessionCreateRequest):
+        self.session_id = session_id
+        self.algorithm = req.algorithm.upper()
+        self.warnings: List[str] = []
+        self.sink = SegmentSink()
+        self.engine = Engine(
+            _build_policy(req, self.warnings),
+            int(req.context_switch_time),
+            record_segments=False,
+            sink=self.sink,
+            switch_cost=build_switch_model(int(req.context_switch_time), req.config or {}, self.warnings),
+            on_complete=self._completed,
+        )
+        self.clock = 0
+        horizon = (req.config or {}).get("horizon")
+        self.horizon = int(horizon) if horizon is not None else None
+        self.metrics: List[ProcessMetrics] = []
+        self._sums = [0, 0, 0]  # waiting, turnaround, response
+        self._pids: Set[str] = set()
+        self._lock = threading.Lock()
+        # The processes are estimated per submission; only the policy settings are kept.
+        self._request = req.copy(update={"processes": []})
+        self.cost: Optional[CostEstimate] = None
+        if req.processes:
+            try:
+                self.submit(req.processes)
+            except BaseException:
+                self.sink.close()
+                raise
+
+    def _completed(self, p: ProcState) -> None:
+        m = process_metrics(p)
+        self.metrics.append(m)
+        sums = self._sums
+        sums[0] += m.waiting_time
+        sums[1] += m.turnaround_time
+        sums[2] += m.response_time
+
+    def submit(self, processes: Sequence[ProcessIn]) -> None:
+        with self._lock:
+            batch: List[ProcState] = []
+            seen: Set[str] = set()
+            for p in processes:
+                pid = str(p.pid)
+                if pid in self._pids or pid in seen:
+                    raise ValueError(f"Duplicate pid: {pid}")
+                if int(p.arrival_time) < self.clock:
+                    raise ValueError(
+                        f"Process {pid} arrives at {p.arrival_time}, before the session clock {self.clock}"
+                    )
+                seen.add(pid)
+                batch.append(state_from_input(p, self.horizon))
+            est = estimate_cost(self._request.copy(update={"processes": list(processes)}), gantt=False)
+            cost = admit(combine([self.cost, est], retained=True) if self.cost is not None else est, pool=False)
+            for ps in batch:
+                self.engine.submit(ps)
+            self._pids.update(seen)
+            self.cost = cost
+
+    def advance(self, until: Optional[int]) -> None:
+        with self._lock:
+            if until is None:
+                self.engine.run(None)
+                self.clock = max(self.clock, self.engine.time)
+                return
+            if int(until) < self.clock:
+                raise ValueError(f"Cannot move the clock back from {self.clock} to {until}")
+            self.clock = int(until)
+            self.engine.run(self.clock)
+
+    def _gantt(self) -> List[GanttEntry]:
+        # The sink merges as it goes; the end-of-run fix-ups of Engine.gantt() are applied to a copy.
+        segments = [[s, e, pid] for s, e, pid in self.sink]
+        if len(segments) >= 2 and segments[-2][2] == "CS" and segments[-1][2] == "IDLE":
+            segments[-2:] = [[segments[-2][0], segments[-1][1], "IDLE"]]
+            if len(segments) >= 2 and segments[-2][2] == "IDLE" and segments[-2][1] == segments[-1][0]:
+                segments[-2:] = [[segments[-2][0], segments[-1][1], "IDLE"]]
+        elif segments and segments[-1][2] == "CS":
+            segments.pop()
+        return [GanttEntry(start=s, end=e, pid=pid) for s, e, pid in segments]
+
+    def state(self, include_gantt: bool = False, include_metrics: bool = False) -> SessionState:
+        with self._lock:
+            engine = self.engine
+            running = engine.running or engine.current
+            n = len(self.metrics)
+            averages = None
+            if n:
+                wt, tat, rt = self._sums
+                averages = Averages(avg_waiting_time=wt / n, avg_turnaround_time=tat / n, avg_response_time=rt / n)
+
+            totals = engine.final_totals()
+            span = totals.end - totals.start
+            cpu_utilization = totals.busy_time / span if span > 0 else None
+
+            return SessionState(
+                session_id=self.session_id,
+                algorithm=self.algorithm,
+                clock=self.clock,
+                submitted=engine.submitted,
+                completed=engine.done,
+                running=running.pid if running is not None else None,
+                ready=engine.submitted - engine.done - engine.pending_count - (1 if running is not None else 0),
+                finished=engine.done == engine.submitted,
+                metrics=list(self.metrics) if include_metrics else [],
+                averages=averages,
+                cpu_utilization=cpu_utilization,
+                gantt=self._gantt() if include_gantt else [],
+                warnings=self.warnings,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self.sink.close()
+
+
+class SessionManager:
+    def __init__(self, capacity: int):
+        self._sessions: LRUCache[SimulationSession] = LRUCache(capacity)
+
+    def create(self, req: SessionCreateRequest) -> SimulationSession:
+        session = SimulationSession(uuid.uuid4().hex, req)
+        # The engine's completion callback makes a cycle, so an evicted session would keep its
+        # spill file open until cyclic GC; close it now (under its own lock) instead.
+        for evicted in self._sessions.put(session.session_id, session):
+            evicted.close()
+        return session
+
+    def get(self, session_id: str) -> SimulationSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+
+sessions = SessionManager(int(os.environ.get("SESSION_CAPACITY", "128")))
@@ -0,0 +1,252 @@
+"""Shared-memory handoff of workloads and result columns to worker processes.
+
+A ``SharedWorkload`` packs a ``PreparedWorkload`` into one
+``multiprocessing.shared_memory`` block. The int64 columns come first
+(arrival, burst, priority, deadline, period, plus offsets into the pid,
+I/O-burst and device blobs), then the utf-8 pid and device blobs. Workers
+get a small ``handle`` tuple, attach by name and read the columns in place,
+so a task's IPC cost does not depend on the workload size. Results go the
+same way: each job writes one float64 row into a preallocated
+``SharedResults`` block.
+
+The parent owns both blocks and reference-counts them. Each task holds a
+reference until its future completes, and the block is unlinked when the
+last one is released. Workers never register the blocks with a resource
+tracker, and they unmap them when their task ends, so an unlinked block is
+not kept alive by an idle worker.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import sys
+import threading
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Sequence, Tuple
+
+from scheduling.workload import PreparedWorkload
+
+NONE = -(2 ** 63)  # int64 stand-in for None
+_Q = 8
+
+# (name, n, n_io_values, pid_blob_len, dev_blob_len)
+WorkloadHandle = Tuple[str, int, int, int, int]
+# (name, rows, columns)
+ResultsHandle = Tuple[str, int, int]
+
+
+class _Attached:
+    """Mapping of an existing POSIX block that never goes through a resource tracker."""
+
+    def __init__(self, name: str):
+        import _posixshmem
+
+        fd = _posixshmem.shm_open("/" + name, os.O_RDWR, mode=0o600)
+        try:
+            self._mmap = mmap.mmap(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        self.buf = memoryview(self._mmap)
+
+    def close(self) -> None:
+        self.buf.release()
+        self._mmap.close()
+
+
+def _attach(name: str) -> Any:
+    # Only the parent, which creates the blocks, may register and unlink them. Before 3.13,
+    # SharedMemory registers every attachment with the resource tracker, and spawn workers
+    # share the parent's tracker, so workers map the block themselves instead.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    if os.name == "posix":
+        return _Attached(name)
+    return shared_memory.SharedMemory(name=name)  # Windows has no tracker for shared memory
+
+
+class _Owned:
+    """Parent-side block with a reference count; unlinked when it drops to zero."""
+
+    def __init__(self, size: int):
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self._refs = 1
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._refs <= 0:
+                raise RuntimeError("shared block already released")
+            self._refs += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._refs -= 1
+            last = self._refs == 0
+        if last:
+            self._destroy()
+
+    def _destroy(self) -> None:
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def _column(values: Sequence[Optional[int]]) -> array:
+    return array("q", (NONE if v is None else int(v) for v in values))
+
+
+def _blob(strings: Sequence[Optional[str]]) -> Tuple[array, bytes]:
+    offsets = array("q", [0])
+    parts: List[bytes] = []
+    pos = 0
+    for s in strings:
+        raw = (s or "").encode("utf-8")
+        parts.append(raw)
+        pos += len(raw)
+        offsets.append(pos)
+    return offsets, b"".join(parts)
+
+
+class SharedWorkload(_Owned):
+    def __init__(self, workload: PreparedWorkload):
+        n = len(workload)
+        io_offsets = array("q", [0])
+        io_values = array("q")
+        for bursts in workload.io_bursts:
+            if bursts:
+                io_values.extend(int(b) for b in bursts)
+            io_offsets.append(len(io_values))
+        pid_offsets, pid_blob = _blob(workload.pids)
+        dev_offsets, dev_blob = _blob(workload.io_devices)
+
+        columns = [
+            _column(workload.arrivals),
+            _column(workload.bursts),
+            _column(workload.priorities),
+            _column(workload.deadlines),
+            _column(workload.periods),
+            pid_offsets,
+            io_offsets,
+            dev_offsets,
+            io_values,
+        ]
+        ints = sum(len(c) for c in columns)
+        super().__init__(ints * _Q + len(pid_blob) + len(dev_blob))
+
+        buf = self.shm.buf
+        pos = 0
+        for col in columns:
+            raw = col.tobytes()
+            buf[pos:pos + len(raw)] = raw
+            pos += len(raw)
+        buf[pos:pos + len(pid_blob)] = pid_blob
+        pos += len(pid_blob)
+        buf[pos:pos + len(dev_blob)] = dev_blob
+        self.handle: WorkloadHandle = (self.name, n, len(io_values), len(pid_blob), len(dev_blob))
+
+
+class WorkloadView:
+    """Worker-side attachment: a ``PreparedWorkload`` read from the shared block."""
+
+    def __init__(self, handle: WorkloadHandle):
+        name, n, n_io, pid_len, dev_len = handle
+        self.shm = _attach(name)
+        ints = memoryview(self.shm.buf)[: (8 * n + 3 + n_io) * _Q].cast("q")
+        self._views = [ints]
+        try:
+            cols = [ints[i * n:(i + 1) * n] for i in range(5)]
+            self._views = cols + [ints]
+            base = 5 * n
+            pid_off = ints[base:base + n + 1].tolist()
+            io_off = ints[base + n + 1:base + 2 * n + 2].tolist()
+            dev_off = ints[base + 2 * n + 2:base + 3 * n + 3].tolist()
+            io_vals = ints[base + 3 * n + 3:base + 3 * n + 3 + n_io]
+            blob_at = (8 * n + 3 + n_io) * _Q
+            pid_blob = bytes(self.shm.buf[blob_at:blob_at + pid_len])
+            dev_blob = bytes(self.shm.buf[blob_at + pid_len:blob_at + pid_len + dev_len])
+
+            def nullable(col: memoryview) -> List[Optional[int]]:
+                return [None if v == NONE else v for v in col.tolist()]
+
+            w = PreparedWorkload.__new__(PreparedWorkload)
+            w.pids = [pid_blob[pid_off[i]:pid_off[i + 1]].decode("utf-8") for i in range(n)]
+            # Arrival/burst columns stay in the shared block; nullable ones need None decoding.
+            w.arrivals = cols[0]
+            w.bursts = cols[1]
+            w.priorities = nullable(cols[2])
+            w.deadlines = nullable(cols[3])
+            w.periods = nullable(cols[4])
+            w.io_bursts = [io_vals[io_off[i]:io_off[i + 1]].tolist() or None for i in range(n)]
+            w.io_devices = [dev_blob[dev_off[i]:dev_off[i + 1]].decode("utf-8") or None for i in range(n)]
+            w.index = {pid: i for i, pid in enumerate(w.pids)}
+            w.arrival_order = sorted(range(n), key=lambda i: (w.arrivals[i], w.pids[i]))
+            self.workload = w
+            for col in cols[2:]:
+                col.release()
+            io_vals.release()
+            self._views = [cols[0], cols[1], ints]
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        # Slices first: the block cannot close while any view still exports it.
+        for v in self._views:
+            v.release()
+        self._views = []
+        self.shm.close()
+
+
+class SharedResults(_Owned):
+    """``rows x columns`` float64 matrix; NaN marks a missing value."""
+
+    def __init__(self, rows: int, columns: int):
+        super().__init__(rows * columns * _Q)
+        view = memoryview(self.shm.buf).cast("d")
+        try:
+            for i in range(rows * columns):
+                view[i] = math.nan
+        finally:
+            view.release()
+        self.handle: ResultsHandle = (self.name, rows, columns)
+
+    def rows(self) -> List[List[Optional[float]]]:
+        _, rows, columns = self.handle
+        view = memoryview(self.shm.buf).cast("d")
+        try:
+            flat = view[: rows * columns].tolist()
+        finally:
+            view.release()
+        return [
+            [None if math.isnan(v) else v for v in flat[r * columns:(r + 1) * columns]]
+            for r in range(rows)
+        ]
+
+
+def write_row(handle: ResultsHandle, row: int, values: Sequence[Optional[float]]) -> None:
+    name, _, columns = handle
+    shm = _attach(name)
+    try:
+        view = memoryview(shm.buf).cast("d")
+        try:
+            for j, v in enumerate(values[:columns]):
+                view[row * columns + j] = math.nan if v is None else float(v)
+        finally:
+            view.release()
+    finally:
+        shm.close()
@@ -0,0 +1,150 @@
+"""Bounded-memory Gantt sink: merge on append, spill fixed-size chunks to a temp file.
+
+The engine's in-memory path keeps every raw segment until ``gantt()`` merges
+them. ``SegmentSink`` instead keeps the last two merged segments hot. Those are
+all the end-of-run CS/IDLE fix-ups need. Older segments go into an int64
+buffer of ``(start, end, pid index)`` triples, and every ``chunk_segments``
+of them the buffer is written to an anonymous temporary file. Reading maps
+that file, so RAM stays bounded by the chunk size and the number of distinct
+pids however long the schedule runs.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import tempfile
+from array import array
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_SEGMENTS = int(os.environ.get("GANTT_SPILL_SEGMENTS", "65536"))
+
+_ITEM = array("q").itemsize
+
+
+class SegmentSink:
+    def __init__(self, chunk_segments: int = DEFAULT_CHUNK_SEGMENTS):
+        if int(chunk_segments) <= 0:
+            raise ValueError("chunk_segments must be > 0")
+        self.chunk_segments = int(chunk_segments)
+        self.pids: List[str] = []
+        self._pid_index: Dict[str, int] = {}
+        self._hot: List[List[int]] = []  # last two merged segments as [start, end, pid index]
+        self._buf = array("q")
+        self._file: Optional[IO[bytes]] = None
+        self._spilled = 0
+        self._count = 0
+        self._finished = False
+
+    def _pid(self, pid: str) -> int:
+        idx = self._pid_index.get(pid)
+        if idx is None:
+            idx = self._pid_index[pid] = len(self.pids)
+            self.pids.append(pid)
+        return idx
+
+    def append(self, start: int, end: int, pid: str) -> None:
+        idx = self._pid(pid)
+        hot = self._hot
+        if hot and hot[-1][2] == idx and hot[-1][1] == start:
+            hot[-1][1] = end
+            return
+        if len(hot) == 2:
+            self._cold(hot.pop(0))
+        hot.append([start, end, idx])
+
+    def _cold(self, seg: List[int]) -> None:
+        if seg[1] <= seg[0]:
+            return
+        self._buf.extend(seg)
+        self._count += 1
+        if len(self._buf) >= 3 * self.chunk_segments:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="gantt-")
+        self._buf.tofile(self._file)
+        # Flushed per chunk so an unfinished sink (an online session) can be read back too.
+        self._file.flush()
+        self._spilled += len(self._buf) // 3
+        self._buf = array("q")
+
+    def finish(self) -> None:
+        """Apply the engine's end-of-run fix-ups (as ``Engine.gantt(final=True)`` does) and seal."""
+        if self._finished:
+            return
+        self._finished = True
+        hot = self._hot
+        cs = self._pid_index.get("CS")
+        idle = self._pid_index.get("IDLE")
+        if len(hot) >= 2 and hot[-2][2] == cs and hot[-1][2] == idle:
+            hot[-2] = [hot[-2][0], hot[-1][1], self._pid("IDLE")]
+            hot.pop()
+        elif hot and hot[-1][2] == cs:
+            hot.pop()
+        for seg in hot:
+            self._cold(seg)
+        self._hot = []
+        if self._file is not None:
+            self._file.flush()
+
+    def __len__(self) -> int:
+        return self._count + sum(1 for s in self._hot if s[1] > s[0])
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled
+
+    def _triples(self) -> Iterator[Tuple[int, int, int]]:
+        if self._file is not None and self._spilled:
+            with mmap.mmap(self._file.fileno(), self._spilled * 3 * _ITEM, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm).cast("q")
+                try:
+                    step = 3 * self.chunk_segments
+                    for off in range(0, len(view), step):
+                        chunk = view[off:off + step].tolist()
+                        for i in range(0, len(chunk), 3):
+                            yield chunk[i], chunk[i + 1], chunk[i + 2]
+                finally:
+                    view.release()
+        buf = self._buf
+        for i in range(0, len(buf), 3):
+            yield buf[i], buf[i + 1], buf[i + 2]
+        for s, e, p in self._hot:
+            if e > s:
+                yield s, e, p
+
+    def __iter__(self) -> Iterator[Tuple[int, int, str]]:
+        pids = self.pids
+        for s, e, p in self._triples():
+            yield s, e, pids[p]
+
+    def iter_json(self, batch_bytes: int = 1 << 16) -> Iterator[str]:
+        """Comma-separated ``{"start","end","pid"}`` objects, in text batches of about ``batch_bytes``."""
+        names = [json.dumps(p) for p in self.pids]
+        parts: List[str] = []
+        size = 0
+        first = True
+        for s, e, p in self._triples():
+            item = f'{"" if first else ","}{{"start":{s},"end":{e},"pid":{names[p]}}}'
+            first = False
+            parts.append(item)
+            size += len(item)
+            if size >= batch_bytes:
+                yield "".join(parts)
+                parts, size = [], 0
+        if parts:
+            yield "".join(parts)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "SegmentSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+from scheduling.cache import request_hash, workload_hash
+from scheduling.schemas import SchedulingRequest, SchedulingResponse
+from scheduling.stats import percentile
+
+log = logging.getLogger(__name__)
+
+HIGHER_IS_BETTER = {"cpu_utilization", "throughput"}
+# Metric columns of a row, in table order.
+METRICS = (
+    "avg_waiting_time",
+    "avg_turnaround_time",
+    "avg_response_time",
+    "p50_waiting_time",
+    "p95_waiting_time",
+    "p99_waiting_time",
+    "p50_turnaround_time",
+    "p95_turnaround_time",
+    "p99_turnaround_time",
+    "p50_response_time",
+    "p95_response_time",
+    "p99_response_time",
+    "cpu_utilization",
+    "throughput",
+)
+METRIC_COLUMNS = set(METRICS)
+
+# Response fields a row is built from (plus ``gantt`` with ``store_gantt``).
+ROW_FIELDS = (
+    "algorithm",
+    "waiting_time",
+    "turnaround_time",
+    "response_time",
+    "avg_waiting_time",
+    "avg_turnaround_time",
+    "avg_response_time",
+    "cpu_utilization",
+    "throughput",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    algorithm TEXT NOT NULL,
+    workload_hash TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    n_processes INTEGER NOT NULL,
+    context_switch_time INTEGER NOT NULL,
+    time_slice INTEGER,
+    config TEXT NOT NULL,
+    avg_waiting_time REAL,
+    avg_turnaround_time REAL,
+    avg_response_time REAL,
+    p50_waiting_time REAL,
+    p95_waiting_time REAL,
+    p99_waiting_time REAL,
+    p50_turnaround_time REAL,
+    p95_turnaround_time REAL,
+    p99_turnaround_time REAL,
+    p50_response_time REAL,
+    p95_response_time REAL,
+    p99_response_time REAL,
+    cpu_utilization REAL,
+    throughput REAL,
+    gantt BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_algorithm ON runs (algorithm, created_at);
+CREATE INDEX IF NOT EXISTS runs_workload ON runs (workload_hash, algorithm);
+CREATE INDEX IF NOT EXISTS runs_request ON runs (request_hash, created_at);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+"""
+
+_INSERT = """
+INSERT INTO runs (
+    created_at, algorithm, workload_hash, request_hash, n_processes,
+    context_switch_time, time_slice, config,
+    avg_waiting_time, avg_turnaround_time, avg_response_time,
+    p50_waiting_time, p95_waiting_time, p99_waiting_time,
+    p50_turnaround_time, p95_turnaround_time, p99_turnaround_time,
+    p50_response_time, p95_response_time, p99_response_time,
+    cpu_utilization, throughput, gantt
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _encode_gantt(res: SchedulingResponse) -> Optional[bytes]:
+    if not res.gantt:
+        return None
+    raw = json.dumps([[g.start, g.end, g.pid] for g in res.gantt], separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"), 6)
+
+
+def decode_gantt(blob: Optional[bytes]) -> List[Dict[str, Any]]:
+    if not blob:
+        return []
+    return [
+        {"start": s, "end": e, "pid": pid}
+        for s, e, pid in json.loads(zlib.decompress(blob).decode("utf-8"))
+    ]
+
+
+def run_metrics(res: SchedulingResponse) -> Dict[str, Optional[float]]:
+    """The ``METRICS`` values of one run; workers send these instead of the whole response."""
+    out: Dict[str, Optional[float]] = {
+        "avg_waiting_time": res.avg_waiting_time,
+        "avg_turnaround_time": res.avg_turnaround_time,
+        "avg_response_time": res.avg_response_time,
+        "cpu_utilization": res.cpu_utilization,
+        "throughput": res.throughput,
+    }
+    for kind in ("waiting", "turnaround", "response"):
+        values = sorted(getattr(res, f"{kind}_time"))
+        for q in (50, 95, 99):
+            out[f"p{q}_{kind}_time"] = percentile(values, q, True)
+    return out
+
+
+class RunStore:
+    """SQLite-backed history of simulation results.
+
+    ``record`` only enqueues the run, trimmed to the response fields a row
+    needs (``fields``), so a queued run holds no Gantt unless ``store_gantt``
+    is set. ``record_metrics`` enqueues metrics a worker already computed. A
+    background thread reduces each run to its row (percentiles, hashes, the
+    compressed Gantt) and commits rows in batches, so the request path
+    neither builds rows nor touches the database. The queue holds at most
+    ``max_queue`` runs. When the writer falls behind, further runs are
+    dropped and counted in ``dropped`` rather than held in memory. Reads see
+    what has been committed so far; they do not wait for the queue.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        store_gantt: bool = False,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        max_queue: int = 4096,
+    ):
+        self.path = path
+        self.store_gantt = store_gantt
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_interval)
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name="run-store-writer", daemon=True)
+                self._writer.start()
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Response fields ``record`` reads; a partial response with just these is enough."""
+        return ROW_FIELDS + (("gantt",) if self.store_gantt else ())
+
+    def record(self, req: SchedulingRequest, res: SchedulingResponse) -> None:
+        self._enqueue(req, SchedulingResponse.construct(**{f: getattr(res, f) for f in self.fields}))
+
+    def record_metrics(self, req: SchedulingRequest, metrics: Dict[str, Optional[float]]) -> None:
+        """Record a run from its ``run_metrics`` (pool and remote runs); no Gantt is stored."""
+        self._enqueue(req, metrics)
+
+    def _enqueue(self, req: SchedulingRequest, run: Any) -> None:
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((time.time(), req, run))
+        except queue.Full:
+            self._drop()
+
+    def _drop(self) -> None:
+        if not self.dropped:
+            log.warning("run store: writer queue is full, dropping runs")
+        self.dropped += 1
+
+    def _row(self, created_at: float, req: SchedulingRequest, run: Any) -> tuple:
+        if isinstance(run, dict):
+            metrics, gantt = run, None
+        else:
+            metrics = run_metrics(run)
+            gantt = _encode_gantt(run) if self.store_gantt else None
+        return (
+            created_at,
+            req.algorithm.upper(),
+            workload_hash(req.processes),
+            request_hash(req),
+            len(req.processes),
+            int(req.context_switch_time),
+            req.time_slice,
+            json.dumps(req.config or {}, sort_keys=True, default=str),
+            *(metrics.get(m) for m in METRICS),
+            gantt,
+        )
+
+    def _run_writer(self) -> None:
+        conn = self._connect()
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [item]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    rows = []
+                    for entry in batch:
+                        if entry is None:
+                            stopping = True
+                            continue
+                        try:
+                            rows.append(self._row(*entry))
+                        except Exception:
+                            log.exception("run store: could not build a row, dropping the run")
+                    if rows:
+                        with conn:
+                            conn.executemany(_INSERT, rows)
+                except Exception:
+                    log.exception("run store: dropped batch of %d runs", len(batch))
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            conn.close()
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def best_algorithm(self, workload: str, metric: str = "avg_waiting_time") -> List[Dict[str, Any]]:
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unsupported metric: {metric}")
+        agg = "MAX" if metric in HIGHER_IS_BETTER else "MIN"
+        order = "DESC" if metric in HIGHER_IS_BETTER else "ASC"
+        sql = (
+            f"SELECT algorithm, {agg}({metric}) AS value, COUNT(*) AS runs, MAX(created_at) AS last_run "
+            f"FROM runs WHERE workload_hash = ? AND {metric} IS NOT NULL "
+            f"GROUP BY algorithm ORDER BY value {order}"
+        )
+        with closing(self._connect()) as conn:
+            return [dict(r) for r in conn.execute(sql, (workload,))]
+
+    def history(
+        self,
+        request: Optional[str] = None,
+        algorithm: Optional[str] = None,
+        workload: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 100,
+        include_gantt: bool = False,
+    ) -> List[Dict[str, Any]]:
+        where: List[str] = []
+        args: List[Any] = []
+        if request:
+            where.append("request_hash = ?")
+            args.append(request)
+        if algorithm:
+            where.append("algorithm = ?")
+            args.append(algorithm.strip().upper())
+        if workload:
+            where.append("workload_hash = ?")
+            args.append(workload)
+        if since is not None:
+            where.append("created_at >= ?")
+            args.append(float(since))
+        sql = "SELECT * FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        args.append(max(1, int(limit)))
+
+        out: List[Dict[str, Any]] = []
+        with closing(self._connect()) as conn:
+            for r in conn.execute(sql, args):
+                row = dict(r)
+                blob = row.pop("gantt")
+                row["config"] = json.loads(row["config"])
+                if include_gantt:
+                    row["gantt"] = decode_gantt(blob)
+                out.append(row)
+        return out
+
+
+_STORE: Optional[RunStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_run_store() -> Optional[RunStore]:
+    """Process-wide store at ``RUN_STORE_PATH``; unset or empty (the default) disables it."""
+    global _STORE
+    if _STORE is None:
+        path = os.environ.get("RUN_STORE_PATH", "")
+        if not path:
+            return None
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = RunStore(
+                    path,
+                    store_gantt=os.environ.get("RUN_STORE_GANTT", "0") == "1",
+                    max_queue=int(os.environ.get("RUN_STORE_QUEUE", "4096")),
+                )
+    return _STORE
+
+
+def close_run_store() -> None:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is not None:
+            _STORE.close()
+            _STORE = None
@@ -0,0 +1,88 @@
+"""Context-switch cost models.
+
+The engine asks the model for a cost at every dispatch. The model gets:
+
+* ``same``: the process is the one that last held the CPU;
+* ``back_to_back``: the CPU comes straight from running a process (no idle or CS in between);
+* ``since``: ticks since this process last ran, or None if it never has.
+
+Without a model the engine charges the flat ``context_switch_time`` between
+two different processes that run back to back; ``FlatSwitchCost`` is the same
+rule as a model.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional
+
+
+class SwitchCostModel:
+    def cost(self, same: bool, back_to_back: bool, since: Optional[int]) -> int:  # pragma: no cover
+        raise NotImplementedError
+
+
+class FlatSwitchCost(SwitchCostModel):
+    def __init__(self, switch: int):
+        self.switch = int(switch)
+
+    def cost(self, same: bool, back_to_back: bool, since: Optional[int]) -> int:
+        return self.switch if back_to_back and not same else 0
+
+
+class CacheAwareSwitchCost(SwitchCostModel):
+    """Switch/resume costs plus a cache refill that grows with time away from the CPU.
+
+    ``switch`` is paid when a different process takes the CPU, whether from a
+    running process or from idle. ``resume`` is paid when the previous owner
+    gets the CPU back after an idle gap. On top of either, the process refills
+    ``cache_refill * (1 - exp(-since / cache_decay))`` ticks of cache, or the
+    full refill on its first dispatch.
+    """
+
+    def __init__(self, switch: int, resume: int = 0, cache_refill: int = 0, cache_decay: float = 1.0):
+        if min(int(switch), int(resume), int(cache_refill)) < 0:
+            raise ValueError("context switch costs must be >= 0")
+        if float(cache_decay) <= 0:
+            raise ValueError("cache_decay must be > 0")
+        self.switch = int(switch)
+        self.resume = int(resume)
+        self.cache_refill = int(cache_refill)
+        self.cache_decay = float(cache_decay)
+
+    def _refill(self, since: Optional[int]) -> int:
+        if not self.cache_refill:
+            return 0
+        if since is None:
+            return self.cache_refill
+        return int(round(self.cache_refill * (1.0 - math.exp(-since / self.cache_decay))))
+
+    def cost(self, same: bool, back_to_back: bool, since: Optional[int]) -> int:
+        if same:
+            return 0 if back_to_back else self.resume + self._refill(since)
+        return self.switch + self._refill(since)
+
+
+def build_switch_model(
+    context_switch_time: int, config: Dict[str, Any], warnings: List[str]
+) -> Optional[SwitchCostModel]:
+    """``config.context_switch`` selects a model; None keeps the engine's built-in flat rule."""
+    spec = (config or {}).get("context_switch")
+    if spec is None:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("config.context_switch must be an object")
+    kind = str(spec.get("model", "cache")).strip().lower()
+    switch = int(spec.get("switch", context_switch_time))
+    if kind == "flat":
+        return FlatSwitchCost(switch)
+    if kind != "cache":
+        raise ValueError(f"Unsupported context switch model: {kind}")
+    if "migration" in spec:
+        warnings.append("context_switch.migration ignored: the engine simulates a single CPU")
+    return CacheAwareSwitchCost(
+        switch=switch,
+        resume=int(spec.get("resume", 0)),
+        cache_refill=int(spec.get("cache_refill", 0)),
+        cache_decay=float(spec.get("cache_decay", 1.0)),
+    )
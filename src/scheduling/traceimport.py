@@ -0,0 +1,373 @@
+"""Import Linux scheduler traces as engine workloads.
+
+Reads the text output of ``perf sched script`` (both the ``prev_comm=...``
+and the compact ``comm:pid [prio] S ==> ...`` layouts) and of ftrace's
+``trace`` file with the ``sched_switch`` and ``sched_wakeup`` events
+enabled. Any other line is skipped after a substring check.
+
+A job is one wakeup-to-sleep episode of a task. It arrives at the wakeup,
+or at its first switch-in when the wakeup precedes the trace. It collects
+CPU time over every slice until the task is switched out in a sleeping
+state (anything but ``R``/``R+``). Preempted tasks stay runnable. Only the
+episodes currently open are kept, so memory depends on the number of live
+tasks, not on the trace length. Episodes still open at the end of the trace
+are dropped and counted in the metadata.
+
+Jobs go to a columnar file written in row groups of ``ROW_GROUP`` jobs. Each
+group is a ``<I`` row count, then one little-endian int64 column each for
+arrival, CPU time, first run and end (microseconds from the first event),
+tid and kernel priority, then the comms as a ``<I``-length-prefixed blob of
+newline-separated names. A zero row count starts the JSON metadata
+trailer.
+
+The engine is a uniprocessor. For a like-for-like comparison with a
+multi-CPU host, import one CPU with ``--cpu``. ``compare`` refuses a file
+that sums several CPUs unless ``--all-cpus`` is given. Kernel priorities are
+banded onto the engine's 1..4: real-time, negative nice, nice 0, positive
+nice.
+
+    python -m scheduling.traceimport import trace.txt --out trace.wl
+    python -m scheduling.traceimport compare trace.wl --tick-us 100 --time-slice 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from scheduling.schemas import SchedulingRequest
+from scheduling.service import SUPPORTED_ALGOS, execute_schedule
+from scheduling.workload import PreparedWorkload
+
+MAGIC = b"SCHEDCW1"
+ROW_GROUP = 1 << 16
+COLUMNS = ("arrival", "cpu", "first_run", "end", "tid", "prio")
+_COUNT = struct.Struct("<I")
+
+# "[003]" CPU, optional ftrace flags ("d..2"), "1234.567890:" timestamp, event name.
+_HEAD = re.compile(rb"\[(\d+)\]\s+(?:[\w.]{4,5}\s+)?(\d+)\.(\d+):\s+(?:sched:)?(sched_\w+):\s+")
+_SWITCH_KV = re.compile(
+    rb"prev_comm=(.*?) prev_pid=(\d+) prev_prio=(\d+) prev_state=(\S+) ==> next_comm=(.*?) next_pid=(\d+) next_prio=(\d+)"
+)
+_SWITCH_COMPACT = re.compile(rb"(.*):(\d+) \[(\d+)\] (\S+) ==> (.*):(\d+) \[(\d+)\]")
+_WAKEUP_KV = re.compile(rb"comm=(.*?) pid=(\d+) prio=(\d+)")
+_WAKEUP_COMPACT = re.compile(rb"(.*):(\d+) \[(\d+)\]")
+_WAKEUPS = {b"sched_wakeup", b"sched_wakeup_new", b"sched_waking"}
+
+Job = Tuple[int, int, int, int, int, int, str]  # arrival, cpu, first_run, end, tid, prio, comm
+
+
+def priority_band(prio: int) -> int:
+    if prio < 100:
+        return 1
+    if prio < 120:
+        return 2
+    if prio == 120:
+        return 3
+    return 4
+
+
+def _micros(sec: bytes, frac: bytes) -> int:
+    return int(sec) * 1_000_000 + int((frac + b"000000")[:6])
+
+
+class _Episode:
+    __slots__ = ("arrival", "first_run", "cpu", "on_since", "prio", "comm")
+
+    def __init__(self, arrival: int, prio: int, comm: bytes):
+        self.arrival = arrival
+        self.first_run = -1
+        self.cpu = 0
+        self.on_since = -1
+        self.prio = prio
+        self.comm = comm
+
+
+class TraceReader:
+    """One pass over a trace; ``jobs()`` yields each episode as soon as it ends."""
+
+    def __init__(self, cpu: Optional[int] = None):
+        self.cpu = cpu
+        self.origin: Optional[int] = None
+        self.last = 0
+        self.lines = 0
+        self.events = 0
+        self.unparsed = 0
+        self.cpus: set = set()
+        self.open: Dict[int, _Episode] = {}
+
+    def _wake(self, ts: int, tid: int, prio: int, comm: bytes) -> None:
+        if tid and tid not in self.open:
+            self.open[tid] = _Episode(ts, prio, comm)
+
+    def _switch(self, ts: int, cpu: int, m: Sequence[bytes]) -> Optional[Job]:
+        prev_comm, prev_pid, _prev_prio, prev_state, next_comm, next_pid, next_prio = m
+        # Other CPUs still tell when a task sleeps; only CPU time on the kept CPU counts.
+        mine = self.cpu is None or cpu == self.cpu
+        done: Optional[Job] = None
+        tid = int(prev_pid)
+        ep = self.open.get(tid) if tid else None
+        if ep is not None:
+            if ep.on_since >= 0:
+                ep.cpu += ts - ep.on_since
+                ep.on_since = -1
+            if not prev_state.startswith(b"R"):
+                del self.open[tid]
+                if ep.cpu > 0:
+                    done = (ep.arrival, ep.cpu, ep.first_run, ts, tid, ep.prio, ep.comm.decode("utf-8", "replace"))
+        tid = int(next_pid)
+        if tid:
+            ep = self.open.get(tid)
+            if ep is None:
+                # Woken before the trace started.
+                ep = self.open[tid] = _Episode(ts, int(next_prio), next_comm)
+            if mine:
+                if ep.first_run < 0:
+                    ep.first_run = ts
+                ep.on_since = ts
+        return done
+
+    def jobs(self, lines: Iterable[bytes]) -> Iterator[Job]:
+        switch_kv, switch_compact = _SWITCH_KV.search, _SWITCH_COMPACT.search
+        wake_kv, wake_compact = _WAKEUP_KV.search, _WAKEUP_COMPACT.search
+        head = _HEAD.search
+        for line in lines:
+            self.lines += 1
+            if b"sched_" not in line:
+                continue
+            h = head(line)
+            if h is None:
+                continue
+            cpu_b, sec, frac, event = h.groups()
+            ts = _micros(sec, frac)
+            if self.origin is None:
+                self.origin = ts
+            ts -= self.origin
+            self.last = ts
+            body = line[h.end():]
+            if event == b"sched_switch":
+                m = switch_kv(body) or switch_compact(body)
+                if m is None:
+                    self.unparsed += 1
+                    continue
+                self.events += 1
+                cpu = int(cpu_b)
+                self.cpus.add(cpu)
+                job = self._switch(ts, cpu, m.groups())
+                if job is not None:
+                    yield job
+            elif event in _WAKEUPS:
+                m = wake_kv(body) or wake_compact(body)
+                if m is None:
+                    self.unparsed += 1
+                    continue
+                self.events += 1
+                comm, pid, prio = m.groups()
+                self._wake(ts, int(pid), int(prio), comm)
+
+    def metadata(self, jobs: int) -> Dict[str, Any]:
+        return {
+            "jobs": jobs,
+            "lines": self.lines,
+            "events": self.events,
+            "unparsed": self.unparsed,
+            "truncated": len(self.open),
+            "duration_us": self.last,
+            "cpus": sorted(self.cpus),
+            "cpu_filter": self.cpu,
+        }
+
+
+def _write_group(out: BinaryIO, cols: List[array], comms: List[str]) -> None:
+    out.write(_COUNT.pack(len(comms)))
+    for col in cols:
+        if sys.byteorder != "little":
+            col = array("q", col)
+            col.byteswap()
+        out.write(col.tobytes())
+    blob = "\n".join(comms).encode("utf-8")
+    out.write(_COUNT.pack(len(blob)))
+    out.write(blob)
+
+
+def import_trace(lines: Iterable[bytes], out: BinaryIO, cpu: Optional[int] = None) -> Dict[str, Any]:
+    """Stream ``lines`` into a columnar workload file; returns the metadata written as its trailer."""
+    reader = TraceReader(cpu)
+    out.write(MAGIC)
+    cols = [array("q") for _ in COLUMNS]
+    comms: List[str] = []
+    total = 0
+    for job in reader.jobs(lines):
+        for col, v in zip(cols, job):
+            col.append(v)
+        comms.append(job[6].replace("\n", " "))
+        if len(comms) >= ROW_GROUP:
+            _write_group(out, cols, comms)
+            total += len(comms)
+            cols = [array("q") for _ in COLUMNS]
+            comms = []
+    if comms:
+        _write_group(out, cols, comms)
+        total += len(comms)
+    meta = reader.metadata(total)
+    blob = json.dumps(meta).encode("utf-8")
+    out.write(_COUNT.pack(0))
+    out.write(_COUNT.pack(len(blob)))
+    out.write(blob)
+    return meta
+
+
+def _read_exact(fh: BinaryIO, n: int) -> bytes:
+    data = fh.read(n)
+    if len(data) != n:
+        raise ValueError("Truncated workload file")
+    return data
+
+
+def read_columns(fh: BinaryIO) -> Tuple[Dict[str, array], List[str], Dict[str, Any]]:
+    if fh.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a columnar workload file")
+    cols = {name: array("q") for name in COLUMNS}
+    comms: List[str] = []
+    while True:
+        (n,) = _COUNT.unpack(_read_exact(fh, 4))
+        if n == 0:
+            (size,) = _COUNT.unpack(_read_exact(fh, 4))
+            return cols, comms, json.loads(_read_exact(fh, size))
+        for name in COLUMNS:
+            col = array("q")
+            col.frombytes(_read_exact(fh, 8 * n))
+            if sys.byteorder != "little":
+                col.byteswap()
+            cols[name].extend(col)
+        (size,) = _COUNT.unpack(_read_exact(fh, 4))
+        comms.extend(_read_exact(fh, size).decode("utf-8").split("\n"))
+
+
+def to_workload(cols: Dict[str, array], comms: Sequence[str], tick_us: int = 1) -> PreparedWorkload:
+    """Engine workload in ticks of ``tick_us``; every job gets at least one tick of CPU."""
+    n = len(comms)
+    wl = PreparedWorkload.__new__(PreparedWorkload)
+    wl.pids = [f"{comm}-{tid}#{i}" for i, (comm, tid) in enumerate(zip(comms, cols["tid"]))]
+    wl.arrivals = [a // tick_us for a in cols["arrival"]]
+    wl.bursts = [max(1, (c + tick_us // 2) // tick_us) for c in cols["cpu"]]
+    wl.priorities = [priority_band(p) for p in cols["prio"]]
+    wl.io_bursts = [None] * n
+    wl.io_devices = [None] * n
+    wl.deadlines = [None] * n
+    wl.periods = [None] * n
+    wl.index = {pid: i for i, pid in enumerate(wl.pids)}
+    wl.arrival_order = sorted(range(n), key=lambda i: (wl.arrivals[i], wl.pids[i]))
+    return wl
+
+
+def observed_metrics(cols: Dict[str, array], tick_us: int = 1) -> Dict[str, float]:
+    n = len(cols["arrival"]) or 1
+    wait = tat = resp = 0
+    for a, c, f, e in zip(cols["arrival"], cols["cpu"], cols["first_run"], cols["end"]):
+        tat += e - a
+        wait += e - a - c
+        resp += f - a
+    return {
+        "avg_waiting_time": wait / n / tick_us,
+        "avg_turnaround_time": tat / n / tick_us,
+        "avg_response_time": resp / n / tick_us,
+    }
+
+
+def compare_trace(
+    path: str,
+    algorithms: Optional[Sequence[str]] = None,
+    tick_us: int = 1,
+    time_slice: Optional[int] = None,
+    context_switch_time: int = 0,
+    all_cpus: bool = False,
+) -> Dict[str, Any]:
+    """Observed averages next to each policy's on the same jobs, all in ticks.
+
+    A file that sums the CPU time of several CPUs is rejected unless ``all_cpus``:
+    replaying it on one CPU gives waits that have nothing to do with the observed ones.
+    """
+    with open(path, "rb") as fh:
+        cols, comms, meta = read_columns(fh)
+    if not comms:
+        raise ValueError("The workload file has no jobs")
+    warnings: List[str] = []
+    if len(meta.get("cpus") or ()) > 1 and meta.get("cpu_filter") is None:
+        detail = (
+            f"the trace covers CPUs {meta['cpus']} and was imported without --cpu, so their CPU time "
+            "is replayed on a single CPU"
+        )
+        if not all_cpus:
+            raise ValueError(f"Refusing to compare: {detail}; re-import with --cpu N, or pass --all-cpus")
+        warnings.append(f"Not comparable with the observed schedule: {detail}")
+    workload = to_workload(cols, comms, tick_us)
+    rows: List[Dict[str, Any]] = [{"algorithm": "OBSERVED", **observed_metrics(cols, tick_us)}]
+    for algo in algorithms or sorted(SUPPORTED_ALGOS - {"EDF", "RM"}):
+        req = SchedulingRequest.construct(
+            algorithm=algo.upper(),
+            processes=[],
+            context_switch_time=context_switch_time,
+            time_slice=time_slice,
+            config={},
+        )
+        res = execute_schedule(req, workload, metrics_only=True)
+        rows.append(
+            {
+                "algorithm": res.algorithm,
+                "avg_waiting_time": res.avg_waiting_time,
+                "avg_turnaround_time": res.avg_turnaround_time,
+                "avg_response_time": res.avg_response_time,
+            }
+        )
+    return {"metadata": meta, "tick_us": tick_us, "warnings": warnings, "results": rows}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import perf sched / ftrace text traces as workloads.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="trace text -> columnar workload file")
+    imp.add_argument("trace", help="trace text file, or - for stdin")
+    imp.add_argument("--out", required=True)
+    imp.add_argument("--cpu", type=int, help="only keep this CPU's slices")
+    cmp_ = sub.add_parser("compare", help="observed schedule vs. each policy")
+    cmp_.add_argument("workload")
+    cmp_.add_argument("--algorithms", nargs="*")
+    cmp_.add_argument("--tick-us", type=int, default=1)
+    cmp_.add_argument("--time-slice", type=int)
+    cmp_.add_argument("--context-switch", type=int, default=0)
+    cmp_.add_argument("--all-cpus", action="store_true", help="compare a multi-CPU import anyway")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        src = sys.stdin.buffer if args.trace == "-" else open(args.trace, "rb", buffering=1 << 20)
+        try:
+            with open(args.out, "wb", buffering=1 << 20) as out:
+                meta = import_trace(src, out, cpu=args.cpu)
+        finally:
+            if src is not sys.stdin.buffer:
+                src.close()
+        print(json.dumps(meta, indent=2))
+        return 0
+
+    if args.tick_us < 1:
+        parser.error("--tick-us must be >= 1")
+    try:
+        report = compare_trace(
+            args.workload, args.algorithms, args.tick_us, args.time_slice, args.context_switch, args.all_cpus
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    for warning in report["warnings"]:
+        print(f"WARNING: {warning}", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
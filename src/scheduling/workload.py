@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+from scheduling.engine import ProcState
+from scheduling.schemas import ProcessIn
+
+
+class PreparedWorkload:
+    """Column view of a request's processes, built once and shared by every run on it."""
+
+    __slots__ = (
+        "pids",
+        "arrivals",
+        "bursts",
+        "priorities",
+        "io_bursts",
+        "io_devices",
+        "deadlines",
+        "periods",
+        "index",
+        "arrival_order",
+    )
+
+    def __init__(self, processes: Sequence[ProcessIn]):
+        self.pids: List[str] = []
+        self.arrivals: List[int] = []
+        self.bursts: List[int] = []
+        self.priorities: List[Optional[int]] = []
+        self.io_bursts: List[Optional[List[int]]] = []
+        self.io_devices: List[Optional[str]] = []
+        self.deadlines: List[Optional[int]] = []
+        self.periods: List[Optional[int]] = []
+        self.index: Dict[str, int] = {}
+
+        for i, p in enumerate(processes):
+            pid = str(p.pid)
+            if pid in self.index:
+                raise ValueError(f"Duplicate pid: {pid}")
+            self.index[pid] = i
+            self.pids.append(pid)
+            self.arrivals.append(int(p.arrival_time))
+            self.bursts.append(int(p.burst_time))
+            self.priorities.append(p.priority)
+            self.io_bursts.append(list(p.bursts) if p.bursts else None)
+            self.io_devices.append(p.io_device)
+            self.deadlines.append(p.deadline)
+            self.periods.append(p.period)
+
+        self.arrival_order: List[int] = sorted(
+            range(len(self.pids)), key=lambda i: (self.arrivals[i], self.pids[i])
+        )
+
+    def __len__(self) -> int:
+        return len(self.pids)
+
+    @property
+    def periodic(self) -> List[int]:
+        return [i for i, t in enumerate(self.periods) if t is not None]
+
+    def states(self, horizon: Optional[int] = None) -> List[ProcState]:
+        """Fresh engine states; periodic tasks contribute their first job and release the rest lazily."""
+        if horizon is None and any(t is not None for t in self.periods):
+            raise ValueError("periodic processes need a release horizon")
+        return [
+            _state(pid, at, bt, pr, bs, dev, dl, per, horizon)
+            for pid, at, bt, pr, bs, dev, dl, per in zip(
+                self.pids,
+                self.arrivals,
+                self.bursts,
+                self.priorities,
+                self.io_bursts,
+                self.io_devices,
+                self.deadlines,
+                self.periods,
+            )
+        ]
+
+    def first_arrival(self) -> Optional[int]:
+        return self.arrivals[self.arrival_order[0]] if self.pids else None
+
+
+def _state(
+    pid: str,
+    arrival: int,
+    burst: int,
+    priority: Optional[int],
+    bursts: Optional[List[int]],
+    device: Optional[str],
+    deadline: Optional[int],
+    period: Optional[int],
+    horizon: Optional[int],
+) -> ProcState:
+    if period is None:
+        return ProcState(
+            pid=pid,
+            arrival_time=arrival,
+            burst_time=burst,
+            priority=priority,
+            bursts=bursts,
+            io_device=device,
+            relative_deadline=deadline,
+        )
+    return ProcState(
+        pid=f"{pid}#0",
+        arrival_time=arrival,
+        burst_time=burst,
+        priority=priority,
+        bursts=list(bursts) if bursts else None,
+        io_device=device,
+        relative_deadline=deadline,
+        period=period,
+        release_until=horizon,
+        task=pid,
+    )
+
+
+def state_from_input(p: ProcessIn, horizon: Optional[int] = None) -> ProcState:
+    if p.period is not None and horizon is None:
+        raise ValueError(f"Periodic process {p.pid} needs config.horizon")
+    return _state(
+        str(p.pid),
+        int(p.arrival_time),
+        int(p.burst_time),
+        p.priority,
+        list(p.bursts) if p.bursts else None,
+        p.io_device,
+        p.deadline,
+        p.period,
+        horizon,
+    )
@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from scheduling import admission
+from scheduling.admission import AdmissionRejected, CostEstimate, admit
+
+client = TestClient(app)
+
+REQUEST = {
+    "algorithm": "RR",
+    "time_slice": 3,
+    "processes": [
+        {"pid": "A", "arrival_time": 0, "burst_time": 7},
+        {"pid": "B", "arrival_time": 1, "burst_time": 3},
+    ],
+}
+COMPARE = {"processes": REQUEST["processes"], "algorithms": ["RR", "FCFS"], "time_slice": 3}
+BATCH = {"processes": REQUEST["processes"], "runs": [{"algorithm": "RR", "time_slice": 3}, {"algorithm": "FCFS"}]}
+
+
+def _estimate(seconds, memory_bytes=1):
+    return CostEstimate(jobs=1, dispatches=1, iterations=1, segments=1, seconds=seconds, memory_bytes=memory_bytes)
+
+
+def test_tiers_follow_the_thresholds(monkeypatch):
+    monkeypatch.setattr(admission, "INLINE_SECONDS", 1.0)
+    monkeypatch.setattr(admission, "MAX_SECONDS", 10.0)
+    monkeypatch.setattr(admission, "MAX_MEMORY_BYTES", 100)
+    assert admit(_estimate(0.5)).tier == "inline"
+    assert admit(_estimate(5.0)).tier == "pool"
+    # Callers that always run in-process get inline for anything admitted.
+    assert admit(_estimate(5.0), pool=False).tier == "inline"
+    for est in (_estimate(11.0), _estimate(0.5, memory_bytes=101)):
+        with pytest.raises(AdmissionRejected) as info:
+            admit(est, pool=False)
+        assert info.value.estimate.tier == "reject"
+        assert isinstance(info.value, ValueError)
+
+
+def test_estimate_counts_quantum_splits():
+    # RR with quantum 3: A's burst of 7 takes 3 runs and B's burst of 3 takes 1.
+    r = client.post("/estimate", json=REQUEST)
+    assert r.status_code == 200, r.text
+    est = r.json()
+    assert (est["jobs"], est["dispatches"], est["tier"]) == (2, 4, "inline")
+
+
+def test_execute_reports_its_tier():
+    r = client.post("/execute", json=REQUEST)
+    assert r.status_code == 200, r.text
+    assert r.headers["X-Admission-Tier"] == "inline"
+    assert r.headers["X-Cost-Iterations"] == str(client.post("/estimate", json=REQUEST).json()["iterations"])
+
+
+def test_pool_tier_gives_the_inline_response(monkeypatch):
+    inline = client.post("/execute", json=REQUEST)
+    monkeypatch.setattr(admission, "INLINE_SECONDS", 0.0)
+    pooled = client.post("/execute", json=REQUEST)
+    assert pooled.status_code == 200, pooled.text
+    assert pooled.headers["X-Admission-Tier"] == "pool"
+    assert pooled.json() == inline.json()
+    # Streams always run in-process.
+    assert client.post("/execute/stream", json=REQUEST).headers["X-Admission-Tier"] == "inline"
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/execute", REQUEST),
+        ("/execute/stream", REQUEST),
+        ("/compare", COMPARE),
+        ("/batch", BATCH),
+    ],
+)
+def test_over_the_limit_is_413_with_the_estimate(monkeypatch, path, body):
+    monkeypatch.setattr(admission, "MAX_SECONDS", 0.0)
+    r = client.post(path, json=body)
+    assert r.status_code == 413, r.text
+    assert r.headers["X-Admission-Tier"] == "reject"
+    assert int(r.headers["X-Cost-Iterations"]) > 0
+    # /estimate still answers, with the verdict.
+    assert client.post("/estimate", json=REQUEST).json()["tier"] == "reject"
+
+
+def test_memory_limit_rejects_too(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_MEMORY_BYTES", 1)
+    assert client.post("/execute", json=REQUEST).status_code == 413
@@ -0,0 +1,11 @@
+import pytest
+
+from scheduling.difftest import ENGINES, run
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_engines_match_reference(seed):
+    reports = run(cases=150, seed=seed)
+    assert [r.name for r in reports] == sorted(ENGINES)
+    for r in reports:
+        assert r.mismatches == 0, f"{r.name}: {r.detail}\n{r.counterexample}"
@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from scheduling.distributed import TOKEN_HEADER, coordinator
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+TOKEN = "test-token"
+
+client = TestClient(app)
+
+
+def _workload(n):
+    return [
+        {"pid": f"P{i}", "arrival_time": i // 4, "burst_time": 5 + (i * 7) % 23, "priority": i % 5}
+        for i in range(n)
+    ]
+
+
+def _start_worker():
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "scheduling.distributed", "worker", "--port", "0"],
+        cwd=SRC,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    assert line.startswith("worker listening on "), line
+    return proc, line.rsplit(" ", 1)[-1].strip()
+
+
+def _workloads_held(url):
+    try:
+        with urllib.request.urlopen(url + "/health", timeout=1) as resp:
+            return json.loads(resp.read())["workloads"]
+    except OSError:
+        return 0
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setenv("WORKER_REGISTRATION_TOKEN", TOKEN)
+    started = [_start_worker() for _ in range(2)]
+    yield started
+    for proc, url in started:
+        proc.kill()
+        proc.wait()
+        coordinator.unregister(url)
+
+
+def test_registration_is_validated_and_gated(monkeypatch):
+    monkeypatch.delenv("WORKER_REGISTRATION_TOKEN", raising=False)
+    monkeypatch.delenv("WORKER_ALLOWLIST", raising=False)
+    assert client.post("/workers/register", json={"url": "http://127.0.0.1:9"}).status_code == 403
+
+    monkeypatch.setenv("WORKER_REGISTRATION_TOKEN", TOKEN)
+    for url in ["garbage", "https://127.0.0.1:9", "http://127.0.0.1:9/prefix", "http://[::1"]:
+        r = client.post("/workers/register", json={"url": url}, headers={TOKEN_HEADER: TOKEN})
+        assert r.status_code == 422, (url, r.text)
+    r = client.post("/workers/register", json={"url": "http://127.0.0.1:9"}, headers={TOKEN_HEADER: "wrong"})
+    assert r.status_code == 403
+
+    monkeypatch.delenv("WORKER_REGISTRATION_TOKEN")
+    monkeypatch.setenv("WORKER_ALLOWLIST", "10.0.0.5:9101")
+    assert client.post("/workers/register", json={"url": "http://127.0.0.1:9"}).status_code == 403
+    assert [w["url"] for w in client.get("/workers").json()["workers"]] == []
+
+
+def test_distributed_batch_survives_a_worker_dying(workers):
+    for _, url in workers:
+        r = client.post("/workers/register", json={"url": url}, headers={TOKEN_HEADER: TOKEN})
+        assert r.status_code == 200, r.text
+    assert sorted(w["url"] for w in client.get("/workers").json()["workers"] if w["alive"]) == sorted(
+        url for _, url in workers
+    )
+
+    runs = [{"algorithm": a, "time_slice": q} for a in ("RR", "MLFQ", "SRTF", "FCFS") for q in (1, 2, 3, 4, 5, 6)]
+    request = {"processes": _workload(4000), "runs": runs}
+    local = client.post("/batch", json=request)
+    assert local.status_code == 200, local.text
+
+    victim, victim_url = workers[0]
+
+    def kill_once_busy():
+        deadline = time.time() + 30
+        while time.time() < deadline and not _workloads_held(victim_url):
+            time.sleep(0.01)
+        time.sleep(0.1)
+        victim.kill()
+
+    killer = threading.Thread(target=kill_once_busy)
+    killer.start()
+    remote = client.post("/batch", json=dict(request, distributed=True))
+    killer.join()
+
+    assert remote.status_code == 200, remote.text
+    assert remote.json() == local.json()
+    status = {w["url"]: w["alive"] for w in client.get("/workers").json()["workers"]}
+    assert status[victim_url] is False
+    assert status[workers[1][1]] is True
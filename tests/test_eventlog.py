@@ -0,0 +1,179 @@
+import os
+import random
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from scheduling import eventlog as ev
+from scheduling.eventlog import BLOCK_RECORDS, Event, EventLog, EventLogReader
+from scheduling.service import prune_event_logs
+
+client = TestClient(app)
+
+PIDS = [f"P{i}" for i in range(40)]
+
+
+@pytest.fixture(scope="module")
+def log(tmp_path_factory):
+    """Several blocks of records with repeated times at block edges; returns the path and every event."""
+    path = str(tmp_path_factory.mktemp("evl") / "run.evl")
+    rng = random.Random(5)
+    events = []
+    t = 0
+    with EventLog(path, buffer_records=100) as w:
+        for n in range(5 * BLOCK_RECORDS + 17):
+            t += rng.choice((0, 0, 1, 3))
+            kind = rng.choice(list(ev.KIND_NAMES))
+            # P39 only shows up late, so its posting list skips the first blocks.
+            pid = None if kind == ev.BOOST else PIDS[rng.randrange(39 if n < 3 * BLOCK_RECORDS else 40)]
+            level, arg = rng.randrange(4), rng.randrange(100)
+            w.record(t, kind, pid, level, arg)
+            events.append(Event(t, ev.KIND_NAMES[kind], pid, level, arg))
+    return path, events
+
+
+def _scan(events, pid=None, start=None, end=None, kinds=None):
+    return [
+        e
+        for e in events
+        if (pid is None or e.pid == pid)
+        and (start is None or e.time >= start)
+        and (end is None or e.time <= end)
+        and (kinds is None or e.kind in kinds)
+    ]
+
+
+def test_reader_sees_every_record(log):
+    path, events = log
+    with EventLogReader(path) as r:
+        assert r.count == len(events)
+        assert len(r.block_times) == 6
+        assert list(r.query()) == events
+
+
+@pytest.mark.parametrize(
+    "pid, window, kinds",
+    [
+        ("P3", (None, None), None),
+        ("P39", (None, None), None),
+        (None, (1000, 2000), None),
+        ("P7", (1500, 6000), ["select", "demote"]),
+        (None, (None, 900), ["boost"]),
+        (None, (6000, None), None),
+    ],
+)
+def test_indexed_queries_match_a_full_scan(log, pid, window, kinds):
+    path, events = log
+    start, end = window
+    with EventLogReader(path) as r:
+        assert list(r.query(pid, start, end, kinds)) == _scan(events, pid, start, end, kinds)
+
+
+def test_window_starting_inside_a_run_of_equal_times(log):
+    # The first record of a block may share its time with the end of the previous block.
+    path, events = log
+    with EventLogReader(path) as r:
+        for t in r.block_times[1:]:
+            assert list(r.query(None, t, t)) == _scan(events, None, t, t)
+
+
+def test_unknown_pid_matches_nothing(log):
+    with EventLogReader(log[0]) as r:
+        assert list(r.query("nobody")) == []
+
+
+def test_unclosed_log_is_refused(tmp_path):
+    path = str(tmp_path / "open.evl")
+    w = EventLog(path)
+    w.record(0, ev.ARRIVAL, "A")
+    w._fh.flush()
+    with pytest.raises(ValueError):
+        EventLogReader(path)
+    w.close()
+
+
+def test_events_route_filters_and_pages(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVENT_LOG_DIR", str(tmp_path))
+    body = {
+        "algorithm": "RR",
+        "time_slice": 2,
+        "processes": [{"pid": f"P{i}", "arrival_time": i, "burst_time": 7} for i in range(10)],
+        "config": {"event_log": True},
+    }
+    log_id = client.post("/execute", json=body).json()["event_log"]
+    with EventLogReader(str(tmp_path / f"{log_id}.evl")) as r:
+        everything = [e._asdict() for e in r.query()]
+
+    full = client.get(f"/events/{log_id}").json()
+    assert (full["events"], full["truncated"]) == (everything, False)
+
+    selects = [e for e in everything if e["kind"] == "select" and e["pid"] == "P4"]
+    r = client.get(f"/events/{log_id}", params={"pid": "P4", "kind": "select"}).json()
+    assert r["events"] == selects
+
+    window = [e for e in everything if 5 <= e["time"] <= 12]
+    assert client.get(f"/events/{log_id}", params={"start": 5, "end": 12}).json()["events"] == window
+
+    # truncated is set only when more events matched than the limit.
+    n = len(everything)
+    assert client.get(f"/events/{log_id}", params={"limit": n}).json()["truncated"] is False
+    cut = client.get(f"/events/{log_id}", params={"limit": n - 1}).json()
+    assert (cut["events"], cut["truncated"]) == (everything[: n - 1], True)
+    assert client.get(f"/events/{log_id}", params={"limit": 0}).status_code == 422
+    assert client.get(f"/events/{log_id}", params={"limit": 100_001}).status_code == 422
+
+
+def test_events_route_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVENT_LOG_DIR", str(tmp_path))
+    assert client.get("/events/" + "0" * 32).status_code == 404
+    assert client.get("/events/not-an-id").status_code == 422
+    assert client.get("/events/" + "0" * 32, params={"kind": "nap"}).status_code == 422
+    monkeypatch.delenv("EVENT_LOG_DIR")
+    assert client.get("/events/" + "0" * 32).status_code == 422
+
+
+def _fake_logs(root, sizes, age_step=10):
+    """Log-named files, oldest first, ``age_step`` seconds apart; returns their paths."""
+    now = time.time()
+    paths = []
+    for i, size in enumerate(sizes):
+        path = root / f"{i:032x}.evl"
+        path.write_bytes(b"x" * size)
+        mtime = now - (len(sizes) - i) * age_step
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize(
+    "env, sizes, kept",
+    [
+        ({"EVENT_LOG_MAX_FILES": "3"}, [10] * 5, [2, 3, 4]),
+        # 2.5 KiB: the two newest fill it; the 100-byte log would still fit, but older logs go first.
+        ({"EVENT_LOG_MAX_FILES": "0", "EVENT_LOG_MAX_MB": str(2.5 / 1024)}, [100, 1024, 2048, 512], [2, 3]),
+        ({"EVENT_LOG_MAX_FILES": "0", "EVENT_LOG_MAX_MB": str(2 / 1024)}, [100, 1024, 512, 512], [1, 2, 3]),
+        ({"EVENT_LOG_MAX_AGE": "25"}, [10] * 5, [3, 4]),
+        ({"EVENT_LOG_MAX_FILES": "0", "EVENT_LOG_MAX_MB": "0"}, [10] * 5, [0, 1, 2, 3, 4]),
+    ],
+)
+def test_prune_keeps_the_newest_logs_within_limits(tmp_path, monkeypatch, env, sizes, kept):
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    paths = _fake_logs(tmp_path, sizes)
+    other = tmp_path / "notes.txt"
+    other.write_text("not a log")
+    assert prune_event_logs(str(tmp_path)) == len(sizes) - len(kept)
+    assert [i for i, p in enumerate(paths) if p.exists()] == kept
+    assert other.exists()
+
+
+def test_new_logs_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVENT_LOG_DIR", str(tmp_path))
+    monkeypatch.setenv("EVENT_LOG_MAX_FILES", "2")
+    old = _fake_logs(tmp_path, [10, 10, 10])
+    body = {"algorithm": "FCFS", "processes": [{"pid": "A", "arrival_time": 0, "burst_time": 3}], "config": {"event_log": True}}
+    log_id = client.post("/execute", json=body).json()["event_log"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([old[-1].name, f"{log_id}.evl"])
+    assert client.get(f"/events/{log_id}").status_code == 200
@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from scheduling.experiment import Experiment, run_experiment_stream
+from scheduling.schemas import ExperimentRequest
+
+client = TestClient(app)
+
+
+def _experiment(**overrides):
+    req = {"algorithms": ["FCFS", "SJF"], "metrics": ["avg_waiting_time"], "parallel": False}
+    req.update(overrides)
+    return Experiment(ExperimentRequest(**req))
+
+
+def _feed(exp, first, second):
+    for a, b in zip(first, second):
+        exp.add([[a], [b]])
+    return exp.report()
+
+
+def test_clear_difference_settles_at_min_replicates():
+    # Paired differences 3, 2, 3, 4, 3: mean 3, sd sqrt(0.5), t(0.975, 4) = 2.776,
+    # so the half-width is 2.776 * 0.7071 / sqrt(5) = 0.878 and the interval excludes 0.
+    fcfs, sjf = [10, 12, 11, 13, 14], [7, 10, 8, 9, 11]
+    early = _feed(_experiment(min_replicates=5), fcfs[:4], sjf[:4])
+    assert early.comparisons[0].verdict is None
+    assert not early.settled
+
+    report = _feed(_experiment(min_replicates=5), fcfs, sjf)
+    assert report.ranking == ["SJF", "FCFS"]
+    (pair,) = report.comparisons
+    assert (pair.better, pair.worse, pair.verdict) == ("SJF", "FCFS", "different")
+    assert pair.mean_difference == pytest.approx(3)
+    assert pair.half_width == pytest.approx(0.878, abs=1e-3)
+    assert report.settled
+    assert report.algorithms[0].metrics["avg_waiting_time"].mean == pytest.approx(9)
+
+
+def test_small_difference_inside_tolerance_is_equivalent():
+    # Differences +-0.1: mean 0, half-width 2.776 * 0.1 / sqrt(5) = 0.124 <= 1.
+    fcfs = [10.0, 10.0, 10.0, 10.0, 10.0]
+    sjf = [10.1, 9.9, 10.1, 9.9, 10.0]
+    report = _feed(_experiment(tolerance=1.0), fcfs, sjf)
+    assert report.comparisons[0].verdict == "equivalent"
+    assert report.settled
+    assert _feed(_experiment(tolerance=0.0), fcfs, sjf).comparisons[0].verdict is None
+
+
+def test_maximized_metrics_rank_high_first():
+    exp = _experiment(metrics=["throughput"], rank_by="throughput")
+    report = _feed(exp, [0.5, 0.6, 0.5, 0.55, 0.5], [0.2, 0.25, 0.2, 0.2, 0.22])
+    assert report.ranking == ["FCFS", "SJF"]
+    assert report.comparisons[0].mean_difference > 0
+    assert report.comparisons[0].verdict == "different"
+
+
+def test_identical_algorithms_stop_after_min_replicates():
+    # SPN is SJF under another name, so every paired difference is 0.
+    req = ExperimentRequest(
+        algorithms=["SJF", "SPN"],
+        workload={"processes": 30},
+        min_replicates=4,
+        max_replicates=50,
+        batch=1,
+        parallel=False,
+    )
+    reports = list(run_experiment_stream(req))
+    assert [r.replicates for r in reports] == [4]
+    assert reports[-1].settled
+    assert reports[-1].comparisons[0].verdict == "equivalent"
+
+
+def test_stream_stops_when_settled_or_at_max_replicates():
+    req = ExperimentRequest(
+        algorithms=["FCFS", "SJF", "RR"],
+        time_slice=2,
+        workload={"processes": 40, "burst": "bimodal", "min_burst": 1, "max_burst": 60},
+        min_replicates=3,
+        max_replicates=12,
+        batch=2,
+        parallel=False,
+    )
+    reports = list(run_experiment_stream(req))
+    counts = [r.replicates for r in reports]
+    # The first round fills min_replicates, later rounds add a batch each, capped at max_replicates.
+    assert counts == list(range(3, counts[-1], 2)) + [counts[-1]]
+    assert not any(r.settled for r in reports[:-1])
+    assert reports[-1].settled or counts[-1] == 12
+
+
+def test_experiment_route_matches_the_library():
+    body = {"algorithms": ["FCFS", "SJF"], "workload": {"processes": 30}, "max_replicates": 8, "batch": 2, "parallel": False}
+    r = client.post("/experiment", json=body)
+    assert r.status_code == 200, r.text
+    assert r.json() == list(run_experiment_stream(ExperimentRequest(**body)))[-1].dict()
@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+# Three RR levels with a 2-tick quantum over an RR level with a 4-tick quantum.
+QUEUES = [{"algorithm": "RR", "time_slice": 2}] * 3 + [{"algorithm": "RR", "time_slice": 4}]
+TWO_CPU_BOUND = [
+    {"pid": "A", "arrival_time": 0, "burst_time": 14},
+    {"pid": "B", "arrival_time": 0, "burst_time": 14},
+]
+
+
+def _gantt(processes, config):
+    r = client.post("/execute", json={"algorithm": "MLFQ", "processes": processes, "config": config})
+    assert r.status_code == 200, r.text
+    return [(g["start"], g["end"], g["pid"]) for g in r.json()["gantt"]], r.json()
+
+
+def test_without_boost_both_sink_to_the_bottom_level():
+    # A and B alternate down levels 0-2 (2 ticks each), then share level 3 in 4-tick slices.
+    gantt, _ = _gantt(TWO_CPU_BOUND, {"queues": QUEUES})
+    assert gantt == [
+        (0, 2, "A"), (2, 4, "B"), (4, 6, "A"), (6, 8, "B"), (8, 10, "A"), (10, 12, "B"),
+        (12, 16, "A"), (16, 20, "B"), (20, 24, "A"), (24, 28, "B"),
+    ]
+
+
+def test_boost_resets_levels_at_the_period():
+    # Boost at 11: A waits in level 3 and moves to level 0; B is mid-quantum at level 2 and
+    # is put back at level 0 when its quantum ends at 12, behind A. Both then restart from
+    # level 0 with 2-tick quanta. The boost at 22 lands as A's level-2 quantum ends: B
+    # (absorbed from level 2) queues ahead of A (put back), so B runs 22-24 and A finishes
+    # 24-26 after 14 ticks.
+    gantt, _ = _gantt(TWO_CPU_BOUND, {"queues": QUEUES, "boost_period": 11})
+    assert gantt == [
+        (0, 2, "A"), (2, 4, "B"), (4, 6, "A"), (6, 8, "B"), (8, 10, "A"), (10, 12, "B"),
+        (12, 14, "A"), (14, 16, "B"), (16, 18, "A"), (18, 20, "B"), (20, 22, "A"),
+        (22, 24, "B"), (24, 26, "A"), (26, 28, "B"),
+    ]
+
+
+def test_boosts_due_within_one_run_fire_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVENT_LOG_DIR", str(tmp_path))
+    # A reaches the FCFS level at 3 and runs to 50 without another scheduling decision, past
+    # the boosts due at 10, 20, ..., 50. They collapse into the first one.
+    config = {"time_slices": [1, 1, 1, None], "boost_period": 10, "event_log": True}
+    gantt, body = _gantt([{"pid": "A", "arrival_time": 0, "burst_time": 50}], config)
+    assert gantt == [(0, 50, "A")]
+    r = client.get(f"/events/{body['event_log']}", params={"kind": "boost"})
+    assert r.status_code == 200, r.text
+    assert [e["time"] for e in r.json()["events"]] == [10]
@@ -0,0 +1,81 @@
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from scheduling.optimizer import _dominates, _scores, pareto_ranks
+
+client = TestClient(app)
+
+PROCESSES = [
+    {"pid": f"P{i}", "arrival_time": i * 2, "burst_time": 1 + (i * 13) % 29, "priority": 1 + i % 4}
+    for i in range(90)
+]
+
+
+def test_pareto_ranks_peel_fronts():
+    scores = [
+        (1.0, 5.0, -0.9),  # front 0
+        (5.0, 1.0, -0.9),  # front 0
+        (2.0, 6.0, -0.9),  # dominated by 0 only
+        (6.0, 6.0, -0.9),  # dominated by 0, 1 and 2
+        (1.0, 5.0, -0.9),  # equal to 0: neither dominates
+        (0.5, 9.0, -0.5),  # front 0: best waiting time
+    ]
+    assert pareto_ranks(scores) == [0, 0, 1, 2, 0, 0]
+    assert pareto_ranks([]) == []
+
+
+def test_scores_minimize_every_objective():
+    # Utilization is maximized, so it is negated; a missing value ranks worst.
+    assert _scores({"avg_waiting_time": 3, "p99_response_time": 7, "cpu_utilization": 0.8}) == (3.0, 7.0, -0.8)
+    missing = _scores({"avg_waiting_time": 3, "p99_response_time": None, "cpu_utilization": None})
+    assert missing == (3.0, math.inf, 0.0)
+    assert _dominates((3.0, 7.0, -0.8), missing)
+
+
+def _optimize(**overrides):
+    body = {"algorithm": "MLFQ", "processes": PROCESSES, "candidates": 12, "eta": 2, "parallel": False}
+    body.update(overrides)
+    r = client.post("/optimize", json=body)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _key(c):
+    return (c["avg_waiting_time"], c["p99_response_time"], -c["cpu_utilization"])
+
+
+@pytest.mark.parametrize("algorithm", ["MLFQ", "MLQ"])
+def test_finalists_are_ranked_by_front_then_waiting_time(algorithm):
+    res = _optimize(algorithm=algorithm)
+    finalists = res["finalists"]
+    keys = [_key(c) for c in finalists]
+    assert pareto_ranks(keys) == [c["rank"] for c in finalists]
+    assert [(c["rank"], k) for c, k in zip(finalists, keys)] == sorted((c["rank"], k) for c, k in zip(finalists, keys))
+    assert res["pareto"] == [c for c in finalists if c["rank"] == 0]
+    for c in finalists:
+        if c["rank"]:
+            assert any(_dominates(_key(p), _key(c)) for p in finalists if p["rank"] == c["rank"] - 1)
+
+
+def test_rungs_halve_candidates_up_to_the_full_workload():
+    res = _optimize()
+    rungs = res["rungs"]
+    assert rungs[0]["evaluated"] == 12
+    assert rungs[-1]["prefix"] == len(PROCESSES)
+    for prev, nxt in zip(rungs, rungs[1:]):
+        assert nxt["evaluated"] == prev["promoted"] == max(2, math.ceil(prev["evaluated"] / 2))
+        assert nxt["prefix"] == min(len(PROCESSES), prev["prefix"] * 2)
+    assert res["simulations"] == sum(r["evaluated"] for r in rungs)
+    assert len(res["finalists"]) == rungs[-1]["evaluated"]
+
+
+def test_pool_and_inline_search_agree():
+    assert _optimize(parallel=True) == _optimize(parallel=False)
+
+
+def test_non_feedback_algorithms_are_rejected():
+    r = client.post("/optimize", json={"algorithm": "RR", "processes": PROCESSES})
+    assert r.status_code == 422
@@ -0,0 +1,60 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+# Both processes stay runnable for the whole window, so the split of CPU time is the policy's.
+WINDOW = 4000
+
+def _processes(priorities=(None, None)):
+    return [
+        {"pid": pid, "arrival_time": 0, "burst_time": WINDOW + 1, "priority": priority}
+        for pid, priority in zip("AB", priorities)
+    ]
+
+
+def _shares(algorithm, config, time_slice=None, processes=None):
+    body = {"algorithm": algorithm, "processes": processes or _processes(), "config": config}
+    if time_slice is not None:
+        body["time_slice"] = time_slice
+    r = client.post("/execute", json=body)
+    assert r.status_code == 200, r.text
+    ran = {"A": 0, "B": 0}
+    for g in r.json()["gantt"]:
+        if g["pid"] in ran and g["start"] < WINDOW:
+            ran[g["pid"]] += min(g["end"], WINDOW) - g["start"]
+    return ran["A"] / ran["B"]
+
+
+@pytest.mark.parametrize("tickets", [{"A": 300, "B": 100}, {"A": 100, "B": 100}, {"A": 500, "B": 100}])
+def test_stride_splits_exactly_by_tickets(tickets):
+    ratio = tickets["A"] / tickets["B"]
+    assert _shares("STRIDE", {"tickets": tickets}, time_slice=1) == pytest.approx(ratio, rel=0.01)
+
+
+@pytest.mark.parametrize("seed", [0, 7, 42])
+def test_lottery_splits_by_tickets_on_average(seed):
+    assert _shares("LOTTERY", {"tickets": {"A": 300, "B": 100}, "seed": seed}, time_slice=1) == pytest.approx(3, rel=0.1)
+
+
+def test_lottery_is_reproducible_for_a_seed():
+    config = {"tickets": {"A": 300, "B": 100}, "seed": 3}
+    assert _shares("LOTTERY", config, time_slice=1) == _shares("LOTTERY", config, time_slice=1)
+
+
+def test_tickets_default_to_priority():
+    # default_tickets // (1 + priority): priority 0 gets 100 tickets, priority 3 gets 25.
+    assert _shares("STRIDE", {}, time_slice=1, processes=_processes((0, 3))) == pytest.approx(4, rel=0.01)
+
+
+@pytest.mark.parametrize("weights", [{"A": 3072, "B": 1024}, {"A": 1024, "B": 1024}, {"A": 2048, "B": 1024}])
+def test_cfs_splits_by_weight(weights):
+    ratio = weights["A"] / weights["B"]
+    assert _shares("CFS", {"weights": weights}) == pytest.approx(ratio, rel=0.05)
+
+
+def test_cfs_reads_priority_as_nice():
+    # Load weights 1024 (nice 0) and 335 (nice 5).
+    assert _shares("CFS", {}, processes=_processes((0, 5))) == pytest.approx(1024 / 335, rel=0.05)
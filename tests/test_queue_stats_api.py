@@ -0,0 +1,38 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from main import app
+from scheduling.schemas import SchedulingResponse
+from scheduling.serialize import _NESTED
+
+REQUEST = {
+    "algorithm": "MLFQ",
+    "processes": [
+        {"pid": "A", "arrival_time": 0, "burst_time": 9, "priority": 1},
+        {"pid": "B", "arrival_time": 1, "burst_time": 3, "priority": 2},
+        {"pid": "C", "arrival_time": 2, "burst_time": 14, "priority": 3},
+    ],
+    "time_slice": 2,
+    "config": {"time_slices": [2, 4, 8, None], "queue_stats": True},
+}
+
+client = TestClient(app)
+
+
+def test_every_nested_model_has_an_encoder():
+    for name, field in SchedulingResponse.__fields__.items():
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            assert name in _NESTED, name
+
+
+@pytest.mark.parametrize("path", ["/execute", "/execute/stream", "/mlfq"])
+def test_queue_stats_in_response(path):
+    r = client.post(path, json=REQUEST)
+    assert r.status_code == 200, r.text
+    stats = json.loads(r.content)["queue_stats"]
+    assert stats is not None
+    assert stats["max_depth"] >= 1
+    assert len(stats["levels"]) == 4
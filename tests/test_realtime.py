@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+
+def _tasks(*specs):
+    """(pid, wcet, period[, deadline]) tuples as periodic processes."""
+    out = []
+    for pid, wcet, period, *deadline in specs:
+        p = {"pid": pid, "burst_time": wcet, "period": period}
+        if deadline:
+            p["deadline"] = deadline[0]
+        out.append(p)
+    return out
+
+
+def _report(algorithm, processes):
+    r = client.post("/schedulability", json={"algorithm": algorithm, "processes": processes})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _run(algorithm, processes, **config):
+    r = client.post("/execute", json={"algorithm": algorithm, "processes": processes, "config": config})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_rm_within_liu_layland_bound():
+    tasks = _tasks(("A", 1, 4), ("B", 1, 6))
+    report = _report("RM", tasks)
+    assert report["test"] == "liu-layland"
+    assert report["schedulable"] is True
+    assert report["bound"] == pytest.approx(2 * (2 ** 0.5 - 1))
+    assert _run("RM", tasks)["deadline_misses"] == 0
+
+
+def test_rm_harmonic_set_passes_response_time_analysis():
+    # U = 1 is past the Liu-Layland bound; RTA gives R_B = 4 + ceil(8/4) * 2 = 8 = T_B.
+    tasks = _tasks(("A", 2, 4), ("B", 4, 8))
+    report = _report("RM", tasks)
+    assert report["test"] == "response-time"
+    assert report["schedulable"] is True
+    assert {r["pid"]: r["response_time"] for r in report["response_times"]} == {"A": 2, "B": 8}
+    res = _run("RM", tasks)
+    assert res["deadline_misses"] == 0
+    assert res["max_lateness"] == 0
+    assert res["warnings"] == []
+
+
+def test_rm_miss_is_predicted_and_simulated():
+    # R_B iterates 4 -> 6 -> 8 > 7. In the schedule B#0 runs 2-5, is preempted by A#1 (5-7)
+    # and completes at 8, one tick late.
+    tasks = _tasks(("A", 2, 5), ("B", 4, 7))
+    report = _report("RM", tasks)
+    assert report["test"] == "response-time"
+    assert report["schedulable"] is False
+    assert {r["pid"]: r["response_time"] for r in report["response_times"]} == {"A": 2, "B": None}
+    res = _run("RM", tasks)
+    assert res["deadline_misses"] >= 1
+    assert res["max_lateness"] == 1
+    assert any("response-time" in w for w in res["warnings"])
+
+
+def test_edf_schedules_the_set_rm_misses():
+    tasks = _tasks(("A", 2, 5), ("B", 4, 7))
+    report = _report("EDF", tasks)
+    assert (report["test"], report["schedulable"]) == ("utilization", True)
+    assert _run("EDF", tasks)["deadline_misses"] == 0
+
+
+def test_edf_overload_misses_deadlines():
+    tasks = _tasks(("A", 3, 4), ("B", 2, 5))
+    report = _report("EDF", tasks)
+    assert (report["test"], report["schedulable"]) == ("utilization", False)
+    assert report["utilization"] == pytest.approx(1.15)
+    assert _run("EDF", tasks)["deadline_misses"] > 0
+
+
+def test_edf_constrained_deadlines_use_processor_demand():
+    # Density 1/2 + 2/3 > 1, but demand never exceeds the time available.
+    tasks = _tasks(("A", 1, 4, 2), ("B", 2, 6, 3))
+    report = _report("EDF", tasks)
+    assert (report["test"], report["schedulable"]) == ("processor-demand", True)
+    assert _run("EDF", tasks)["deadline_misses"] == 0
+
+
+@pytest.mark.parametrize("algorithm", ["EDF", "RM"])
+def test_require_schedulable_rejects_a_failing_set(algorithm):
+    body = {
+        "algorithm": algorithm,
+        "processes": _tasks(("A", 3, 4), ("B", 2, 5)),
+        "config": {"require_schedulable": True},
+    }
+    assert client.post("/execute", json=body).status_code == 422
+
+
+def test_schedulability_rejects_other_algorithms():
+    r = client.post("/schedulability", json={"algorithm": "FCFS", "processes": _tasks(("A", 1, 4))})
+    assert r.status_code == 422
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from scheduling.schemas import SchedulingRequest
+from scheduling.service import execute_schedule
+from scheduling.sink import SegmentSink
+
+client = TestClient(app)
+
+# Gaps between arrivals give IDLE segments; the context switch cost gives CS segments.
+PROCESSES = [
+    {"pid": f"P{i}", "arrival_time": (i // 3) * 40, "burst_time": 3 + (i * 5) % 11, "priority": i % 4}
+    for i in range(60)
+]
+
+
+def test_adjacent_segments_of_one_pid_merge():
+    with SegmentSink(chunk_segments=2) as sink:
+        for s, e, pid in [(0, 1, "A"), (1, 3, "A"), (3, 4, "B"), (5, 6, "B"), (6, 7, "A"), (7, 9, "A")]:
+            sink.append(s, e, pid)
+        sink.finish()
+        assert list(sink) == [(0, 3, "A"), (3, 4, "B"), (5, 6, "B"), (6, 9, "A")]
+        assert len(sink) == 4
+
+
+def test_spilled_chunks_read_back_in_order():
+    with SegmentSink(chunk_segments=3) as sink:
+        for t in range(100):
+            sink.append(t, t + 1, "AB"[t % 2])
+        sink.finish()
+        # Two hot segments at most; everything older went through the buffer in chunks of 3.
+        assert sink.spilled == 99
+        assert list(sink) == [(t, t + 1, "AB"[t % 2]) for t in range(100)]
+        text = "".join(sink.iter_json(batch_bytes=64))
+        assert json.loads(f"[{text}]") == [{"start": t, "end": t + 1, "pid": "AB"[t % 2]} for t in range(100)]
+
+
+@pytest.mark.parametrize(
+    "tail, merged",
+    [
+        # A trailing switch into idle time becomes idle; a trailing switch alone is dropped.
+        ([(4, 5, "CS"), (5, 9, "IDLE")], [(0, 4, "A"), (4, 9, "IDLE")]),
+        ([(4, 5, "CS")], [(0, 4, "A")]),
+    ],
+)
+def test_finish_applies_end_of_run_fixups(tail, merged):
+    with SegmentSink(chunk_segments=1) as sink:
+        sink.append(0, 4, "A")
+        for seg in tail:
+            sink.append(*seg)
+        sink.finish()
+        assert list(sink) == merged
+
+
+def test_chunk_size_must_be_positive():
+    with pytest.raises(ValueError):
+        SegmentSink(chunk_segments=0)
+
+
+@pytest.mark.parametrize("algorithm", ["FCFS", "RR", "SRTF", "MLFQ", "CFS"])
+@pytest.mark.parametrize("chunk", [1, 7, 1 << 16])
+def test_sink_gantt_matches_in_memory_gantt(algorithm, chunk):
+    req = SchedulingRequest(algorithm=algorithm, processes=PROCESSES, time_slice=2, context_switch_time=1)
+    expected = [(g.start, g.end, g.pid) for g in execute_schedule(req).gantt]
+    with SegmentSink(chunk_segments=chunk) as sink:
+        res = execute_schedule(req, sink=sink)
+        assert res.gantt == []
+        assert list(sink) == expected
+
+
+def test_stream_route_returns_the_execute_response():
+    body = {"algorithm": "RR", "processes": PROCESSES, "time_slice": 2, "context_switch_time": 1}
+    streamed = client.post("/execute/stream", json=body)
+    assert streamed.status_code == 200, streamed.text
+    assert json.loads(streamed.content) == client.post("/execute", json=body).json()
@@ -0,0 +1,59 @@
+import io
+import os
+
+import pytest
+
+from scheduling.traceimport import COLUMNS, compare_trace, import_trace, read_columns
+
+TRACES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "samples", "traces")
+
+
+def _import(name, cpu=None):
+    out = io.BytesIO()
+    with open(os.path.join(TRACES, name), "rb") as fh:
+        meta = import_trace(fh, out, cpu=cpu)
+    out.seek(0)
+    cols, comms, trailer = read_columns(out)
+    return meta, cols, comms, trailer, out.getvalue()
+
+
+@pytest.mark.parametrize("cpu", [None, 0, 1])
+def test_perf_and_ftrace_samples_import_identically(cpu):
+    perf_meta, perf_cols, perf_comms, perf_trailer, _ = _import("perf_sched.txt", cpu)
+    ftrace_meta, ftrace_cols, ftrace_comms, ftrace_trailer, _ = _import("ftrace_sched.txt", cpu)
+
+    assert perf_trailer == perf_meta
+    assert ftrace_trailer == ftrace_meta
+    for name in COLUMNS:
+        assert perf_cols[name] == ftrace_cols[name], name
+    assert perf_comms == ftrace_comms
+    # Only the ftrace header comments differ.
+    assert ftrace_meta.pop("lines") > perf_meta.pop("lines")
+    assert perf_meta == ftrace_meta
+    assert perf_meta["cpus"] == [0, 1]
+    assert perf_meta["cpu_filter"] == cpu
+    assert perf_meta["jobs"] == len(perf_comms) > 0
+    assert perf_meta["unparsed"] == 0
+
+
+def test_single_cpu_import_keeps_only_that_cpus_time():
+    _, all_cols, _, _, _ = _import("perf_sched.txt")
+    _, cpu0, _, _, _ = _import("perf_sched.txt", 0)
+    _, cpu1, _, _, _ = _import("perf_sched.txt", 1)
+    assert sum(cpu0["cpu"]) + sum(cpu1["cpu"]) == sum(all_cols["cpu"])
+    assert all(c > 0 for c in cpu0["cpu"])
+
+
+def test_compare_refuses_a_multi_cpu_import(tmp_path):
+    path = tmp_path / "all.wl"
+    path.write_bytes(_import("perf_sched.txt")[4])
+    with pytest.raises(ValueError, match="--cpu"):
+        compare_trace(str(path), ["FCFS"])
+    report = compare_trace(str(path), ["FCFS"], all_cpus=True)
+    assert report["warnings"]
+
+    path = tmp_path / "cpu0.wl"
+    path.write_bytes(_import("perf_sched.txt", 0)[4])
+    report = compare_trace(str(path), ["FCFS", "RR"], tick_us=100, time_slice=4)
+    assert report["warnings"] == []
+    assert [r["algorithm"] for r in report["results"]] == ["OBSERVED", "FCFS", "RR"]